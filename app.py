@@ -1,12 +1,15 @@
 # my_slack_bot/app.py
-from flask import Flask, Blueprint
+from flask import Flask, Blueprint, Response, jsonify
 from slackeventsapi import SlackEventAdapter
 
-from modules.config import SLACK_SIGNING_SECRET
-from modules.data_embedding import load_data_embeddings
-from modules.dept_service import fetch_dept_data
+from modules.config import SLACK_SIGNING_SECRET, CHANNEL_CACHE_WARM, USER_CACHE_WARM
+from modules.data_snapshot import current_snapshot, refresh_snapshot, snapshot_refresher
+from modules.notification_queue import notification_dispatcher
+from modules.metrics import register_stats, render_metrics
+from modules.profiling import admin_authorized, install_request_profiling, profiling_bp, request_profiler
 from modules.slack_events import register_slack_events
 from modules.slack_actions import actions_bp
+from modules.slack_utils import warm_channel_cache, warm_dm_channels, warm_user_cache
 
 # #디버깅용 추후 삭제
 # print("DEBUG: SLACK_SIGNING_SECRET length:", len(SLACK_SIGNING_SECRET or ""), "value:", repr(SLACK_SIGNING_SECRET))
@@ -14,23 +17,23 @@ from modules.slack_actions import actions_bp
 def create_app():
     app = Flask(__name__)
 
-    # 1) FAQ 임베딩 로드
-    load_data_embeddings()
+    # 1) FAQ 임베딩 + 2) 부서 데이터 로드 -> 스냅샷으로 게시
+    #    (이후 DATA_REFRESH_INTERVAL마다 백그라운드에서 다시 확인하고, 바뀌었으면 스냅샷 교체)
+    refresh_snapshot()
+    snapshot = current_snapshot()
+    snapshot_refresher.start()
 
-    # 2) 부서 데이터 로드 후 Flask config에 저장
-    dept_data = fetch_dept_data()
-    app.config["DEPT_DATA"] = dept_data
-
-    # 추가) "카테고리(=종류)" -> "SlackUserID" 매핑
-    cat_map = {}
-    for row in dept_data:
-        cat = row.get("종류")         # 예: "대관", "주차", ...
-        user_id = row.get("SlackUserID")  # "U088BGU32PM" 등
-        if cat and user_id:
-            cat_map[cat] = user_id
-    # Flask config에 저장 (Slack에서 DM 보낼 때 사용)
-    app.config["CATEGORY_USER_MAP"] = cat_map
+    # 담당자 DM 채널 미리 열어두기 (DM마다 conversations.open 호출 방지)
+    warm_dm_channels(snapshot.cat_map.values())
+    # 폼 제출 알림 전송 스레드 시작 (재시작 전에 못 보낸 알림도 이어서 전송)
+    notification_dispatcher.start()
 
+    # 추가) 채널 이름 캐시 미리 채우기 (메시지마다 conversations.info 호출 방지)
+    if CHANNEL_CACHE_WARM:
+        warm_channel_cache()
+    # 추가) 사용자 이름 캐시 미리 채우기 (선택, 폼 제출 시 users.info 호출 방지)
+    if USER_CACHE_WARM:
+        warm_user_cache()
 
     # 3) Slack 이벤트용 Blueprint + SlackEventAdapter 생성
     events_bp = Blueprint("events_bp", __name__)
@@ -54,8 +57,53 @@ def create_app():
     def home():
         return "Slack Bot is running with detail-based classification!", 200
 
+    # 7) Prometheus 지표 (단계별 지연 히스토그램, 호출/오류 카운터, 캐시·큐 상태, SECRET_TOKEN 인증)
+    register_component_stats()
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+
+    # 8) 요청 프로파일링 (PROFILE_* 환경 변수 또는 /admin/profiling, SECRET_TOKEN 인증)
+    install_request_profiling(app)
+    app.register_blueprint(profiling_bp, url_prefix="/")
+
     return app
 
+
+def metrics_view():
+    """
+    Prometheus 텍스트 포맷 지표. /admin/profiling과 같은 SECRET_TOKEN 인증
+    (scrape 설정 예: authorization: {credentials: <SECRET_TOKEN>} -> Authorization: Bearer 헤더)
+    """
+    if not admin_authorized():
+        return jsonify({"error": "forbidden"}), 403
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def register_component_stats():
+    """각 컴포넌트의 stats()를 /metrics에 slack_bot_component_stat로 노출"""
+    from modules.answer_cache import answer_cache
+    from modules.data_snapshot import snapshot_stats
+    from modules.dm_channels import dm_channels
+    from modules.embedding_cache import query_embedding_cache, dept_embedding_cache
+    from modules.openai_service import chat_stats
+    from modules.slack_events import event_dedup, message_pool
+    from modules.slack_utils import slack_client, channel_cache, user_name_cache
+
+    register_stats("slack_client", slack_client.stats)
+    register_stats("channel_cache", channel_cache.stats)
+    register_stats("user_name_cache", user_name_cache.stats)
+    register_stats("dm_channels", dm_channels.stats)
+    register_stats("query_embedding_cache", query_embedding_cache.stats)
+    register_stats("dept_embedding_cache", dept_embedding_cache.stats)
+    if answer_cache is not None:
+        register_stats("answer_cache", answer_cache.stats)
+    register_stats("openai_chat", chat_stats.snapshot)
+    register_stats("event_dedup", event_dedup.stats)
+    register_stats("message_pool", message_pool.stats)
+    register_stats("notifications", notification_dispatcher.stats)
+    register_stats("data_snapshot", snapshot_stats)
+    register_stats("profiler", request_profiler.stats)
+
+
 if __name__ == "__main__":
     flask_app = create_app()
     # 로컬 실행 시
@@ -0,0 +1,119 @@
+# my_slack_bot/modules/answer_cache.py
+
+import threading
+import time
+import numpy as np
+from modules.config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_PER_KEY,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MIN_SIM,
+)
+from modules.ttl_cache import TTLCache
+
+
+class AnswerCache:
+    """
+    GPT 답변 캐시 (프로세스 내)
+    - 키: (FAQ id, 언어) 묶음. 묶음마다 (질문 임베딩, 답변)을 최대 per_key개 보관
+    - 조회: 같은 묶음에서 질문 임베딩 코사인 유사도가 min_sim 이상인 답변이 있으면 재사용
+    - 항목별 TTL, 묶음 수 LRU 제한
+    - FAQ 인덱스 version(checksum)이 바뀌면 전체 무효화
+    - stats(): hits / misses / hit_ratio / size / invalidations
+    """
+
+    def __init__(self, maxsize=512, per_key=8, ttl=86400, min_sim=0.95):
+        self.per_key = per_key
+        self.ttl = ttl
+        self.min_sim = min_sim
+        self._buckets = TTLCache(maxsize=maxsize, ttl=None)
+        self._index_version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    def get(self, faq_id, lang, query_emb, index_version=None):
+        """캐시된 답변(str) 또는 None"""
+        q = _unit(query_emb)
+        if q is None:
+            return None
+        self._check_version(index_version)
+
+        best_answer, best_sim = None, self.min_sim
+        now = time.monotonic()
+        for vec, answer, expires_at in self._buckets.get((faq_id, lang)) or ():
+            if expires_at is not None and expires_at <= now:
+                continue
+            sim = float(vec @ q)
+            if sim >= best_sim:
+                best_answer, best_sim = answer, sim
+
+        with self._lock:
+            if best_answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return best_answer
+
+    def set(self, faq_id, lang, query_emb, answer, index_version=None):
+        q = _unit(query_emb)
+        if q is None or not answer:
+            return
+        self._check_version(index_version)
+
+        now = time.monotonic()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            entries = [e for e in self._buckets.get((faq_id, lang)) or ()
+                       if e[2] is None or e[2] > now]
+            entries.append((q, answer, expires_at))
+            self._buckets.set((faq_id, lang), entries[-self.per_key:])
+            self.stores += 1
+
+    def clear(self):
+        self._buckets.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._buckets),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+            }
+
+    def _check_version(self, index_version):
+        if index_version is None:
+            return
+        with self._lock:
+            if index_version == self._index_version:
+                return
+            if self._index_version is not None:
+                self.invalidations += 1
+                print("[INFO] FAQ index changed, answer cache cleared")
+            self._index_version = index_version
+            self._buckets.clear()
+
+
+def _unit(vec):
+    if vec is None or len(vec) == 0:
+        return None
+    v = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else None
+
+
+# process_message에서 사용 (ANSWER_CACHE_ENABLED=false면 None)
+answer_cache = AnswerCache(
+    maxsize=ANSWER_CACHE_SIZE,
+    per_key=ANSWER_CACHE_PER_KEY,
+    ttl=ANSWER_CACHE_TTL,
+    min_sim=ANSWER_CACHE_MIN_SIM,
+) if ANSWER_CACHE_ENABLED else None
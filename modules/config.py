@@ -13,3 +13,100 @@ GOOGLE_APPS_SCRIPT_URL_DATA_ALL = os.getenv("GOOGLE_APPS_SCRIPT_URL_DATA_ALL", "
 
 SECRET_TOKEN = os.getenv("SECRET_TOKEN")
 
+# API 주소 (기본값은 실제 서비스. 로컬 벤치마크/테스트용 가짜 서버를 가리킬 때만 변경)
+SLACK_API_BASE_URL = os.getenv("SLACK_API_BASE_URL", "https://slack.com/api/")
+OPENAI_BASE_URL    = os.getenv("OPENAI_BASE_URL") or None  # None이면 openai 라이브러리 기본값
+
+# 질문 임베딩 캐시 (1단: 메모리 LRU, 2단: SQLite 파일)
+# - EMBEDDING_CACHE_PATH를 비우면 디스크 캐시 사용 안 함
+# - Cloud Run 재시작 후에도 유지하려면 볼륨이 마운트된 경로로 지정
+EMBEDDING_CACHE_SIZE          = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_TTL           = int(os.getenv("EMBEDDING_CACHE_TTL", str(24 * 3600)))
+EMBEDDING_CACHE_PATH          = os.getenv("EMBEDDING_CACHE_PATH", "data/cache/embedding_cache.sqlite3")
+EMBEDDING_CACHE_DISK_TTL      = int(os.getenv("EMBEDDING_CACHE_DISK_TTL", str(30 * 24 * 3600)))
+EMBEDDING_CACHE_DISK_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ROWS", "100000"))
+
+# 부서 상세내용 임베딩 캐시 (sha256(모델+상세내용) 키, 만료 없음)
+# - 시트 내용이 바뀐 행만 새로 임베딩. 비우면 디스크 캐시 사용 안 함
+DEPT_EMBEDDING_CACHE_PATH     = os.getenv("DEPT_EMBEDDING_CACHE_PATH", "data/cache/dept_embeddings.sqlite3")
+
+# FAQ 임베딩 바이너리 저장소 (<path>.npy + <path>.meta.json, 없으면 <path>.json 사용)
+FAQ_EMBEDDINGS_PATH   = os.getenv("FAQ_EMBEDDINGS_PATH", "data/combined_slack_dcamp_embeddings")
+FAQ_EMBEDDINGS_VERIFY = os.getenv("FAQ_EMBEDDINGS_VERIFY", "false").lower() == "true"
+
+# 메시지 처리 워커 풀 (이벤트 요청은 큐 등록 후 바로 응답)
+MESSAGE_WORKERS    = int(os.getenv("MESSAGE_WORKERS", "4"))
+MESSAGE_QUEUE_SIZE = int(os.getenv("MESSAGE_QUEUE_SIZE", "100"))
+
+# 이벤트 중복 제거 저장소
+# - DEDUP_BACKEND: memory(프로세스 내, 기본) | sqlite(같은 호스트의 gunicorn 워커끼리 공유)
+DEDUP_BACKEND     = os.getenv("DEDUP_BACKEND", "memory")
+DEDUP_TTL         = int(os.getenv("DEDUP_TTL", "3600"))
+DEDUP_MAX_SIZE    = int(os.getenv("DEDUP_MAX_SIZE", "10000"))
+DEDUP_SQLITE_PATH = os.getenv("DEDUP_SQLITE_PATH", "data/cache/dedup.sqlite3")
+
+# 채널 정보 캐시 (conversations.info 호출 절약)
+CHANNEL_CACHE_TTL  = int(os.getenv("CHANNEL_CACHE_TTL", str(6 * 3600)))
+CHANNEL_CACHE_SIZE = int(os.getenv("CHANNEL_CACHE_SIZE", "5000"))
+CHANNEL_CACHE_WARM = os.getenv("CHANNEL_CACHE_WARM", "true").lower() == "true"
+
+# 관리자 DM 채널 ID 캐시 (user_id -> DM 채널, conversations.open 호출 절약). 비우면 메모리만 사용
+DM_CHANNEL_CACHE_PATH = os.getenv("DM_CHANNEL_CACHE_PATH", "data/cache/dm_channels.sqlite3")
+
+# 사용자 이름 캐시 (users.info 호출 절약)
+# - 조회 실패(user_not_found 등)는 USER_CACHE_NEGATIVE_TTL 동안만 캐시
+# - USER_CACHE_WARM=true면 시작 시 users.list로 미리 채움
+USER_CACHE_TTL          = int(os.getenv("USER_CACHE_TTL", str(24 * 3600)))
+USER_CACHE_NEGATIVE_TTL = int(os.getenv("USER_CACHE_NEGATIVE_TTL", "300"))
+USER_CACHE_SIZE         = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_WARM         = os.getenv("USER_CACHE_WARM", "false").lower() == "true"
+
+# Slack Web API 클라이언트 (커넥션 풀 / 재시도 / 호출 속도 조절)
+SLACK_MAX_RETRIES       = int(os.getenv("SLACK_MAX_RETRIES", "3"))
+SLACK_HTTP_POOL_SIZE    = int(os.getenv("SLACK_HTTP_POOL_SIZE", "10"))
+SLACK_THROTTLE_MAX_WAIT = float(os.getenv("SLACK_THROTTLE_MAX_WAIT", "5"))
+
+# 답변 스트리밍: 스레드에 "작성 중" 메시지를 먼저 올리고 GPT 토큰이 오는 대로 chat.update로 갱신
+ANSWER_STREAMING        = os.getenv("ANSWER_STREAMING", "true").lower() == "true"
+STREAM_UPDATE_INTERVAL  = float(os.getenv("STREAM_UPDATE_INTERVAL", "1.5"))  # 갱신 최소 간격(초)
+
+# 답변 캐시: 같은 FAQ + 같은 언어 + 질문 임베딩 유사도 ANSWER_CACHE_MIN_SIM 이상이면 GPT 호출 없이 재사용
+ANSWER_CACHE_ENABLED    = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIZE       = int(os.getenv("ANSWER_CACHE_SIZE", "512"))        # 캐시할 (FAQ, 언어) 묶음 수
+ANSWER_CACHE_PER_KEY    = int(os.getenv("ANSWER_CACHE_PER_KEY", "8"))       # 묶음당 보관할 답변 수
+ANSWER_CACHE_TTL        = int(os.getenv("ANSWER_CACHE_TTL", "86400"))       # 초
+ANSWER_CACHE_MIN_SIM    = float(os.getenv("ANSWER_CACHE_MIN_SIM", "0.95"))
+
+# 답변 모델 라우팅: FAQ 매칭 점수가 CHAT_FAST_MIN_SCORE 이상이면 빠른 모델, 아니면 강한 모델
+# - 빠른 모델이 CHAT_FAST_TIMEOUT 안에 답하지 못하거나 실패하면 남은 예산(CHAT_LATENCY_BUDGET) 안에서 강한 모델로 재시도
+CHAT_FAST_MODEL         = os.getenv("CHAT_FAST_MODEL", "gpt-4o-mini")
+CHAT_STRONG_MODEL       = os.getenv("CHAT_STRONG_MODEL", "gpt-4")
+CHAT_FAST_MIN_SCORE     = float(os.getenv("CHAT_FAST_MIN_SCORE", "0.9"))
+CHAT_FAST_TIMEOUT       = float(os.getenv("CHAT_FAST_TIMEOUT", "8"))       # 초
+CHAT_LATENCY_BUDGET     = float(os.getenv("CHAT_LATENCY_BUDGET", "30"))    # 초 (요청 1건 전체)
+
+# 메시지 처리 단계 병렬 실행 (채널 조회 / 질문 임베딩 / 부서 분류)
+QUERY_STEP_WORKERS      = int(os.getenv("QUERY_STEP_WORKERS", "8"))
+CHANNEL_LOOKUP_TIMEOUT  = float(os.getenv("CHANNEL_LOOKUP_TIMEOUT", "3"))   # 초
+EMBEDDING_TIMEOUT       = float(os.getenv("EMBEDDING_TIMEOUT", "10"))       # 초
+CLASSIFY_TIMEOUT        = float(os.getenv("CLASSIFY_TIMEOUT", "5"))         # 초
+
+# FAQ 임베딩 / 부서 시트 자동 갱신 주기(초). 0이면 시작 시 한 번만 로드
+DATA_REFRESH_INTERVAL   = int(os.getenv("DATA_REFRESH_INTERVAL", "300"))
+
+# 폼 제출 -> 담당자 DM 전송 대기열 (SQLite 파일, 재시작 후에도 남은 알림을 이어서 전송)
+NOTIFY_QUEUE_PATH       = os.getenv("NOTIFY_QUEUE_PATH", "data/cache/notifications.sqlite3")
+NOTIFY_MAX_ATTEMPTS     = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "8"))
+NOTIFY_RETRY_BASE       = float(os.getenv("NOTIFY_RETRY_BASE", "5"))       # 재시도 간격(초) = base * 2^(시도-1)
+NOTIFY_POLL_INTERVAL    = float(os.getenv("NOTIFY_POLL_INTERVAL", "5"))    # 초
+
+# 요청 프로파일링 (cProfile). 느린 메시지/폼 처리의 원인 분석용
+# - PROFILE_SAMPLE_RATE: 0~1, 이 비율만큼 무작위로 골라 저장
+# - PROFILE_SLOW_MS   : 0보다 크면 모든 요청을 프로파일링하고 이 시간(ms) 이상 걸린 것만 저장
+# - 실행 중에는 POST /admin/profiling (SECRET_TOKEN 인증)으로 워커 프로세스별로 변경 가능
+PROFILE_ENABLED         = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE     = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS         = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_DIR             = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_MAX_FILES       = int(os.getenv("PROFILE_MAX_FILES", "200"))       # 보관할 프로파일 수
+PROFILE_MAX_AGE         = int(os.getenv("PROFILE_MAX_AGE", str(7 * 86400)))  # 보관 기간(초)
@@ -1,79 +1,173 @@
-# my_slack_bot/modules/faq_embedding.py
+# my_slack_bot/modules/data_embedding.py
 
 import json
+import os
 import numpy as np
+from modules.config import FAQ_EMBEDDINGS_PATH, FAQ_EMBEDDINGS_VERIFY
+from modules.embedding_store import (
+    items_to_matrix, load_embedding_store, matrix_checksum, store_exists, store_paths,
+)
 from modules.openai_service import compute_embedding
 
-data_embeddings = []
+# 검색용 인덱스 (load_data_embeddings에서 한 번만 생성)
+faq_index = None
 
-def load_data_embeddings(data_file_path="data/combined_slack_dcamp_embeddings.json"):
-    global data_embeddings
+
+class FaqIndex:
+    """
+    FAQ 임베딩 검색 인덱스
+    - matrix : (N, D) float32 행렬. 각 행은 단위 벡터로 정규화되어 있음
+    - records: id(=행 번호) -> FAQ 레코드(question/answer 등, embedding 제외)
+    - version: 행렬 checksum. 인덱스가 다시 만들어졌는지 판단하는 데 사용 (답변 캐시 무효화 등)
+
+    질문 1건 검색 = 행렬-벡터 곱 1번 + argpartition으로 top-k 추출
+    """
+
+    def __init__(self, matrix, records, version=None):
+        self.matrix = matrix
+        self.records = records
+        self.version = version or matrix_checksum(matrix)
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        [{"question": ..., "answer": ..., "embedding": [...]}, ...] 형태에서 인덱스 생성
+        - embedding이 없는 항목은 제외
+        """
+        matrix, records = items_to_matrix(items)
+        return cls(matrix, records)
+
+    @classmethod
+    def from_store(cls, base_path, verify_checksum=False):
+        """바이너리 저장소(.npy + .meta.json)를 복사 없이 메모리 매핑해서 인덱스 생성"""
+        matrix, records, meta = load_embedding_store(base_path, verify_checksum=verify_checksum)
+        return cls(matrix, records, version=meta.get("checksum"))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+
+    def search(self, query_vec, top_n=3, min_sim=0.0):
+        """
+        query_vec와 코사인 유사도가 높은 순으로 [(id, score), ...] 반환
+        - min_sim 미만은 제외, 최대 top_n개
+        """
+        n = len(self.records)
+        if n == 0 or top_n <= 0 or query_vec is None:
+            return []
+
+        q = np.asarray(query_vec, dtype=np.float32)
+        if q.ndim != 1 or q.shape[0] != self.dim:
+            print(f"[WARN] FaqIndex.search: dim mismatch ({q.shape} vs {self.dim})")
+            return []
+        q_norm = np.linalg.norm(q)
+        if q_norm == 0:
+            return []
+
+        scores = self.matrix @ (q / q_norm)
+
+        k = min(top_n, n)
+        if k < n:
+            top_ids = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top_ids = np.arange(n)
+        top_ids = top_ids[np.argsort(-scores[top_ids], kind="stable")]
+
+        return [(int(i), float(scores[i])) for i in top_ids if scores[i] >= min_sim]
+
+
+def _resolve_base_path(data_file_path):
+    return data_file_path[:-len(".json")] if data_file_path.endswith(".json") else data_file_path
+
+
+def load_faq_index(data_file_path=FAQ_EMBEDDINGS_PATH):
+    """
+    data_file_path: 바이너리 저장소 경로(확장자 없이, <path>.npy + <path>.meta.json)
+                    또는 기존 JSON 파일(.json) 경로
+    - 바이너리 저장소가 없으면 <path>.json(기존 포맷)으로 대체
+    - 실패하면 예외 발생
+    """
+    base_path = _resolve_base_path(data_file_path)
+    if store_exists(base_path):
+        return FaqIndex.from_store(base_path, verify_checksum=FAQ_EMBEDDINGS_VERIFY)
+    with open(base_path + ".json", "r", encoding="utf-8") as f:
+        items = json.load(f)
+    print(f"[WARN] binary embedding store not found, loaded JSON: {base_path}.json")
+    return FaqIndex.from_items(items)
+
+
+def faq_source_fingerprint(data_file_path=FAQ_EMBEDDINGS_PATH):
+    """
+    FAQ 임베딩 파일들의 (경로, 크기, 수정 시각) 목록
+    - 파일을 읽지 않고 바뀌었는지 빠르게 판단하는 용도 (없는 파일은 None)
+    """
+    base_path = _resolve_base_path(data_file_path)
+    paths = list(store_paths(base_path)) + [base_path + ".json"]
+    fingerprint = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fingerprint.append((path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+def load_data_embeddings(data_file_path=FAQ_EMBEDDINGS_PATH):
+    """load_faq_index 결과를 전역 faq_index로 설정 (실패 시 None)"""
+    global faq_index
     try:
-        with open(data_file_path, "r", encoding="utf-8") as f:
-            data_embeddings = json.load(f)
-        print(f"[INFO] Loaded {len(data_embeddings)} FAQ embeddings.")
+        faq_index = load_faq_index(data_file_path)
+        print(f"[INFO] Loaded {len(faq_index)} FAQ embeddings.")
     except Exception as e:
         print("load_data_embeddings error:", e)
-        data_embeddings = []
+        faq_index = None
 
-def cosine_similarity(vecA, vecB):
-    if not (vecA and vecB):
-        return 0.0
-    a = np.array(vecA)
-    b = np.array(vecB)
-    return float(np.dot(a, b) / (np.linalg.norm(a)*np.linalg.norm(b)))
+def faq_index_version():
+    """현재 FAQ 인덱스 version (로드 전이면 None)"""
+    return faq_index.version if faq_index else None
 
-def search_similar_data(user_query: str, top_n: int = 3, min_sim: float = 0.77):
+def search_similar_data(user_query: str, top_n: int = 3, min_sim: float = 0.77, query_embedding=None,
+                        index=None):
     """
     user_query: 사용자 질문 (문자열)
     top_n: 반환할 FAQ 최대 개수
     min_sim: 이 값보다 score가 낮으면 FAQ를 반환하지 않음
-    
+    query_embedding: 미리 계산한 user_query 임베딩 (없으면 여기서 계산)
+    index: 검색할 FaqIndex (없으면 전역 faq_index)
+
     반환값 예:
     [
       {
+        "id": 12,           # FaqIndex 내 레코드 id
         "question": "...",
         "answer": "...",
         "needs_personal_info": "...",
-        "embedding": [...],  # 필요시 유지, 불필요하면 제거 가능
         "score": 0.92
       },
       ...
     ]
     """
-    if not data_embeddings:
-        return []
-
-    user_emb = compute_embedding(user_query)
-    if not user_emb:
-        return []
-
-    # 모든 FAQ에 대해 유사도(score) 계산
-    scored_data = []
-    for faq_item in data_embeddings:
-        sc = cosine_similarity(user_emb, faq_item["embedding"])
-        scored_data.append((sc, faq_item))
-
-    # 점수 높은 순으로 정렬
-    scored_data.sort(key=lambda x: x[0], reverse=True)
-
-    if not scored_data:
+    index = index if index is not None else faq_index
+    if not index:
         return []
 
-    # 1등 점수가 min_sim 미만이면 매칭 없음 처리
-    best_score, _ = scored_data[0]
-    if best_score < min_sim:
+    user_emb = query_embedding if query_embedding is not None else compute_embedding(user_query)
+    if user_emb is None or len(user_emb) == 0:
         return []
 
-    # min_sim 이상인 것들 중 상위 top_n만 추출
-    filtered = [(sc, item) for (sc, item) in scored_data if sc >= min_sim]
-    selected = filtered[:top_n]
+    # 점수 높은 순 top_n (min_sim 이상만)
+    hits = index.search(user_emb, top_n=top_n, min_sim=min_sim)
 
     # 결과 목록을 구성 (score 필드 추가)
     results = []
-    for sc, item in selected:
-        # item을 복사하여 'score' 필드를 추가
-        item_copy = dict(item)
+    for faq_id, sc in hits:
+        # 레코드를 복사하여 'id', 'score' 필드를 추가
+        item_copy = dict(index.records[faq_id])
+        item_copy["id"] = faq_id
         item_copy["score"] = sc  # ← FAQ 유사도 점수
         results.append(item_copy)
 
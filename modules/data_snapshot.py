@@ -0,0 +1,190 @@
+# my_slack_bot/modules/data_snapshot.py
+"""
+FAQ 인덱스 + 부서 데이터 스냅샷
+- 요청 처리 코드는 current_snapshot()으로 받은 스냅샷 하나만 끝까지 사용
+- 백그라운드 갱신 스레드가 새 스냅샷을 다 만든 뒤 전역 참조를 한 번에 교체
+  (교체 전/후 어느 한쪽만 보이고, 만들다 만 상태는 보이지 않음)
+- 내용(FAQ 파일 fingerprint/checksum, 시트 내용 해시)이 그대로면 이전 인덱스를 재사용
+"""
+
+import os
+import threading
+import time
+from types import MappingProxyType
+from modules.config import FAQ_EMBEDDINGS_PATH, DATA_REFRESH_INTERVAL
+import modules.data_embedding as data_embedding
+from modules.dept_service import (
+    DeptIndex, build_category_user_map, dept_rows_hash, embed_dept_rows, fetch_dept_rows,
+    missing_detail_embeddings,
+)
+
+
+class DataSnapshot:
+    """
+    한 시점의 검색/분류 데이터 (만든 뒤에는 수정하지 않음)
+    - faq_index   : FaqIndex (없으면 None)
+    - dept_data   : 부서 시트 행 tuple (detail_embedding 포함)
+    - dept_index  : DeptIndex
+    - cat_map     : 종류 -> SlackUserID (읽기 전용 mapping)
+    - faq_fingerprint / faq_version / dept_hash: 변경 여부 판단용
+    - loaded_at   : 스냅샷 생성 시각 (time.time())
+    """
+
+    __slots__ = ("faq_index", "dept_data", "dept_index", "cat_map",
+                 "faq_fingerprint", "faq_version", "dept_hash", "loaded_at")
+
+    def __init__(self, faq_index=None, dept_data=(), dept_index=None, cat_map=None,
+                 faq_fingerprint=None, dept_hash=None, loaded_at=None):
+        dept_data = tuple(dept_data)
+        object.__setattr__(self, "faq_index", faq_index)
+        object.__setattr__(self, "dept_data", dept_data)
+        object.__setattr__(self, "dept_index", dept_index or DeptIndex(list(dept_data)))
+        object.__setattr__(self, "cat_map", MappingProxyType(
+            dict(cat_map) if cat_map is not None else build_category_user_map(dept_data)))
+        object.__setattr__(self, "faq_fingerprint", faq_fingerprint)
+        object.__setattr__(self, "faq_version", faq_index.version if faq_index else None)
+        object.__setattr__(self, "dept_hash", dept_hash)
+        object.__setattr__(self, "loaded_at", loaded_at or time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DataSnapshot is immutable")
+
+    def age(self):
+        """스냅샷이 만들어진 뒤 지난 시간(초)"""
+        return time.time() - self.loaded_at
+
+
+_EMPTY = DataSnapshot()
+_current = _EMPTY
+
+
+def current_snapshot():
+    """현재 스냅샷 (로드 전이면 빈 스냅샷)"""
+    return _current
+
+
+def publish_snapshot(snapshot):
+    """스냅샷 교체 (참조 대입 한 번이라 원자적). 전역 faq_index도 함께 맞춰 둠"""
+    global _current
+    _current = snapshot
+    data_embedding.faq_index = snapshot.faq_index
+
+
+def build_snapshot(previous=None, faq_path=FAQ_EMBEDDINGS_PATH):
+    """
+    새 스냅샷 생성. 반환: (snapshot, changed)
+    - FAQ: 파일 fingerprint가 같으면 이전 인덱스 재사용, 다르면 다시 매핑 (checksum이 같으면 역시 재사용)
+    - 부서: 시트 내용 해시가 같으면 이전 데이터/인덱스 재사용, 다르면 임베딩 후 인덱스 재생성
+    - 가져오기/로드/임베딩 실패 시 이전 값을 유지 (부서 임베딩이 하나라도 빠지면 실패로 보고 다음 갱신 때 재시도)
+    """
+    previous = previous or _EMPTY
+    faq_changed = dept_changed = False
+
+    # FAQ 인덱스
+    faq_index = previous.faq_index
+    fingerprint = data_embedding.faq_source_fingerprint(faq_path)
+    if faq_index is None or fingerprint != previous.faq_fingerprint:
+        try:
+            loaded = data_embedding.load_faq_index(faq_path)
+            if faq_index is None or loaded.version != faq_index.version:
+                faq_index = loaded
+                faq_changed = True
+                print(f"[INFO] FAQ index loaded: {len(faq_index)} rows")
+        except Exception as e:
+            print("[WARN] FAQ index reload failed, keeping previous:", e)
+            fingerprint = previous.faq_fingerprint
+
+    # 부서 데이터
+    dept_data, dept_index, cat_map = previous.dept_data, previous.dept_index, previous.cat_map
+    dept_hash = previous.dept_hash
+    rows = fetch_dept_rows()
+    if rows is None:
+        print("[WARN] dept sheet fetch failed, keeping previous")
+    else:
+        new_hash = dept_rows_hash(rows)
+        if new_hash != previous.dept_hash:
+            embedded = embed_dept_rows(rows)
+            missing = missing_detail_embeddings(embedded) if embedded else 0
+            if rows and not embedded:
+                print("[WARN] dept embedding failed, keeping previous")
+            elif missing:
+                # 일부라도 임베딩이 없으면 게시하지 않고 해시도 그대로 둬서 다음 갱신 때 다시 시도
+                print(f"[WARN] dept embedding missing for {missing}/{len(embedded)} rows, keeping previous")
+            else:
+                dept_data, dept_index, cat_map, dept_hash = embedded, None, None, new_hash
+                dept_changed = True
+                print(f"[INFO] dept data loaded: {len(dept_data)} rows")
+
+    if not (faq_changed or dept_changed):
+        return previous, False
+
+    snapshot = DataSnapshot(
+        faq_index=faq_index,
+        dept_data=dept_data,
+        dept_index=dept_index,
+        cat_map=cat_map,
+        faq_fingerprint=fingerprint,
+        dept_hash=dept_hash,
+    )
+    return snapshot, True
+
+
+_last_refresh_at = None
+
+
+def refresh_snapshot():
+    """현재 스냅샷 기준으로 다시 만들고, 바뀌었으면 교체. 반환: 교체 여부"""
+    global _last_refresh_at
+    snapshot, changed = build_snapshot(_current)
+    if changed:
+        publish_snapshot(snapshot)
+    _last_refresh_at = time.time()
+    return changed
+
+
+def snapshot_stats():
+    """스냅샷 나이 / 마지막 갱신 시도 후 지난 시간(초) 등"""
+    snapshot = _current
+    return {
+        "faq_rows": len(snapshot.faq_index) if snapshot.faq_index else 0,
+        "dept_rows": len(snapshot.dept_data),
+        "snapshot_age_seconds": snapshot.age() if snapshot is not _EMPTY else None,
+        "last_refresh_age_seconds": (time.time() - _last_refresh_at) if _last_refresh_at else None,
+    }
+
+
+class SnapshotRefresher:
+    """
+    interval초마다 refresh_snapshot()을 실행하는 백그라운드 스레드
+    - start()는 프로세스(pid)마다 한 번만 스레드를 띄움 (gunicorn fork 이후에도 안전)
+    - interval이 0 이하면 실행하지 않음
+    """
+
+    def __init__(self, interval=DATA_REFRESH_INTERVAL):
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop.clear()
+            threading.Thread(target=self._run, name="snapshot-refresher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                refresh_snapshot()
+            except Exception as e:
+                print("[ERROR] snapshot refresh failed:", repr(e))
+
+
+snapshot_refresher = SnapshotRefresher()
@@ -0,0 +1,170 @@
+# my_slack_bot/modules/dedup_store.py
+
+import threading
+import time
+from modules.config import DEDUP_BACKEND, DEDUP_TTL, DEDUP_MAX_SIZE, DEDUP_SQLITE_PATH
+from modules.sqlite_store import SqliteStore
+from modules.ttl_cache import TTLCache
+
+# SQLite 정리(만료/최대 개수 초과 삭제)는 add 호출 N번마다 한 번
+_PRUNE_EVERY = 200
+
+
+class MemoryDedupStore:
+    """프로세스 내 중복 제거 저장소 (TTL + 최대 개수 제한)"""
+
+    name = "memory"
+
+    def __init__(self, ttl=DEDUP_TTL, max_size=DEDUP_MAX_SIZE):
+        self._cache = TTLCache(maxsize=max_size, ttl=ttl)
+
+    def add(self, key):
+        """처음 보는 key면 기록 후 True, 이미 있으면 False"""
+        return self._cache.add(key, True)
+
+    def seen(self, key):
+        return key in self._cache
+
+    def discard(self, key):
+        self._cache.pop(key)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class SqliteDedupStore:
+    """
+    로컬 SQLite 파일 기반 중복 제거 저장소
+    - 같은 파일을 쓰는 gunicorn 워커(프로세스)끼리 공유
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=DEDUP_SQLITE_PATH, ttl=DEDUP_TTL, max_size=DEDUP_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.db = SqliteStore(path, """
+            CREATE TABLE IF NOT EXISTS dedup_keys (
+                key        TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS dedup_keys_expires_at ON dedup_keys(expires_at);
+        """)
+        self._adds = 0
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        now = time.time()
+        # 없거나 만료된 key만 기록 (rowcount=1), 유효한 key가 있으면 rowcount=0
+        cur = self.db.execute(
+            "INSERT INTO dedup_keys (key, expires_at) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at "
+            "WHERE dedup_keys.expires_at < ?",
+            (key, now + self.ttl, now),
+        )
+        with self._lock:
+            self._adds += 1
+            need_prune = self._adds % _PRUNE_EVERY == 0
+        if need_prune:
+            self._prune()
+        return cur.rowcount == 1
+
+    def seen(self, key):
+        row = self.db.execute(
+            "SELECT 1 FROM dedup_keys WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def discard(self, key):
+        self.db.execute("DELETE FROM dedup_keys WHERE key = ?", (key,))
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM dedup_keys").fetchone()[0]
+
+    def _prune(self):
+        try:
+            self.db.execute("DELETE FROM dedup_keys WHERE expires_at < ?", (time.time(),))
+            self.db.execute(
+                "DELETE FROM dedup_keys WHERE key IN ("
+                "SELECT key FROM dedup_keys ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+        except Exception as e:
+            print("[WARN] dedup prune error:", e)
+
+
+class EventDeduplicator:
+    """
+    Slack 이벤트 중복 판단
+    - 키: event_id, (channel, client_msg_id) 또는 (channel, ts)
+    - X-Slack-Retry-Num 헤더가 붙은 재전송은 원본 event_id를 이미 봤으면 "retry"로 집계
+    - 억제한 중복 건수를 이유별로 집계 (stats())
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.checked = 0
+        self.suppressed = {"retry": 0, "event_id": 0, "message": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def event_keys(event_data):
+        event = event_data.get("event", {})
+        channel_id = event.get("channel")
+        keys = []
+        if event_data.get("event_id"):
+            keys.append(("event_id", f"evt:{event_data['event_id']}"))
+        if event.get("client_msg_id"):
+            keys.append(("message", f"msg:{channel_id}:{event['client_msg_id']}"))
+        elif event.get("ts"):
+            keys.append(("message", f"ts:{channel_id}:{event['ts']}"))
+        return keys
+
+    def is_duplicate(self, event_data, retry_num=None):
+        """
+        처음 보는 이벤트면 키를 기록하고 False, 중복이면 True
+        """
+        keys = self.event_keys(event_data)
+        with self._lock:
+            self.checked += 1
+
+        duplicate_reason = None
+        for reason, key in keys:
+            try:
+                is_new = self.store.add(key)
+            except Exception as e:
+                # 저장소 오류 시 중복 판단 없이 처리 (누락보다 중복 답변이 낫다)
+                print("[WARN] dedup store error:", e)
+                is_new = True
+            if not is_new and duplicate_reason is None:
+                duplicate_reason = "retry" if retry_num else reason
+
+        if duplicate_reason:
+            with self._lock:
+                self.suppressed[duplicate_reason] += 1
+            return True
+        return False
+
+    def forget(self, event_data):
+        """처리하지 못한 이벤트의 키를 지워 Slack 재전송을 다시 받을 수 있게 함"""
+        for _, key in self.event_keys(event_data):
+            try:
+                self.store.discard(key)
+            except Exception as e:
+                print("[WARN] dedup store error:", e)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.store.name,
+                "checked": self.checked,
+                "suppressed": dict(self.suppressed),
+            }
+
+
+def create_dedup_store(backend=DEDUP_BACKEND):
+    if backend == "sqlite":
+        return SqliteDedupStore()
+    if backend != "memory":
+        print(f"[WARN] unknown DEDUP_BACKEND={backend!r}, using memory")
+    return MemoryDedupStore()
@@ -1,12 +1,19 @@
 # my_slack_bot/modules/dept_service.py
 
+import hashlib
+import json
 import requests
 import numpy as np
 from modules.config import GOOGLE_APPS_SCRIPT_URL_DATA_ALL, SECRET_TOKEN
-from modules.openai_service import compute_embedding
+from modules.embedding_cache import dept_embedding_cache
+from modules.embedding_store import normalize_rows
+from modules.openai_service import compute_embedding, compute_embeddings
 
 SHEET_NAME = "manager"
 
+# 부서 분류 최소 유사도 (최고 점수가 이보다 낮으면 "기타")
+CLASSIFY_THRESHOLD = 0.7
+
 def fetch_dept_data():
     """
     시트("manager")에서 데이터를 가져와서
@@ -14,11 +21,21 @@ def fetch_dept_data():
     - 단, "기타" 행은 임베딩=None (skip)
     - 반환형: list[dict]
     """
+    rows = fetch_dept_rows()
+    if rows is None:
+        return []
+    return embed_dept_rows(rows)
+
+
+def fetch_dept_rows():
+    """
+    시트("manager") 원본 행 목록 (임베딩 없음)
+    - 실패 시 None (빈 시트와 구분하기 위해)
+    """
     if not GOOGLE_APPS_SCRIPT_URL_DATA_ALL:
         print("[WARN] No GOOGLE_APPS_SCRIPT_URL_DATA_ALL provided.")
-        return []
+        return None
 
-    local_data = []
     try:
         params = {
             "sheet": SHEET_NAME,
@@ -27,41 +44,139 @@ def fetch_dept_data():
         resp = requests.get(GOOGLE_APPS_SCRIPT_URL_DATA_ALL, params=params, timeout=15)
         if resp.status_code == 200:
             print("fetch_dept_data: status_code=200")
+            return resp.json().get("manager", [])
+        print("fetch_dept_data error:", resp.status_code)
+    except Exception as e:
+        print("fetch_dept_data exception:", e)
+    return None
 
-            json_data = resp.json()
-            local_data = json_data.get("manager", [])
-
-            # 임베딩 계산. "기타"는 None 처리
-            for row in local_data:
-                cat = row.get("종류","")
-                detail_text = row.get("상세내용","")
-                if cat == "기타":
-                    row["detail_embedding"] = None
-                else:
-                    emb = compute_embedding(detail_text)
-                    row["detail_embedding"] = emb
-        else:
-            print("fetch_dept_data error:", resp.status_code)
-            local_data = []
 
+def embed_dept_rows(local_data):
+    """
+    각 행에 row["detail_embedding"] 추가 후 같은 리스트 반환
+    - 임베딩 계산 (배치 요청). "기타"는 None 처리
+    - 상세내용 해시 캐시에 있는 행은 API 호출 없이 재사용 (새로 추가/수정된 행만 임베딩)
+    """
+    try:
+        targets = [row for row in local_data if row.get("종류","") != "기타"]
+        counts = {}
+        embeddings = compute_embeddings([row.get("상세내용","") for row in targets],
+                                        cache=dept_embedding_cache, stats=counts)
+        for row in local_data:
+            row["detail_embedding"] = None
+        for row, emb in zip(targets, embeddings):
+            row["detail_embedding"] = emb
+
+        print(f"[INFO] dept detail embeddings: {len(targets)} rows, "
+              f"{counts['cached']} cached, {counts['embedded']} embedded, {counts['failed']} failed")
     except Exception as e:
-        local_data = []
         print("fetch_dept_data exception:", e)
-
+        return []
     return local_data
 
 
-def cosine_similarity(vecA, vecB):
-    if not (vecA and vecB):
-        return 0.0
-    a = np.array(vecA)
-    b = np.array(vecB)
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+def missing_detail_embeddings(rows):
+    """
+    임베딩이 있어야 하는데 없는 행 수 ("기타"와 상세내용이 빈 행 제외)
+    - OpenAI 장애 때 embed_dept_rows는 행을 그대로 돌려주고 detail_embedding만 None이 되므로 실패 판단에 사용
+    """
+    return sum(
+        1 for row in rows
+        if row.get("종류", "") != "기타" and (row.get("상세내용") or "").strip()
+        and row.get("detail_embedding") is None
+    )
+
+
+def dept_rows_hash(rows):
+    """시트 원본 행 목록의 내용 해시 (임베딩 필드 제외). 바뀌었는지 판단하는 용도"""
+    clean = [{k: v for k, v in row.items() if k != "detail_embedding"} for row in rows]
+    raw = json.dumps(clean, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_category_user_map(dept_data):
+    """"카테고리(=종류)" -> "SlackUserID" 매핑 (Slack에서 담당자 DM 보낼 때 사용)"""
+    cat_map = {}
+    for row in dept_data:
+        cat = row.get("종류")         # 예: "대관", "주차", ...
+        user_id = row.get("SlackUserID")  # "U088BGU32PM" 등
+        if cat and user_id:
+            cat_map[cat] = user_id
+    return cat_map
+
+
+class DeptIndex:
+    """
+    부서 시트 검색 인덱스 (시트를 불러올 때 한 번만 생성)
+    - matrix    : 상세내용 임베딩을 행 단위로 정규화한 (N, D) float32 행렬 ("기타"/임베딩 없는 행 제외)
+    - categories: matrix 각 행의 종류 (행렬과 같은 순서)
+    - by_category: 종류 -> 시트 행 (같은 종류가 여러 행이면 첫 행)
+
+    분류 = 행렬-벡터 곱 1번, 담당자/SlackUserID 조회 = dict 조회
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.by_category = {}
+        categories = []
+        vectors = []
+        for row in rows:
+            cat = row.get("종류","")
+            self.by_category.setdefault(cat, row)
+            detail_emb = row.get("detail_embedding")
+            if cat == "기타" or not detail_emb:
+                continue
+            categories.append(cat)
+            vectors.append(detail_emb)
+
+        self.categories = categories
+        if vectors:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            self.matrix = np.ascontiguousarray(normalize_rows(matrix), dtype=np.float32)
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def classify(self, user_emb, threshold=CLASSIFY_THRESHOLD):
+        """가장 비슷한 상세내용의 종류 반환 (최고 점수가 threshold 미만이면 "기타")"""
+        if not self.categories:
+            return "기타"
+        q = np.asarray(user_emb, dtype=np.float32)
+        q_norm = np.linalg.norm(q)
+        if q.shape != (self.matrix.shape[1],) or q_norm == 0:
+            return "기타"
+        scores = self.matrix @ (q / q_norm)
+        best = int(np.argmax(scores))
+        return self.categories[best] if scores[best] >= threshold else "기타"
+
+    def row(self, category):
+        return self.by_category.get(category)
+
 
+# 리스트로 넘어온 dept_data에 대한 인덱스 (같은 리스트면 재사용)
+_list_index = (None, None)
 
-def classify_by_detail(user_text, dept_data, threshold=0.7):
+
+def get_dept_index(dept_data):
+    """DeptIndex면 그대로, list[dict]면 인덱스를 만들어 반환 (마지막 리스트 1개만 기억)"""
+    global _list_index
+    if isinstance(dept_data, DeptIndex):
+        return dept_data
+    cached_list, cached_index = _list_index
+    if cached_list is dept_data and len(cached_index) == len(dept_data):
+        return cached_index
+    index = DeptIndex(dept_data or [])
+    _list_index = (dept_data, index)
+    return index
+
+
+def classify_by_detail(user_text, dept_data, threshold=CLASSIFY_THRESHOLD, user_emb=None):
     """
     사용자 질문(user_text) 임베딩 vs. dept_data 임베딩 비교,
+    - dept_data: DeptIndex 또는 시트 행 리스트
+    - user_emb: 미리 계산한 user_text 임베딩 (없으면 여기서 계산)
     - "기타" 행은 임베딩 스킵
     - max 점수가 threshold 미만이면 최종 "기타"
     - 예) "주차", "멤버십", "고정석/자율석/카드키", ...
@@ -69,32 +184,12 @@ def classify_by_detail(user_text, dept_data, threshold=0.7):
     if not dept_data:
         return "기타"
 
-    user_emb = compute_embedding(user_text)
-    if not user_emb:
+    if user_emb is None:
+        user_emb = compute_embedding(user_text)
+    if user_emb is None or len(user_emb) == 0:
         return "기타"
 
-    best_score = 0.0
-    best_cat   = "기타"
-
-    for row in dept_data:
-        cat = row.get("종류","")
-        if cat == "기타":
-            continue  # 기타 행은 임베딩 계산 X
-        detail_emb = row.get("detail_embedding")
-        if not detail_emb:
-            continue
-
-        score = cosine_similarity(user_emb, detail_emb)
-        print(f"[DEBUG] {cat} => score={score:.6f}")
-
-        if score > best_score:
-            best_score = score
-            best_cat   = cat
-
-    if best_score < threshold:
-        best_cat = "기타"
-
-    return best_cat
+    return get_dept_index(dept_data).classify(user_emb, threshold)
 
 
 def refine_category_by_location(cat: str, channel_name: str) -> str:
@@ -122,11 +217,11 @@ def match_dept_info(category, dept_data):
     default_dept       = "기타"
     default_slack_name = "기타 담당자"
 
-    for row in dept_data:
-        if row.get("종류","") == category:
-            dept       = row.get("담당부서", default_dept)
-            slack_name = row.get("SlackName", default_slack_name)
-            return f"{dept} 부서 [{slack_name}]"
+    row = get_dept_index(dept_data).row(category)
+    if row is not None:
+        dept       = row.get("담당부서", default_dept)
+        slack_name = row.get("SlackName", default_slack_name)
+        return f"{dept} 부서 [{slack_name}]"
 
     return f"{default_dept} 부서 [{default_slack_name}]"
 
@@ -135,7 +230,5 @@ def get_slack_user_id(category, dept_data):
     """
     최종 cat으로 시트 행을 찾아 SlackUserID 반환
     """
-    for row in dept_data:
-        if row.get("종류","") == category:
-            return row.get("SlackUserID","")
-    return ""
+    row = get_dept_index(dept_data).row(category)
+    return row.get("SlackUserID","") if row is not None else ""
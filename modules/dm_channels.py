@@ -0,0 +1,88 @@
+# my_slack_bot/modules/dm_channels.py
+
+import threading
+import time
+from modules.config import DM_CHANNEL_CACHE_PATH
+from modules.sqlite_store import SqliteStore
+
+
+class DmChannelMap:
+    """
+    user_id -> DM 채널 ID 매핑
+    - 메모리 dict + (선택) SQLite 파일에 저장해 재시작/다른 워커에서도 재사용
+    - DM 채널은 사용자별로 고정이라 만료 없음. channel_not_found 등으로 무효화될 때만 삭제
+    """
+
+    def __init__(self, path=DM_CHANNEL_CACHE_PATH):
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path:
+            self.db = SqliteStore(path, """
+                CREATE TABLE IF NOT EXISTS dm_channels (
+                    user_id    TEXT PRIMARY KEY,
+                    channel_id TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+            """)
+
+    def get(self, user_id):
+        channel_id = self._memory.get(user_id)
+        if channel_id is None and self.db:
+            try:
+                row = self.db.execute(
+                    "SELECT channel_id FROM dm_channels WHERE user_id = ?", (user_id,)
+                ).fetchone()
+            except Exception as e:
+                print("[WARN] dm channel cache read error:", e)
+                row = None
+            if row:
+                channel_id = row[0]
+                self._memory[user_id] = channel_id
+        with self._lock:
+            if channel_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return channel_id
+
+    def set(self, user_id, channel_id):
+        self._memory[user_id] = channel_id
+        if self.db:
+            try:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO dm_channels (user_id, channel_id, updated_at) VALUES (?, ?, ?)",
+                    (user_id, channel_id, time.time()),
+                )
+            except Exception as e:
+                print("[WARN] dm channel cache write error:", e)
+
+    def discard(self, user_id):
+        self._memory.pop(user_id, None)
+        if self.db:
+            try:
+                self.db.execute("DELETE FROM dm_channels WHERE user_id = ?", (user_id,))
+            except Exception as e:
+                print("[WARN] dm channel cache delete error:", e)
+
+    def clear(self):
+        self._memory.clear()
+        if self.db:
+            try:
+                self.db.execute("DELETE FROM dm_channels")
+            except Exception as e:
+                print("[WARN] dm channel cache clear error:", e)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
+
+
+dm_channels = DmChannelMap()
@@ -0,0 +1,188 @@
+# my_slack_bot/modules/embedding_cache.py
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+import numpy as np
+from modules.config import (
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_DISK_TTL,
+    EMBEDDING_CACHE_DISK_MAX_ROWS,
+    DEPT_EMBEDDING_CACHE_PATH,
+)
+from modules.sqlite_store import SqliteStore
+from modules.ttl_cache import TTLCache
+
+# 디스크 정리(만료/최대 행수 초과 삭제)는 set 호출 N번마다 한 번
+_PRUNE_EVERY = 500
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화: 유니코드 NFC + 앞뒤 공백 제거 + 연속 공백 1칸"""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_key(model: str, text: str) -> str:
+    """(모델, 정규화된 텍스트) -> sha256 hex"""
+    raw = f"{model}\n{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    임베딩 2단 캐시
+    1) 메모리: 프로세스 내 LRU (크기 제한 + TTL)
+    2) 디스크: SQLite 파일 (재시작 후에도 유지, gunicorn 워커끼리 공유)
+       - path가 비어 있으면 디스크 캐시 사용 안 함
+
+    값은 list[float]로 반환하며, 디스크에는 float32 바이트로 저장.
+    """
+
+    def __init__(self, path="", maxsize=2048, ttl=None, disk_ttl=None,
+                 disk_max_rows=100000, table="embeddings"):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk_ttl = disk_ttl
+        self.disk_max_rows = disk_max_rows
+        self.table = table
+        self.disk = None
+        if path:
+            self.disk = SqliteStore(path, f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key        TEXT PRIMARY KEY,
+                    model      TEXT NOT NULL,
+                    dim        INTEGER NOT NULL,
+                    vector     BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS {table}_created_at ON {table}(created_at);
+            """)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, model, text):
+        key = make_key(model, text)
+
+        emb = self.memory.get(key)
+        if emb is not None:
+            self._count("memory_hits")
+            return list(emb)
+
+        emb = self._disk_get(key)
+        if emb is not None:
+            self._count("disk_hits")
+            self.memory.set(key, emb)
+            return list(emb)
+
+        self._count("misses")
+        return None
+
+    def set(self, model, text, emb):
+        if not emb:
+            return
+        key = make_key(model, text)
+        self.memory.set(key, list(emb))
+        self._disk_set(key, model, emb)
+
+    def stats(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (hits / total) if total else 0.0,
+            "memory_size": len(self.memory),
+        }
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk:
+            try:
+                self.disk.execute(f"DELETE FROM {self.table}")
+            except Exception as e:
+                print("[WARN] embedding cache clear error:", e)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _disk_get(self, key):
+        if not self.disk:
+            return None
+        try:
+            row = self.disk.execute(
+                f"SELECT vector, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception as e:
+            print("[WARN] embedding cache read error:", e)
+            return None
+        if not row:
+            return None
+        vector, created_at = row
+        if self.disk_ttl is not None and created_at + self.disk_ttl < time.time():
+            return None
+        return np.frombuffer(vector, dtype=np.float32).tolist()
+
+    def _disk_set(self, key, model, emb):
+        if not self.disk:
+            return
+        vec = np.asarray(emb, dtype=np.float32)
+        try:
+            self.disk.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, model, dim, vector, created_at) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                (key, model, int(vec.shape[0]), vec.tobytes(), time.time()),
+            )
+        except Exception as e:
+            print("[WARN] embedding cache write error:", e)
+            return
+
+        with self._lock:
+            self._writes += 1
+            need_prune = self._writes % _PRUNE_EVERY == 0
+        if need_prune:
+            self._prune()
+
+    def _prune(self):
+        try:
+            if self.disk_ttl is not None:
+                self.disk.execute(f"DELETE FROM {self.table} WHERE created_at < ?",
+                                  (time.time() - self.disk_ttl,))
+            if self.disk_max_rows:
+                self.disk.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_rows,),
+                )
+        except Exception as e:
+            print("[WARN] embedding cache prune error:", e)
+
+
+# 사용자 질문 임베딩 캐시 (openai_service.compute_embedding에서 사용)
+query_embedding_cache = EmbeddingCache(
+    path=EMBEDDING_CACHE_PATH,
+    maxsize=EMBEDDING_CACHE_SIZE,
+    ttl=EMBEDDING_CACHE_TTL,
+    disk_ttl=EMBEDDING_CACHE_DISK_TTL,
+    disk_max_rows=EMBEDDING_CACHE_DISK_MAX_ROWS,
+)
+
+# 부서 상세내용 임베딩 캐시 (dept_service.fetch_dept_data에서 사용)
+# - 내용 해시가 키이므로 만료 없이 유지하고, 바뀐 행만 새로 임베딩
+dept_embedding_cache = EmbeddingCache(
+    path=DEPT_EMBEDDING_CACHE_PATH,
+    maxsize=1024,
+    ttl=None,
+    disk_ttl=None,
+    disk_max_rows=10000,
+    table="dept_embeddings",
+)
@@ -0,0 +1,148 @@
+# my_slack_bot/modules/embedding_store.py
+"""
+FAQ 임베딩 바이너리 저장소
+- <base>.npy       : (N, D) float32 행렬, 각 행은 단위 벡터로 정규화. np.load(mmap_mode="r")로 매핑
+- <base>.meta.json : 헤더(version, count, dim, dtype, checksum, model ...) + records(질문/답변 텍스트)
+
+JSON(float 리스트) 파싱 없이 행렬을 그대로 메모리 매핑하므로
+프로세스 시작이 빠르고, 같은 파일을 쓰는 워커끼리 페이지 캐시를 공유함.
+"""
+
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+# 저장소 포맷 버전 (호환되지 않게 바뀌면 올림)
+STORE_VERSION = 1
+
+
+class EmbeddingStoreError(Exception):
+    pass
+
+
+def store_paths(base_path):
+    """(행렬 파일, 메타 파일) 경로"""
+    return f"{base_path}.npy", f"{base_path}.meta.json"
+
+
+def store_exists(base_path):
+    return all(os.path.exists(p) for p in store_paths(base_path))
+
+
+def matrix_checksum(matrix):
+    return "sha256:" + hashlib.sha256(np.ascontiguousarray(matrix).tobytes()).hexdigest()
+
+
+def save_embedding_store(base_path, matrix, records, model="text-embedding-ada-002", extra=None):
+    """
+    matrix: 정규화된 (N, D) 행렬, records: 길이 N의 dict 리스트 (embedding 제외)
+    - 임시 파일에 쓴 뒤 os.replace로 교체 (행렬 -> 메타 순서)
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(records):
+        raise EmbeddingStoreError(f"shape {matrix.shape} does not match {len(records)} records")
+
+    npy_path, meta_path = store_paths(base_path)
+    dirname = os.path.dirname(npy_path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    meta = {
+        "version": STORE_VERSION,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]),
+        "dtype": "float32",
+        "normalized": True,
+        "checksum": matrix_checksum(matrix),
+        "model": model,
+        "created_at": time.time(),
+    }
+    if extra:
+        meta.update(extra)
+    meta["records"] = records
+
+    tmp_npy = npy_path + ".tmp"
+    with open(tmp_npy, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_npy, npy_path)
+
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+    return meta
+
+
+def load_embedding_store(base_path, verify_checksum=False):
+    """
+    (matrix, records, meta) 반환
+    - matrix는 읽기 전용 memmap (복사 없음)
+    - verify_checksum=True면 행렬 전체를 읽어 checksum 검증 (느림)
+    """
+    npy_path, meta_path = store_paths(base_path)
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    if meta.get("version") != STORE_VERSION:
+        raise EmbeddingStoreError(f"unsupported store version: {meta.get('version')}")
+
+    matrix = np.load(npy_path, mmap_mode="r")
+    expected_shape = (meta.get("count"), meta.get("dim"))
+    if matrix.dtype != np.float32 or matrix.shape != expected_shape:
+        raise EmbeddingStoreError(
+            f"matrix {matrix.dtype}{matrix.shape} does not match header float32{expected_shape}"
+        )
+
+    records = meta.pop("records", [])
+    if len(records) != matrix.shape[0]:
+        raise EmbeddingStoreError(f"{len(records)} records for {matrix.shape[0]} rows")
+
+    if verify_checksum and matrix_checksum(matrix) != meta.get("checksum"):
+        raise EmbeddingStoreError("checksum mismatch")
+
+    return matrix, records, meta
+
+
+def normalize_rows(matrix):
+    """행 단위 L2 정규화 (norm이 0인 행은 그대로 0 벡터로 둠)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def items_to_matrix(items):
+    """
+    [{"question": ..., "answer": ..., "embedding": [...]}, ...]
+    -> (정규화된 float32 행렬, embedding을 뺀 records)
+    - embedding이 없는 항목은 제외
+    """
+    rows = []
+    records = []
+    for item in items:
+        emb = item.get("embedding")
+        if emb is None or len(emb) == 0:
+            continue
+        rows.append(emb)
+        records.append({k: v for k, v in item.items() if k != "embedding"})
+
+    if not rows:
+        return np.zeros((0, 0), dtype=np.float32), []
+
+    matrix = np.asarray(rows, dtype=np.float32)
+    return np.ascontiguousarray(normalize_rows(matrix), dtype=np.float32), records
+
+
+def convert_json_to_store(json_path, base_path, model="text-embedding-ada-002"):
+    """
+    기존 JSON([{"question", "answer", "embedding"}, ...])을 바이너리 저장소로 변환
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    matrix, records = items_to_matrix(items)
+    meta = save_embedding_store(base_path, matrix, records, model=model)
+
+    # 저장 결과 검증
+    load_embedding_store(base_path, verify_checksum=True)
+    return meta
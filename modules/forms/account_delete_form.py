@@ -1,7 +1,6 @@
 # modules/forms/account_delete_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_account_delete_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_account_delete_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_account_delete_modal_view():
     return {
         "type": "modal",
@@ -42,20 +42,14 @@ def get_account_delete_modal_view():
 
 def submit_account_delete_form(payload):
     values = payload["view"]["state"]["values"]
-    email_val  = values["email_block"]["email_value"]["value"]
-    reason_val = values["reason_block"]["reason_value"]["value"]
+    errors = validate_form(values,
+                           required=[("email_block", "email_value"), ("reason_block", "reason_value")],
+                           emails=[("email_block", "email_value")])
+    email_val  = form_value(values, "email_block", "email_value")
+    reason_val = form_value(values, "reason_block", "reason_value")
 
-    slack_user_id = payload["user"]["id"]  
-    slack_user_name = get_slack_user_name(slack_user_id)
-    
-
-    msg_text = (
-        f"*[계정 탈퇴 신청]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 이메일: {email_val}\n"
         f"- 탈퇴 사유: {reason_val}\n"
     )
-    send_dm_to_admin("홈페이지", msg_text)
-
-    res = {"response_action":"clear"}
-    return make_response(json.dumps(res), 200, {"Content-Type":"application/json"})
+    return submit_admin_notification(payload, "홈페이지", "계정 탈퇴 신청", body, errors)
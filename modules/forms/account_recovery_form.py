@@ -1,7 +1,6 @@
 # modules/forms/account_recovery_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_account_recovery_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_account_recovery_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_account_recovery_modal_view():
     return {
         "type": "modal",
@@ -42,19 +42,14 @@ def get_account_recovery_modal_view():
 
 def submit_account_recovery_form(payload):
     values = payload["view"]["state"]["values"]
-    email_val  = values["email_block"]["email_value"]["value"]
-    issue_desc = values["issue_block"]["issue_description"]["value"]
+    errors = validate_form(values,
+                           required=[("email_block", "email_value"), ("issue_block", "issue_description")],
+                           emails=[("email_block", "email_value")])
+    email_val  = form_value(values, "email_block", "email_value")
+    issue_desc = form_value(values, "issue_block", "issue_description")
 
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id) 
-
-    message_text = (
-        f"*[비밀번호 찾기 문의]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 계정 이메일: {email_val}\n"
         f"- 문제 상황: {issue_desc}\n"
     )
-    send_dm_to_admin("홈페이지",message_text)
-
-    res = {"response_action": "clear"}
-    return make_response(json.dumps(res), 200, {"Content-Type": "application/json"})
+    return submit_admin_notification(payload, "홈페이지", "비밀번호 찾기 문의", body, errors)
@@ -1,7 +1,6 @@
 # modules/forms/car_edit_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_car_edit_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_car_edit_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_car_edit_modal_view():
     return {
         "type": "modal",
@@ -42,19 +42,12 @@ def get_car_edit_modal_view():
 
 def submit_car_edit_form(payload):
     values = payload["view"]["state"]["values"]
-    old_car = values["old_car_block"]["old_car_number"]["value"]
-    new_car = values["new_car_block"]["new_car_number"]["value"] or "(미등록)"
+    errors = validate_form(values, required=[("old_car_block", "old_car_number")])
+    old_car = form_value(values, "old_car_block", "old_car_number")
+    new_car = form_value(values, "new_car_block", "new_car_number") or "(미등록)"
 
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id) 
-
-    msg_text = (
-        f"*[차량 해지/변경]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 기존 차량번호: {old_car}\n"
         f"- 새 차량번호: {new_car}\n"
     )
-    send_dm_to_admin("주차",msg_text)
-
-    return make_response(json.dumps({"response_action":"clear"}),
-                         200, {"Content-Type":"application/json"})
+    return submit_admin_notification(payload, "주차", "차량 해지/변경", body, errors)
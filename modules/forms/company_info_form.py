@@ -1,7 +1,6 @@
 # modules/forms/company_info_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_company_info_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_company_info_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_company_info_modal_view():
     return {
         "type": "modal",
@@ -42,19 +42,13 @@ def get_company_info_modal_view():
 
 def submit_company_info_form(payload):
     values = payload["view"]["state"]["values"]
-    which_info = values["which_block"]["which_info"]["value"]
-    desired    = values["content_block"]["desired_content"]["value"]
-    
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id) 
+    errors = validate_form(values,
+                           required=[("which_block", "which_info"), ("content_block", "desired_content")])
+    which_info = form_value(values, "which_block", "which_info")
+    desired    = form_value(values, "content_block", "desired_content")
 
-    msg_text = (
-        f"*[회사/서비스/URL 수정 요청]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 수정 항목: {which_info}\n"
         f"- 변경 내용: {desired}\n"
     )
-    send_dm_to_admin("홈페이지",msg_text)
-
-    return make_response(json.dumps({"response_action":"clear"}),
-                         200, {"Content-Type":"application/json"})
+    return submit_admin_notification(payload, "홈페이지", "회사/서비스/URL 수정 요청", body, errors)
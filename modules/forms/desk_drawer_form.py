@@ -1,7 +1,6 @@
 # modules/forms/desk_drawer_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_desk_drawer_modal(payload):
     """
@@ -14,6 +13,7 @@ def open_desk_drawer_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_desk_drawer_modal_view():
     """
     실제 모달 레이아웃 (blocks)을 반환
@@ -49,22 +49,15 @@ def get_desk_drawer_modal_view():
 def submit_desk_drawer_form(payload):
     """
     제출 후 처리 로직
+    - 입력 검증 후 관리자 DM 알림은 대기열에 넣고, 모달은 바로 닫기
     """
     values = payload["view"]["state"]["values"]
-    location_value = values["location_block"]["desk_location"]["value"]
-    reason_value   = values["reason_block"]["reason"]["value"] or "(없음)"
+    errors = validate_form(values, required=[("location_block", "desk_location")])
+    location_value = form_value(values, "location_block", "desk_location")
+    reason_value   = form_value(values, "reason_block", "reason") or "(없음)"
 
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id) 
-
-    msg_text = (
-        f"*[서랍 비번 해제 요청]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 위치(층/번호): {location_value}\n"
         f"- 요청 사항: {reason_value}\n"
     )
-    send_dm_to_admin("시설/비품", msg_text)  # 관리자 DM으로 보내거나, 다른 처리 로직
-
-    # 모달 닫기
-    res_body = {"response_action": "clear"}
-    return make_response(json.dumps(res_body), 200, {"Content-Type": "application/json"})
+    return submit_admin_notification(payload, "시설/비품", "서랍 비번 해제 요청", body, errors)
@@ -1,7 +1,6 @@
 # modules/forms/elevator_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_elevator_noise_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_elevator_noise_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_elevator_noise_modal_view():
     return {
         "type": "modal",
@@ -48,23 +48,14 @@ def get_elevator_noise_modal_view():
 
 def submit_elevator_noise_form(payload):
     values = payload["view"]["state"]["values"]
-    elevator_sel = values["which_elevator_block"]["which_elevator"]["selected_option"]["value"]
-    time_info    = values["time_block"]["time_info"]["value"]
-
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id)
+    errors = validate_form(values,
+                           required=[("which_elevator_block", "which_elevator"), ("time_block", "time_info")])
+    elevator_sel = form_value(values, "which_elevator_block", "which_elevator")
+    time_info    = form_value(values, "time_block", "time_info")
 
     elevator_label = {"high":"고층","low":"저층","cargo":"화물"}.get(elevator_sel, "기타")
-    msg_text = (
-        f"*[엘리베이터 소음 신고]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 종류: {elevator_label}\n"
         f"- 층수/시간대: {time_info}\n"
     )
-    send_dm_to_admin("시설/비품",msg_text)
-
-    return make_response(
-        json.dumps({"response_action":"clear"}),
-        200,
-        {"Content-Type":"application/json"}
-    )
+    return submit_admin_notification(payload, "시설/비품", "엘리베이터 소음 신고", body, errors)
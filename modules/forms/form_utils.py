@@ -0,0 +1,72 @@
+# my_slack_bot/modules/forms/form_utils.py
+"""
+폼 제출(view_submission) 공통 처리
+- 입력값 검증 -> 담당자 DM 알림을 대기열에 기록 -> 바로 모달 닫기
+  (작성자 이름 조회, DM 채널 열기, 메시지 전송은 notification_queue의 dispatcher가 처리)
+"""
+
+import copy
+import json
+import re
+from functools import lru_cache, wraps
+from flask import make_response
+from modules.notification_queue import enqueue_admin_notification
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def cached_view(build_view):
+    """
+    모달 view 생성 함수용 데코레이터
+    - view dict는 처음 한 번만 만들고, 호출마다 deepcopy를 반환
+      (호출한 쪽이 private_metadata / 초기값을 넣어도 다음 요청의 view는 바뀌지 않음)
+    """
+    build_once = lru_cache(maxsize=None)(build_view)
+
+    @wraps(build_view)
+    def get_view():
+        return copy.deepcopy(build_once())
+
+    return get_view
+
+
+def form_value(values, block_id, action_id):
+    """입력값(텍스트 또는 선택값 value). 없거나 빈 값이면 None"""
+    element = values.get(block_id, {}).get(action_id, {})
+    if element.get("selected_option"):
+        return element["selected_option"].get("value")
+    value = element.get("value")
+    if isinstance(value, str):
+        value = value.strip()
+    return value or None
+
+
+def validate_form(values, required=(), emails=()):
+    """
+    required: 필수 입력 (block_id, action_id) 목록
+    emails  : 이메일 형식이어야 하는 (block_id, action_id) 목록
+    반환: {block_id: 오류 메시지} (문제 없으면 빈 dict)
+    """
+    errors = {}
+    for block_id, action_id in required:
+        if form_value(values, block_id, action_id) is None:
+            errors[block_id] = "필수 입력 항목입니다."
+    for block_id, action_id in emails:
+        value = form_value(values, block_id, action_id)
+        if value and block_id not in errors and not _EMAIL_RE.match(value):
+            errors[block_id] = "이메일 형식이 올바르지 않습니다."
+    return errors
+
+
+def json_response(body):
+    return make_response(json.dumps(body), 200, {"Content-Type": "application/json"})
+
+
+def submit_admin_notification(payload, category, title, body, errors=None):
+    """
+    검증 오류가 있으면 모달에 오류 표시, 없으면 알림을 대기열에 넣고 모달 닫기
+    """
+    if errors:
+        return json_response({"response_action": "errors", "errors": errors})
+    enqueue_admin_notification(category, title, payload["user"]["id"], body)
+    return json_response({"response_action": "clear"})
@@ -1,7 +1,6 @@
 # modules/forms/id_change_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_id_change_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_id_change_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_id_change_modal_view():
     return {
         "type": "modal",
@@ -42,19 +42,13 @@ def get_id_change_modal_view():
 
 def submit_id_change_form(payload):
     values = payload["view"]["state"]["values"]
-    current_email = values["current_email_block"]["current_email"]["value"]
-    new_email     = values["new_email_block"]["new_email"]["value"]
+    email_fields = [("current_email_block", "current_email"), ("new_email_block", "new_email")]
+    errors = validate_form(values, required=email_fields, emails=email_fields)
+    current_email = form_value(values, "current_email_block", "current_email")
+    new_email     = form_value(values, "new_email_block", "new_email")
 
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id)
-
-    msg_text = (
-        f"*[아이디 변경 신청]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 현재 이메일: {current_email}\n"
         f"- 변경할 이메일: {new_email}\n"
     )
-    send_dm_to_admin("홈페이지",msg_text)
-
-    res = {"response_action": "clear"}
-    return make_response(json.dumps(res), 200, {"Content-Type": "application/json"})
+    return submit_admin_notification(payload, "홈페이지", "아이디 변경 신청", body, errors)
@@ -1,7 +1,6 @@
 # modules/forms/ip_fix_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_ip_fix_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_ip_fix_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_ip_fix_modal_view():
     return {
         "type": "modal",
@@ -42,25 +42,12 @@ def get_ip_fix_modal_view():
 
 def submit_ip_fix_form(payload):
     values = payload["view"]["state"]["values"]
-    mac_addr = values["pc_mac_block"]["mac_address"]["value"]
-    pref_ip   = values["ip_block"]["preferred_ip"]["value"] or "(미지정)"
+    errors = validate_form(values, required=[("pc_mac_block", "mac_address")])
+    mac_addr = form_value(values, "pc_mac_block", "mac_address")
+    pref_ip  = form_value(values, "ip_block", "preferred_ip") or "(미지정)"
 
-    # 1) Slack User ID 추출
-    slack_user_id = payload["user"]["id"]  # 보통 이 경로로 user.id 존재
-
-    # 2) Slack Display Name(또는 Real Name) 조회
-    slack_user_name = get_slack_user_name(slack_user_id)  # (아래에서 정의)
-
-
-    msg_text = (
-        f"*[IP 고정 요청]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- MAC 주소: {mac_addr}\n"
         f"- 희망 IP: {pref_ip}\n"
     )
-    send_dm_to_admin("네트워크",msg_text)
-
-
-    res = {"response_action":"clear"}
-    return make_response(json.dumps({"response_action":"clear"}),
-                         200, {"Content-Type":"application/json"})
+    return submit_admin_notification(payload, "네트워크", "IP 고정 요청", body, errors)
@@ -1,7 +1,6 @@
 # modules/forms/network_issue_form.py
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_network_issue_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -11,6 +10,7 @@ def open_network_issue_modal(payload):
     )
     return "", 200
 
+@cached_view
 def get_network_issue_modal_view():
     return {
         "type": "modal",
@@ -51,21 +51,15 @@ def get_network_issue_modal_view():
 
 def submit_network_issue_form(payload):
     values = payload["view"]["state"]["values"]
-    site_url = values["site_block"]["site_url"]["value"]
-    time_info= values["time_block"]["time_info"]["value"]
-    mac_addr = values["mac_block"]["mac_address"]["value"]
+    errors = validate_form(values, required=[("site_block", "site_url"), ("time_block", "time_info"),
+                                             ("mac_block", "mac_address")])
+    site_url  = form_value(values, "site_block", "site_url")
+    time_info = form_value(values, "time_block", "time_info")
+    mac_addr  = form_value(values, "mac_block", "mac_address")
 
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id)
-
-    msg_text = (
-        f"*[네트워크 이슈]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 사이트: {site_url}\n"
         f"- 시간대: {time_info}\n"
         f"- MAC주소: {mac_addr}\n"
     )
-    send_dm_to_admin("네트워크",msg_text)
-
-    return make_response(json.dumps({"response_action":"clear"}),
-                         200, {"Content-Type":"application/json"})
+    return submit_admin_notification(payload, "네트워크", "네트워크 이슈", body, errors)
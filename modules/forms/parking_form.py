@@ -1,7 +1,5 @@
-import json
-from flask import make_response
-from modules.slack_utils import slack_client, send_dm_to_admin, get_slack_user_name
-from modules.dept_service import get_slack_user_id
+from modules.slack_utils import slack_client
+from modules.forms.form_utils import cached_view, form_value, submit_admin_notification, validate_form
 
 def open_parking_modal(payload):
     trigger_id = payload["trigger_id"]
@@ -15,6 +13,7 @@ def open_parking_modal(payload):
     return "", 200
 
 
+@cached_view
 def get_parking_modal_view():
     return {
         "type": "modal",
@@ -88,20 +87,20 @@ def get_parking_modal_view():
 
 def submit_parking_form(payload):
     values = payload["view"]["state"]["values"]
-    email_value = values["email_block"]["owner_email"]["value"]
-    name_value  = values["name_block"]["owner_name"]["value"]
-    phone_value = values["phone_block"]["phone_number"]["value"]
-    car_number  = values["car_number_block"]["car_number"]["value"]
-    car_type    = values["car_type_block"]["car_type"]["value"]
-    ev_selection= values["ev_block"]["is_ev"]["selected_option"]["value"]
+    errors = validate_form(values,
+                           required=[("email_block", "owner_email"), ("name_block", "owner_name"),
+                                     ("phone_block", "phone_number"), ("car_number_block", "car_number"),
+                                     ("car_type_block", "car_type"), ("ev_block", "is_ev")],
+                           emails=[("email_block", "owner_email")])
+    email_value = form_value(values, "email_block", "owner_email")
+    name_value  = form_value(values, "name_block", "owner_name")
+    phone_value = form_value(values, "phone_block", "phone_number")
+    car_number  = form_value(values, "car_number_block", "car_number")
+    car_type    = form_value(values, "car_type_block", "car_type")
+    ev_selection= form_value(values, "ev_block", "is_ev")
     ev_label    = "예" if ev_selection=="yes" else "아니오"
 
-    slack_user_id = payload["user"]["id"]
-    slack_user_name = get_slack_user_name(slack_user_id) 
-
-    message_text = (
-        f"*[주차 등록 신청]*\n"
-        f"작성자: {slack_user_name}\n"
+    body = (
         f"- 이메일: {email_value}\n"
         f"- 성함: {name_value}\n"
         f"- 휴대전화: {phone_value}\n"
@@ -109,12 +108,4 @@ def submit_parking_form(payload):
         f"- 차종: {car_type}\n"
         f"- 전기차: {ev_label}"
     )
-
-
-    send_dm_to_admin("주차", message_text)
-
-    return make_response(
-        json.dumps({"response_action":"clear"}),
-        200,
-        {"Content-Type":"application/json"}
-    )
+    return submit_admin_notification(payload, "주차", "주차 등록 신청", body, errors)
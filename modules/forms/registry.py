@@ -0,0 +1,83 @@
+# my_slack_bot/modules/forms/registry.py
+"""
+Slack 인터랙션(버튼 클릭 / 모달 제출) -> 폼 핸들러 등록표
+- 폼 모듈은 처음 쓰일 때 import (앱 시작 시 10개를 모두 불러오지 않음)
+- 디스패치는 action_id / callback_id dict 조회 한 번
+- 모달 view는 각 폼의 get_*_modal_view에 form_utils.cached_view를 걸어 한 번만 생성하고 재사용
+  (trigger_id 유효 시간 3초 안에 views.open을 빨리 호출하기 위함, 호출마다 deepcopy를 반환하므로 수정해도 됨)
+- 새 폼은 FORMS에 한 줄 추가
+"""
+
+import importlib
+from collections import namedtuple
+from functools import lru_cache
+
+FormSpec = namedtuple("FormSpec", [
+    "module",       # modules.forms 아래 모듈 이름
+    "action_id",    # 모달을 여는 버튼 action_id
+    "open",         # 모달 여는 함수 이름
+    "callback_id",  # 모달 제출 callback_id
+    "submit",       # 제출 처리 함수 이름
+    "view",         # 모달 view 생성 함수 이름
+])
+
+FORMS = [
+    FormSpec("account_recovery_form", "open_account_recovery_modal", "open_account_recovery_modal",
+             "account_recovery_form_submit", "submit_account_recovery_form",
+             "get_account_recovery_modal_view"),
+    FormSpec("id_change_form", "open_id_change_modal", "open_id_change_modal",
+             "id_change_form_submit", "submit_id_change_form",
+             "get_id_change_modal_view"),
+    FormSpec("account_delete_form", "open_account_delete_modal", "open_account_delete_modal",
+             "account_delete_form_submit", "submit_account_delete_form",
+             "get_account_delete_modal_view"),
+    FormSpec("company_info_form", "open_company_info_modal", "open_company_info_modal",
+             "company_info_form_submit", "submit_company_info_form",
+             "get_company_info_modal_view"),
+    FormSpec("network_issue_form", "open_network_issue_modal", "open_network_issue_modal",
+             "network_issue_form_submit", "submit_network_issue_form",
+             "get_network_issue_modal_view"),
+    FormSpec("ip_fix_form", "open_ip_fix_modal", "open_ip_fix_modal",
+             "ip_fix_form_submit", "submit_ip_fix_form",
+             "get_ip_fix_modal_view"),
+    FormSpec("parking_form", "open_parking_modal", "open_parking_modal",
+             "parking_form_submit", "submit_parking_form",
+             "get_parking_modal_view"),
+    FormSpec("car_edit_form", "open_car_edit_modal", "open_car_edit_modal",
+             "car_edit_form_submit", "submit_car_edit_form",
+             "get_car_edit_modal_view"),
+    # 파일명은 elevator_form, action_id/callback_id는 elevator_noise
+    FormSpec("elevator_form", "open_elevator_noise_modal", "open_elevator_noise_modal",
+             "elevator_noise_form_submit", "submit_elevator_noise_form",
+             "get_elevator_noise_modal_view"),
+    FormSpec("desk_drawer_form", "open_desk_drawer_modal", "open_desk_drawer_modal",
+             "desk_drawer_form_submit", "submit_desk_drawer_form",
+             "get_desk_drawer_modal_view"),
+]
+
+FORMS_BY_ACTION   = {spec.action_id: spec for spec in FORMS}
+FORMS_BY_CALLBACK = {spec.callback_id: spec for spec in FORMS}
+
+
+@lru_cache(maxsize=None)
+def _resolve(module, attr):
+    """modules.forms.<module>.<attr> (모듈은 처음 호출 때 import)"""
+    return getattr(importlib.import_module(f"modules.forms.{module}"), attr)
+
+
+def get_open_handler(action_id):
+    """버튼 action_id에 해당하는 모달 열기 함수 (없으면 None)"""
+    spec = FORMS_BY_ACTION.get(action_id)
+    return _resolve(spec.module, spec.open) if spec else None
+
+
+def get_submit_handler(callback_id):
+    """모달 callback_id에 해당하는 제출 처리 함수 (없으면 None)"""
+    spec = FORMS_BY_CALLBACK.get(callback_id)
+    return _resolve(spec.module, spec.submit) if spec else None
+
+
+def get_form_view(action_id):
+    """버튼 action_id에 해당하는 모달 view (없으면 None)"""
+    spec = FORMS_BY_ACTION.get(action_id)
+    return _resolve(spec.module, spec.view)() if spec else None
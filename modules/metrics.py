@@ -0,0 +1,231 @@
+# my_slack_bot/modules/metrics.py
+"""
+프로세스 내 지표(카운터 / 히스토그램) + Prometheus 텍스트 포맷 출력
+- 외부 라이브러리 없이 /metrics 라우트에서 render_metrics() 결과를 그대로 반환
+- 각 컴포넌트의 stats() dict는 register_stats()로 등록하면 scrape 때마다 gauge로 출력
+- p50/p95/p99는 Prometheus에서 histogram_quantile()로 계산
+  예) histogram_quantile(0.95, sum by (le, stage) (rate(slack_bot_stage_seconds_bucket[5m])))
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 초 단위 기본 버킷 (Slack/OpenAI 호출 수 ms ~ 수십 초 범위)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_metrics = []         # 등록된 Counter / Histogram
+_stats_sources = {}   # component 이름 -> stats() 함수
+_lock = threading.Lock()
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """단조 증가 카운터. inc(amount=1, **labels)"""
+
+    type = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in items]
+
+
+class Histogram:
+    """
+    누적 버킷 히스토그램. observe(value, **labels), time(**labels) 컨텍스트 매니저
+    - quantile(q, **labels): 버킷 경계 기준 근사 분위수 (로그/테스트용)
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _register(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[idx] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(self.labelnames, labels))
+        return sum(series[:-1]) if series else 0
+
+    def quantile(self, q, **labels):
+        series = self._series.get(_label_key(self.labelnames, labels))
+        if not series:
+            return None
+        total = sum(series[:-1])
+        rank = q * total
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+            cumulative += n
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _register(metric):
+    with _lock:
+        _metrics.append(metric)
+
+
+def register_stats(component, stats_fn):
+    """component의 stats() dict를 slack_bot_component_stat gauge로 출력하도록 등록"""
+    with _lock:
+        _stats_sources[component] = stats_fn
+
+
+def unregister(metric=None, component=None):
+    """등록한 지표(metric) 또는 stats 출처(component) 제거 (테스트 정리용)"""
+    with _lock:
+        if metric is not None and metric in _metrics:
+            _metrics.remove(metric)
+        if component is not None:
+            _stats_sources.pop(component, None)
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, bool):
+        out.append((prefix, int(value)))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else str(k), v, out)
+
+
+def _render_stats():
+    with _lock:
+        sources = list(_stats_sources.items())
+    lines = [
+        "# HELP slack_bot_component_stat Component stats() values (caches, queues, clients)",
+        "# TYPE slack_bot_component_stat gauge",
+    ]
+    for component, stats_fn in sorted(sources):
+        try:
+            stats = stats_fn()
+        except Exception as e:
+            print(f"[WARN] metrics: {component}.stats() failed:", e)
+            continue
+        flat = []
+        _flatten("", stats, flat)
+        for key, value in flat:
+            labels = _format_labels(("component", "key"), (component, key))
+            lines.append(f"slack_bot_component_stat{labels} {_format_value(value)}")
+    return lines
+
+
+def render_metrics():
+    """Prometheus 텍스트 포맷 (version 0.0.4)"""
+    with _lock:
+        metrics = list(_metrics)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+    lines.extend(_render_stats())
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# 공용 지표
+# ----------------------------------------------------------------------
+STAGE_SECONDS = Histogram(
+    "slack_bot_stage_seconds",
+    "Duration of each message pipeline stage",
+    labelnames=("stage",),
+)
+STAGE_TIMEOUTS = Counter(
+    "slack_bot_stage_timeouts_total",
+    "Message pipeline stages that timed out or failed and fell back to a default",
+    labelnames=("stage", "reason"),
+)
+MESSAGES_TOTAL = Counter(
+    "slack_bot_messages_total",
+    "Processed Slack messages by outcome",
+    labelnames=("outcome",),
+)
+INTERACTION_SECONDS = Histogram(
+    "slack_bot_interaction_seconds",
+    "Duration of Slack interaction (button / modal) handlers",
+    labelnames=("type", "id"),
+)
+OPENAI_REQUESTS = Counter(
+    "slack_bot_openai_requests_total",
+    "OpenAI API requests by endpoint, model and outcome",
+    labelnames=("endpoint", "model", "outcome"),
+)
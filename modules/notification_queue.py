@@ -0,0 +1,234 @@
+# my_slack_bot/modules/notification_queue.py
+"""
+폼 제출 -> 담당자 DM 전송 대기열
+- 폼 제출 핸들러는 알림을 SQLite 파일에 기록만 하고 바로 모달을 닫음 (Slack API 호출 없음)
+- 백그라운드 dispatcher가 작성자 이름 조회 + DM 전송, 실패하면 지수 백오프로 재시도
+- 여러 gunicorn 워커가 같은 파일을 써도 한 알림은 한 워커만 가져감 (claim 후 lease 시간 동안 점유)
+"""
+
+import os
+import threading
+import time
+import uuid
+from modules.config import (
+    NOTIFY_QUEUE_PATH,
+    NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_RETRY_BASE,
+    NOTIFY_POLL_INTERVAL,
+)
+from modules.slack_utils import get_slack_user_name, send_dm_to_admin
+from modules.sqlite_store import SqliteStore
+
+# 전송 중(claim) 상태로 이 시간(초)이 지나면 다른 워커가 다시 가져갈 수 있음 (전송 도중 프로세스 종료 대비)
+# lease는 알림마다 전송 직전에 renew()로 갱신하므로, 배치 전체가 아니라 알림 1건 전송 시간만 이 안에 들면 됨
+_LEASE_SECONDS = 120
+
+
+class NotificationQueue:
+    """
+    담당자 DM 알림 대기열 (SQLite)
+    - status: pending(전송 대기) / sending(전송 중) / dead(재시도 한도 초과)
+    - 전송에 성공한 알림은 삭제
+    """
+
+    def __init__(self, path=NOTIFY_QUEUE_PATH, max_attempts=NOTIFY_MAX_ATTEMPTS,
+                 retry_base=NOTIFY_RETRY_BASE):
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.db = SqliteStore(path, """
+            CREATE TABLE IF NOT EXISTS notifications (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                category        TEXT NOT NULL,
+                title           TEXT NOT NULL,
+                user_id         TEXT NOT NULL,
+                body            TEXT NOT NULL,
+                status          TEXT NOT NULL DEFAULT 'pending',
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                claimed_by      TEXT,
+                claimed_at      REAL,
+                last_error      TEXT,
+                created_at      REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS notifications_due ON notifications(status, next_attempt_at);
+        """)
+
+    def enqueue(self, category, title, user_id, body):
+        now = time.time()
+        cur = self.db.execute(
+            "INSERT INTO notifications (category, title, user_id, body, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (category, title, user_id, body, now, now),
+        )
+        return cur.lastrowid
+
+    def claim_due(self, limit=20):
+        """
+        전송할 차례인 알림을 최대 limit개 가져와 sending 상태로 표시
+        반환: (token, [(id, category, title, user_id, body, attempts), ...])
+        - token: 이 claim의 식별자. renew / mark_sent / mark_failed에 같이 넘겨야 함
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        self.db.execute(
+            "UPDATE notifications SET status = 'sending', claimed_by = ?, claimed_at = ? "
+            "WHERE id IN (SELECT id FROM notifications "
+            "  WHERE (status = 'pending' AND next_attempt_at <= ?) "
+            "     OR (status = 'sending' AND claimed_at < ?) "
+            "  ORDER BY id LIMIT ?)",
+            (token, now, now, now - _LEASE_SECONDS, limit),
+        )
+        rows = self.db.execute(
+            "SELECT id, category, title, user_id, body, attempts FROM notifications "
+            "WHERE claimed_by = ? AND status = 'sending' ORDER BY id",
+            (token,),
+        ).fetchall()
+        return token, rows
+
+    def renew(self, notification_id, token):
+        """
+        lease 갱신 (전송 직전에 호출). 반환: 아직 token이 점유 중이면 True
+        - lease가 만료되어 다른 워커가 가져갔으면 False (이 워커는 전송하지 않아야 함)
+        """
+        cur = self.db.execute(
+            "UPDATE notifications SET claimed_at = ? "
+            "WHERE id = ? AND claimed_by = ? AND status = 'sending'",
+            (time.time(), notification_id, token),
+        )
+        return cur.rowcount == 1
+
+    def mark_sent(self, notification_id, token):
+        """전송 완료로 삭제. 반환: token이 점유 중이어서 삭제했으면 True"""
+        cur = self.db.execute(
+            "DELETE FROM notifications WHERE id = ? AND claimed_by = ?",
+            (notification_id, token),
+        )
+        return cur.rowcount == 1
+
+    def mark_failed(self, notification_id, token, attempts, error):
+        """
+        실패 기록 후 재시도 예약. 반환: 재시도 한도를 넘어 dead가 되었으면 True
+        - token이 더 이상 점유하지 않는 알림(다른 워커가 가져감)은 건드리지 않고 False
+        """
+        attempts += 1
+        dead = attempts >= self.max_attempts
+        cur = self.db.execute(
+            "UPDATE notifications SET status = ?, attempts = ?, next_attempt_at = ?, "
+            "claimed_by = NULL, claimed_at = NULL, last_error = ? WHERE id = ? AND claimed_by = ?",
+            ("dead" if dead else "pending", attempts,
+             time.time() + self.retry_base * (2 ** (attempts - 1)), str(error)[:500],
+             notification_id, token),
+        )
+        return dead and cur.rowcount == 1
+
+    def counts(self):
+        """상태별 알림 수, 예: {"pending": 2, "dead": 1}"""
+        rows = self.db.execute("SELECT status, COUNT(*) FROM notifications GROUP BY status").fetchall()
+        return dict(rows)
+
+
+def format_admin_message(title, author_name, body):
+    """담당자 DM 본문: 제목 / 작성자 / 폼 내용"""
+    return f"*[{title}]*\n작성자: {author_name}\n{body}"
+
+
+class NotificationDispatcher:
+    """
+    대기열의 알림을 꺼내 DM으로 전송하는 백그라운드 스레드
+    - start()는 프로세스(pid)마다 한 번만 스레드를 띄움
+    - enqueue 직후 wake()로 깨워 바로 전송, 그 외에는 poll_interval마다 재시도 대상 확인
+    - stats(): 전송 성공/실패/포기 건수, 대기열 상태별 건수
+    """
+
+    def __init__(self, queue, poll_interval=NOTIFY_POLL_INTERVAL):
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self._pid = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.sent = 0
+        self.failed = 0
+        self.dead = 0
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="notification-dispatcher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def wake(self):
+        self._wake.set()
+
+    def dispatch_due(self):
+        """전송할 차례인 알림을 모두 처리. 반환: 처리한 건수"""
+        handled = 0
+        while True:
+            token, batch = self.queue.claim_due()
+            if not batch:
+                return handled
+            for notification_id, category, title, user_id, body, attempts in batch:
+                if not self.queue.renew(notification_id, token):
+                    # 앞선 알림 전송이 오래 걸려 lease가 만료되고 다른 워커가 가져감
+                    print(f"[WARN] notification {notification_id} claim lost, skipping")
+                    continue
+                handled += 1
+                try:
+                    text = format_admin_message(title, get_slack_user_name(user_id), body)
+                    ok = send_dm_to_admin(category, text)
+                    error = None if ok else "send_dm_to_admin failed"
+                except Exception as e:
+                    error = repr(e)
+                if error is None:
+                    self.queue.mark_sent(notification_id, token)
+                    self._count("sent")
+                    continue
+                self._count("failed")
+                if self.queue.mark_failed(notification_id, token, attempts, error):
+                    self._count("dead")
+                    print(f"[ERROR] notification {notification_id} ({title}) dropped after "
+                          f"{attempts + 1} attempts: {error}")
+                else:
+                    print(f"[WARN] notification {notification_id} ({title}) failed, will retry: {error}")
+
+    def stats(self):
+        with self._lock:
+            stats = {"sent": self.sent, "failed": self.failed, "dead": self.dead}
+        try:
+            stats["queue"] = self.queue.counts()
+        except Exception as e:
+            print("[WARN] notification queue stats error:", e)
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.dispatch_due()
+            except Exception as e:
+                print("[ERROR] notification dispatcher error:", repr(e))
+
+
+notification_queue = NotificationQueue()
+notification_dispatcher = NotificationDispatcher(notification_queue)
+
+
+def enqueue_admin_notification(category, title, user_id, body):
+    """
+    담당자 DM 알림을 대기열에 기록하고 dispatcher를 깨움 (Slack API 호출 없이 바로 반환)
+    - category: 시트의 '종류' 값 (DM 받을 담당자)
+    - title   : 알림 제목 (예: "주차 등록 신청")
+    - user_id : 작성자 Slack ID (이름은 전송할 때 조회)
+    - body    : 폼 내용
+    """
+    notification_id = notification_queue.enqueue(category, title, user_id, body)
+    notification_dispatcher.start()
+    notification_dispatcher.wake()
+    return notification_id
@@ -1,35 +1,395 @@
 # modules/openai_service.py
-from openai import OpenAI
-from modules.config import OPENAI_API_KEY
+import threading
+import time
+from openai import OpenAI, BadRequestError
+from modules.config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    CHAT_FAST_MODEL,
+    CHAT_STRONG_MODEL,
+    CHAT_FAST_MIN_SCORE,
+    CHAT_FAST_TIMEOUT,
+    CHAT_LATENCY_BUDGET,
+)
+from modules.embedding_cache import query_embedding_cache
+from modules.metrics import OPENAI_REQUESTS
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
-def compute_embedding(text, model="text-embedding-ada-002"):
+# 임베딩 API 요청 1건당 한도 (text-embedding-ada-002 기준)
+EMBEDDING_MAX_BATCH_ITEMS  = 2048
+EMBEDDING_MAX_BATCH_TOKENS = 300000
+EMBEDDING_MAX_INPUT_TOKENS = 8191  # 입력 1개 한도. 추정치가 넘으면 단독 요청으로 분리
+
+# 모델별 단가 (USD / 1M 토큰, (입력, 출력)). 목록에 없는 모델은 비용 0으로 집계
+MODEL_PRICES = {
+    "gpt-4":       (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o":      (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+
+def compute_embedding(text, model="text-embedding-ada-002", cache=query_embedding_cache):
+    """
+    text 임베딩(list[float]) 반환, 실패 시 None
+    - cache: (모델, 정규화된 text) 기준 캐시. 적중하면 API 호출 없이 반환 (None이면 캐시 미사용)
+    """
+    if cache is not None:
+        cached = cache.get(model, text)
+        if cached is not None:
+            return cached
     try:
         # 새 라이브러리에서는 input을 list로 넘겨야 합니다.
         resp = client.embeddings.create(model=model, input=[text])
         # resp는 pydantic 모델
-        return resp.data[0].embedding
+        emb = resp.data[0].embedding
     except Exception as e:
         print("compute_embedding error:", e)
+        OPENAI_REQUESTS.inc(endpoint="embeddings", model=model, outcome="error")
         return None
+    OPENAI_REQUESTS.inc(endpoint="embeddings", model=model, outcome="ok")
+    if cache is not None:
+        cache.set(model, text, emb)
+    return emb
+
+def estimate_tokens(text):
+    """
+    tiktoken 없이 토큰 수를 넉넉하게 추정 (UTF-8 바이트 수 / 2)
+    - 한글 1글자(3바이트) ≈ 1.5토큰, 영문 4글자 ≈ 2토큰으로 실제보다 크게 잡힘
+    """
+    return len(text.encode("utf-8")) // 2 + 1
+
+
+def _pack_batches(items, max_items, max_tokens, max_input_tokens=EMBEDDING_MAX_INPUT_TOKENS):
+    """
+    [(index, text), ...]를 요청 단위 배치로 묶음 (배치 안에서는 입력 순서 유지)
+    - 배치당 항목 수 <= max_items, 추정 토큰 합 <= max_tokens
+    - 추정 토큰이 max_input_tokens를 넘는 입력은 경고 후 단독 배치
+      (추정치가 실제보다 커서 건너뛰지는 않음. 정말 길어서 400이 나도 그 항목만 실패하고 배치를 나누지 않음)
+    """
+    batches = []
+    current, current_tokens = [], 0
+    for idx, text in items:
+        tokens = estimate_tokens(text)
+        if tokens > max_input_tokens:
+            print(f"[WARN] compute_embeddings: item {idx} ~{tokens} tokens > {max_input_tokens}, sent alone")
+            batches.append([(idx, text)])
+            continue
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((idx, text))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
 
-def generate_chat_completion(system_prompt, user_prompt, model="gpt-4", temperature=0.3):
+def _embed_batch(batch, model):
+    """
+    batch: [(index, text), ...] -> {index: embedding}
+    - 입력 오류(400)로 배치 전체가 거절되면 반으로 나눠 다시 시도해 문제 항목만 제외
+    - 네트워크/인증 등 그 밖의 오류는 해당 배치 전체 실패로 처리
+    """
     try:
-        resp = client.chat.completions.create(
+        resp = client.embeddings.create(model=model, input=[text for _, text in batch])
+    except BadRequestError as e:
+        OPENAI_REQUESTS.inc(endpoint="embeddings", model=model, outcome="error")
+        if len(batch) == 1:
+            print(f"compute_embeddings error (item {batch[0][0]}):", e)
+            return {}
+        mid = len(batch) // 2
+        result = _embed_batch(batch[:mid], model)
+        result.update(_embed_batch(batch[mid:], model))
+        return result
+    except Exception as e:
+        print(f"compute_embeddings error ({len(batch)} items):", e)
+        OPENAI_REQUESTS.inc(endpoint="embeddings", model=model, outcome="error")
+        return {}
+    OPENAI_REQUESTS.inc(endpoint="embeddings", model=model, outcome="ok")
+
+    # 응답 순서는 data[i].index 기준으로 맞춤
+    return {batch[d.index][0]: d.embedding for d in resp.data}
+
+
+def compute_embeddings(texts, model="text-embedding-ada-002", cache=query_embedding_cache,
+                       max_items=EMBEDDING_MAX_BATCH_ITEMS, max_tokens=EMBEDDING_MAX_BATCH_TOKENS,
+                       stats=None):
+    """
+    여러 text를 한 번에 임베딩. 입력 순서대로 list[list[float] | None] 반환
+    - 요청 1건에 최대 max_items개 / 추정 max_tokens 토큰까지 묶어서 호출
+    - 빈 문자열이나 실패한 항목만 None (배치 전체를 실패시키지 않음)
+    - cache: compute_embedding과 동일한 캐시. 적중한 항목은 API로 보내지 않음
+    - stats: dict를 넘기면 이번 호출의 건수를 채움
+      {"cached": 캐시 적중, "embedded": API로 받은 항목, "failed": 실패, "skipped": 빈 문자열, "requests": API 요청 수}
+      (캐시 전체 통계와 달리 같은 캐시를 쓰는 다른 호출의 영향을 받지 않음)
+    """
+    results = [None] * len(texts)
+    pending = {}  # text -> [index, ...] (같은 text는 한 번만 요청)
+    cached_count = skipped_count = 0
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            skipped_count += 1
+            continue
+        if cache is not None:
+            cached = cache.get(model, text)
+            if cached is not None:
+                results[i] = cached
+                cached_count += 1
+                continue
+        pending.setdefault(text, []).append(i)
+
+    unique_texts = list(pending.keys())
+    batches = _pack_batches(list(enumerate(unique_texts)), max_items, max_tokens)
+    for batch in batches:
+        for u, emb in _embed_batch(batch, model).items():
+            text = unique_texts[u]
+            if cache is not None:
+                cache.set(model, text, emb)
+            for i in pending[text]:
+                results[i] = emb
+
+    failed = [i for i, emb in enumerate(results) if emb is None]
+    if stats is not None:
+        stats.update({
+            "cached": cached_count,
+            "embedded": len(texts) - cached_count - len(failed),
+            "failed": len(failed) - skipped_count,
+            "skipped": skipped_count,
+            "requests": len(batches),
+        })
+    if failed:
+        print(f"[WARN] compute_embeddings: {len(failed)}/{len(texts)} items failed: {failed[:20]}")
+    if batches:
+        print(f"[INFO] compute_embeddings: {len(unique_texts)} texts in {len(batches)} request(s)")
+    return results
+
+
+class ChatStats:
+    """
+    답변 모델 tier별 호출 통계
+    - calls / failures / latency(평균, 최대) / 토큰 수 / 추정 비용(USD)
+    - escalations: 빠른 모델 실패·시간 초과로 강한 모델을 다시 호출한 횟수
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tiers = {}
+        self.escalations = 0
+
+    def record(self, model, latency, ok, prompt_tokens=0, completion_tokens=0):
+        OPENAI_REQUESTS.inc(endpoint="chat", model=model, outcome="ok" if ok else "error")
+        tier = model_tier(model)
+        in_price, out_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        cost = (prompt_tokens * in_price + completion_tokens * out_price) / 1_000_000
+        with self._lock:
+            t = self.tiers.setdefault(tier, {
+                "model": model, "calls": 0, "failures": 0,
+                "latency_total": 0.0, "latency_max": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+            })
+            t["calls"] += 1
+            if not ok:
+                t["failures"] += 1
+            t["latency_total"] += latency
+            t["latency_max"] = max(t["latency_max"], latency)
+            t["prompt_tokens"] += prompt_tokens
+            t["completion_tokens"] += completion_tokens
+            t["cost_usd"] += cost
+
+    def count_escalation(self):
+        with self._lock:
+            self.escalations += 1
+
+    def snapshot(self):
+        with self._lock:
+            tiers = {}
+            for tier, t in self.tiers.items():
+                tiers[tier] = dict(t)
+                tiers[tier]["latency_avg"] = t["latency_total"] / t["calls"] if t["calls"] else 0.0
+            return {"tiers": tiers, "escalations": self.escalations}
+
+
+chat_stats = ChatStats()
+
+
+def model_tier(model):
+    if model == CHAT_FAST_MODEL:
+        return "fast"
+    if model == CHAT_STRONG_MODEL:
+        return "strong"
+    return model
+
+
+def choose_chat_model(match_score=None):
+    """FAQ 매칭 점수가 충분히 높으면(기존 답변을 다듬는 수준) 빠른 모델, 아니면 강한 모델"""
+    if match_score is not None and match_score >= CHAT_FAST_MIN_SCORE:
+        return CHAT_FAST_MODEL
+    return CHAT_STRONG_MODEL
+
+
+def _chat_client(timeout=None):
+    """timeout(초)이 있으면 SDK 자체 재시도 없이 그 시간 안에 끝나는 클라이언트"""
+    if timeout is None:
+        return client
+    return client.with_options(timeout=timeout, max_retries=0)
+
+
+def _chat_messages(system_prompt, user_prompt):
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user",   "content": user_prompt},
+    ]
+
+
+def generate_chat_completion(system_prompt, user_prompt, model=CHAT_STRONG_MODEL, temperature=0.3,
+                             timeout=None):
+    start = time.perf_counter()
+    try:
+        resp = _chat_client(timeout).chat.completions.create(
             model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user",   "content": user_prompt},
-            ],
+            messages=_chat_messages(system_prompt, user_prompt),
             max_tokens=600,
             temperature=temperature
         )
         # chatCompletion 응답도 pydantic 모델s
-        return resp.choices[0].message.content.strip()
+        answer = resp.choices[0].message.content.strip()
     except Exception as e:
         print("generate_chat_completion error:", e)
+        chat_stats.record(model, time.perf_counter() - start, ok=False)
         return None
-    
+    usage = getattr(resp, "usage", None)
+    chat_stats.record(
+        model, time.perf_counter() - start, ok=True,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+    )
+    return answer
+
+
+def stream_chat_completion(system_prompt, user_prompt, model=CHAT_STRONG_MODEL, temperature=0.3,
+                           timeout=None, deadline=None):
+    """
+    generate_chat_completion의 스트리밍 버전. 생성되는 텍스트 조각(str)을 순서대로 yield
+    - 오류가 나면 로그만 남기고 중단 (그때까지 받은 조각은 이미 전달됨)
+    - 반환(generator return, `yield from`의 값): 스트림이 끝까지 정상 완료되었으면 True
+    - deadline(time.monotonic() 기준)이 지나면 스트림을 닫고 중단
+      (timeout은 HTTP 읽기 1번의 한도라 스트림 전체 시간을 제한하지 못함)
+    """
+    start = time.perf_counter()
+    ok = False
+    usage = None
+    stream = None
+    try:
+        stream = _chat_client(timeout).chat.completions.create(
+            model=model,
+            messages=_chat_messages(system_prompt, user_prompt),
+            max_tokens=600,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+            if deadline is not None and time.monotonic() >= deadline:
+                print(f"[WARN] stream_chat_completion: {model} stopped at deadline")
+                break
+        else:
+            ok = True
+    except Exception as e:
+        print("stream_chat_completion error:", e)
+    finally:
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+        chat_stats.record(
+            model, time.perf_counter() - start, ok=ok,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+    return ok
+
+
+def chat_deadline(budget=CHAT_LATENCY_BUDGET):
+    """지금부터 budget초 뒤의 deadline (time.monotonic() 기준). 메시지 1건에 하나만 만들어 모든 호출에 전달"""
+    return time.monotonic() + budget
+
+
+def _remaining(deadline):
+    """deadline까지 남은 시간(초). 지났으면 0"""
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def generate_tiered_completion(system_prompt, user_prompt, match_score=None, deadline=None):
+    """
+    match_score에 따라 모델을 골라 답변 생성
+    - deadline: chat_deadline() 결과 (없으면 지금부터 CHAT_LATENCY_BUDGET)
+    - 빠른 모델은 min(CHAT_FAST_TIMEOUT, 남은 시간) 안에 답하지 못하거나 실패하면 강한 모델로 재시도
+    - 강한 모델은 남은 시간을 timeout으로 사용, 남은 시간이 없으면 호출하지 않고 None
+    """
+    deadline = chat_deadline() if deadline is None else deadline
+    model = choose_chat_model(match_score)
+    if model != CHAT_STRONG_MODEL:
+        remaining = _remaining(deadline)
+        if remaining <= 0:
+            return None
+        answer = generate_chat_completion(system_prompt, user_prompt, model=model,
+                                          timeout=min(CHAT_FAST_TIMEOUT, remaining))
+        if answer:
+            return answer
+        chat_stats.count_escalation()
+        print(f"[WARN] {model} failed or timed out, escalating to {CHAT_STRONG_MODEL}")
+    remaining = _remaining(deadline)
+    if remaining <= 0:
+        print("[WARN] chat latency budget exhausted, skipping strong model")
+        return None
+    return generate_chat_completion(system_prompt, user_prompt, model=CHAT_STRONG_MODEL,
+                                    timeout=remaining)
+
 
-    
\ No newline at end of file
+def stream_tiered_completion(system_prompt, user_prompt, match_score=None, deadline=None):
+    """
+    generate_tiered_completion의 스트리밍 버전 (같은 deadline 안에서만 호출/전환)
+    - 빠른 모델이 첫 조각도 보내지 못하고 실패/시간 초과하면 강한 모델 스트림으로 전환
+      (이미 조각을 보낸 뒤의 실패는 전환하지 않음)
+    - 반환(generator return): 마지막 스트림이 정상 완료되었으면 True
+      (deadline/오류로 중간에 끊긴 답변은 False -> 답변 캐시에 저장하지 않음)
+    """
+    deadline = chat_deadline() if deadline is None else deadline
+    model = choose_chat_model(match_score)
+    if model != CHAT_STRONG_MODEL:
+        remaining = _remaining(deadline)
+        if remaining <= 0:
+            return False
+        got_any = False
+        stream = stream_chat_completion(system_prompt, user_prompt, model=model,
+                                        timeout=min(CHAT_FAST_TIMEOUT, remaining), deadline=deadline)
+        try:
+            # 조각을 받았는지와 스트림 반환값(정상 완료 여부)을 함께 알아야 해서 next()로 직접 순회
+            while True:
+                try:
+                    delta = next(stream)
+                except StopIteration as stop:
+                    complete = stop.value
+                    break
+                got_any = True
+                yield delta
+        finally:
+            stream.close()
+        if got_any:
+            return complete
+        chat_stats.count_escalation()
+        print(f"[WARN] {model} failed or timed out, escalating to {CHAT_STRONG_MODEL}")
+    remaining = _remaining(deadline)
+    if remaining <= 0:
+        print("[WARN] chat latency budget exhausted, skipping strong model")
+        return False
+    return (yield from stream_chat_completion(system_prompt, user_prompt, model=CHAT_STRONG_MODEL,
+                                              timeout=remaining, deadline=deadline))
@@ -0,0 +1,331 @@
+# my_slack_bot/modules/profiling.py
+"""
+요청 프로파일링 (운영 중 느린 메시지/폼 처리 원인 분석용, 재배포 없이 켜고 끔)
+- 대상: /slack/events, /slack/actions HTTP 요청 + 메시지 워커의 process_message
+- 선택 방식
+  - sample_rate: 무작위로 이 비율만큼 프로파일링해서 저장
+  - slow_ms    : 0보다 크면 모든 요청을 프로파일링하고, 이 시간 이상 걸린 요청만 저장
+- 결과: PROFILE_DIR에 <이름>.prof (pstats / snakeviz로 열기) + <이름>.json (이벤트 종류, 단계별 소요 시간, 상위 함수 요약)
+- 보관: 최근 PROFILE_MAX_FILES개, PROFILE_MAX_AGE초 이내만 유지 (저장할 때마다 오래된 것부터 삭제)
+- cProfile은 실행한 스레드만 측정하므로, step_executor에서 동시에 돈 단계는 timings(ms)로 확인
+"""
+
+import cProfile
+import glob
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, abort, g, jsonify, request, send_from_directory
+from modules.config import (
+    SECRET_TOKEN,
+    PROFILE_ENABLED,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SLOW_MS,
+    PROFILE_DIR,
+    PROFILE_MAX_FILES,
+    PROFILE_MAX_AGE,
+)
+
+# HTTP 요청 중 프로파일링 대상 경로 -> kind
+PROFILED_PATHS = {
+    "/slack/events": "http_events",
+    "/slack/actions": "http_actions",
+}
+
+_TOP_FUNCTIONS = 30
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class _ProfileRun:
+    __slots__ = ("kind", "profiler", "sampled", "start", "started_at")
+
+    def __init__(self, kind, sampled):
+        self.kind = kind
+        self.sampled = sampled
+        self.profiler = cProfile.Profile()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+
+
+class RequestProfiler:
+    """
+    start(kind) -> 실행 정보(또는 None), finish(run, name, timings, extra)로 종료 후 조건에 맞으면 저장
+    - 같은 스레드에서 이미 프로파일링 중이면 start()는 None (중첩 불가)
+    - 파일 쓰기와 보관 정리는 별도 스레드(profile-writer)에서 처리해 응답을 늦추지 않음
+    - configure(): 실행 중 설정 변경 (프로세스 단위)
+    - stats(): 프로파일링/저장/삭제 건수
+    """
+
+    def __init__(self, directory=PROFILE_DIR, enabled=PROFILE_ENABLED, sample_rate=PROFILE_SAMPLE_RATE,
+                 slow_ms=PROFILE_SLOW_MS, max_files=PROFILE_MAX_FILES, max_age=PROFILE_MAX_AGE):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_age = max_age
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.slow_ms = 0.0
+        self.configure(enabled=enabled, sample_rate=sample_rate, slow_ms=slow_ms)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+        self.profiled = 0
+        self.saved = 0
+        self.pruned = 0
+
+    def configure(self, enabled=None, sample_rate=None, slow_ms=None):
+        """설정 변경. 범위를 벗어나면 ValueError"""
+        if sample_rate is not None:
+            sample_rate = float(sample_rate)
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+        if slow_ms is not None:
+            slow_ms = float(slow_ms)
+            if slow_ms < 0:
+                raise ValueError("slow_ms must be >= 0")
+        if enabled is not None:
+            self.enabled = _as_bool(enabled)
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+
+    def settings(self):
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "directory": self.directory,
+            "max_files": self.max_files,
+            "max_age": self.max_age,
+        }
+
+    def start(self, kind):
+        """프로파일링 시작. 대상이 아니면 None"""
+        if not self.enabled or getattr(self._local, "active", False):
+            return None
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_ms <= 0:
+            return None
+        run = _ProfileRun(kind, sampled)
+        self._local.active = True
+        run.profiler.enable()
+        return run
+
+    def finish(self, run, name="", timings=None, extra=None):
+        """
+        프로파일링 종료. 샘플로 뽑혔거나 slow_ms 이상 걸렸으면 저장 예약
+        반환: 저장 작업 Future (저장하지 않으면 None)
+        """
+        if run is None:
+            return None
+        run.profiler.disable()
+        self._local.active = False
+        duration_ms = (time.perf_counter() - run.start) * 1000
+        with self._lock:
+            self.profiled += 1
+        if not (run.sampled or (self.slow_ms > 0 and duration_ms >= self.slow_ms)):
+            return None
+
+        meta = {
+            "kind": run.kind,
+            "name": name or "",
+            "duration_ms": round(duration_ms, 1),
+            "reason": "sampled" if run.sampled else "slow",
+            "started_at": run.started_at,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "timings": {k: round(v, 1) for k, v in (timings or {}).items()},
+        }
+        if extra:
+            meta.update(extra)
+        return self._writer.submit(self._save, run.profiler, meta)
+
+    def list_profiles(self, limit=50):
+        """저장된 프로파일 메타데이터 (최신순)"""
+        profiles = []
+        for path in self._json_files()[::-1][:limit]:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta.pop("top", None)
+            meta["file"] = os.path.basename(path)[:-len(".json")] + ".prof"
+            profiles.append(meta)
+        return profiles
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "profiled": self.profiled,
+                "saved": self.saved,
+                "pruned": self.pruned,
+            }
+
+    def _save(self, profiler, meta):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(meta["started_at"]))
+            base = "-".join([
+                stamp, meta["kind"], _SAFE_NAME_RE.sub("_", meta["name"])[:40] or "unknown",
+                f"{int(meta['duration_ms'])}ms", uuid.uuid4().hex[:6],
+            ])
+            path = os.path.join(self.directory, base)
+
+            profiler.dump_stats(path + ".prof")
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(_TOP_FUNCTIONS)
+            meta["top"] = out.getvalue()
+            with open(path + ".json", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+
+            with self._lock:
+                self.saved += 1
+            print(f"[INFO] profile saved: {base} ({meta['reason']}, {meta['duration_ms']}ms)")
+            self._prune()
+            return path + ".prof"
+        except Exception as e:
+            print("[WARN] profile save failed:", repr(e))
+            return None
+
+    def _json_files(self):
+        """저장된 .json 경로 (오래된 것부터)"""
+        paths = glob.glob(os.path.join(glob.escape(self.directory), "*.json"))
+        return sorted(paths, key=lambda p: (_mtime(p), p))
+
+    def _prune(self):
+        """보관 개수/기간을 넘은 프로파일 삭제 (오래된 것부터)"""
+        paths = self._json_files()
+        cutoff = time.time() - self.max_age if self.max_age > 0 else None
+        excess = len(paths) - self.max_files if self.max_files > 0 else 0
+        removed = 0
+        for i, path in enumerate(paths):
+            if i >= excess and (cutoff is None or _mtime(path) >= cutoff):
+                continue
+            for p in (path, path[:-len(".json")] + ".prof"):
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        if removed:
+            with self._lock:
+                self.pruned += removed
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+request_profiler = RequestProfiler()
+
+
+# ----------------------------------------------------------------------
+# Flask 연동
+# ----------------------------------------------------------------------
+def install_request_profiling(app):
+    """PROFILED_PATHS 요청을 before_request ~ teardown_request 구간 동안 프로파일링"""
+
+    @app.before_request
+    def _start_request_profile():
+        kind = PROFILED_PATHS.get(request.path)
+        if kind:
+            g.profile_run = request_profiler.start(kind)
+
+    @app.teardown_request
+    def _finish_request_profile(exc):
+        run = g.pop("profile_run", None)
+        if run is not None:
+            request_profiler.finish(run, name=_request_label(), extra={"path": request.path})
+
+
+def _request_label():
+    """
+    프로파일 이름: 이벤트 종류 또는 액션/콜백 ID
+    예) message, url_verification, block_actions:open_parking_form, view_submission:parking_submit
+    """
+    try:
+        if request.path == "/slack/events":
+            body = request.get_json(silent=True) or {}
+            return body.get("event", {}).get("type") or body.get("type", "")
+        payload = json.loads(request.form.get("payload", "") or "{}")
+        if payload.get("type") == "block_actions":
+            actions = payload.get("actions") or [{}]
+            return f"block_actions:{actions[0].get('action_id', '')}"
+        if payload.get("type") == "view_submission":
+            return f"view_submission:{payload.get('view', {}).get('callback_id', '')}"
+        return payload.get("type", "")
+    except Exception:
+        return ""
+
+
+profiling_bp = Blueprint("profiling_bp", __name__)
+
+
+def admin_authorized():
+    """
+    관리용 경로(/admin/profiling, /metrics) 인증
+    X-Admin-Token 또는 Authorization: Bearer 헤더가 SECRET_TOKEN과 같아야 함 (미설정이면 항상 거부)
+    """
+    token = request.headers.get("X-Admin-Token", "")
+    auth = request.headers.get("Authorization", "")
+    if not token and auth.startswith("Bearer "):
+        token = auth[len("Bearer "):]
+    return bool(SECRET_TOKEN) and bool(token) and hmac.compare_digest(token, SECRET_TOKEN)
+
+
+@profiling_bp.route("/admin/profiling", methods=["GET", "POST"])
+def profiling_admin():
+    """
+    GET : 현재 설정 / 통계 / 최근 프로파일 목록
+    POST: {"enabled": true, "sample_rate": 0.05, "slow_ms": 10000} 중 필요한 값만 변경
+          (이 요청을 받은 워커 프로세스에만 적용, 재시작하면 환경 변수 값으로 돌아감)
+    """
+    if not admin_authorized():
+        return jsonify({"error": "forbidden"}), 403
+    if request.method == "POST":
+        data = request.get_json(silent=True) or request.form.to_dict()
+        try:
+            request_profiler.configure(
+                enabled=data.get("enabled"),
+                sample_rate=data.get("sample_rate"),
+                slow_ms=data.get("slow_ms"),
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        print(f"[INFO] profiling settings changed: {request_profiler.settings()}")
+    return jsonify({
+        "pid": os.getpid(),
+        "settings": request_profiler.settings(),
+        "stats": request_profiler.stats(),
+        "profiles": request_profiler.list_profiles(),
+    })
+
+
+@profiling_bp.route("/admin/profiling/<name>", methods=["GET"])
+def profiling_download(name):
+    """저장된 .prof / .json 파일 다운로드"""
+    if not admin_authorized():
+        return jsonify({"error": "forbidden"}), 403
+    if not name.endswith((".prof", ".json")):
+        abort(404)
+    return send_from_directory(os.path.abspath(request_profiler.directory), name, as_attachment=True)
@@ -0,0 +1,82 @@
+# my_slack_bot/modules/query_context.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from modules.config import QUERY_STEP_WORKERS
+from modules.metrics import STAGE_SECONDS, STAGE_TIMEOUTS
+from modules.openai_service import compute_embedding
+
+# 메시지 처리 단계(채널 조회, 임베딩, 부서 분류 등)를 동시에 돌리는 공용 스레드 풀
+# - 스레드는 첫 submit 때 생성되므로 gunicorn fork 이후 각 워커 프로세스에서 만들어짐
+step_executor = ThreadPoolExecutor(max_workers=QUERY_STEP_WORKERS, thread_name_prefix="query-step")
+
+
+class QueryContext:
+    """
+    메시지 1건을 처리하는 동안 FAQ 검색 / 부서 분류 / 프롬프트 생성이 공유하는 정보
+    - text, channel_id, channel_name, user_id, lang
+    - embedding: 사용자 질문 임베딩 (처음 접근할 때 한 번만 계산)
+    - timings : 단계별 소요 시간(ms), 예: {"embedding": 231.4, "faq_search": 0.8}
+    - answer_complete: 생성한 답변이 끝까지 정상 완료되었는지 (deadline/오류로 끊기면 False, 답변 캐시 저장 여부)
+                (같은 값이 metrics.STAGE_SECONDS 히스토그램에도 기록됨)
+    - submit()/result(): 서로 의존하지 않는 단계를 step_executor에서 동시에 실행하고 timeout 안에 결과 수집
+    """
+
+    def __init__(self, text, channel_id="", channel_name="", user_id="", lang="ko"):
+        self.text = text
+        self.channel_id = channel_id
+        self.channel_name = channel_name
+        self.user_id = user_id
+        self.lang = lang
+        self.timings = {}
+        self.answer_complete = False
+        self._embedding = None
+        self._embedding_done = False
+
+    @property
+    def embedding(self):
+        """사용자 질문 임베딩. 실패하면 None (재시도하지 않음)"""
+        if not self._embedding_done:
+            with self.timed("embedding"):
+                self._embedding = compute_embedding(self.text)
+            self._embedding_done = True
+        return self._embedding
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[stage] = elapsed * 1000
+            STAGE_SECONDS.observe(elapsed, stage=stage)
+
+    def submit(self, stage, fn, *args, **kwargs):
+        """fn(*args, **kwargs)을 step_executor에서 실행 (stage가 있으면 소요 시간 기록)"""
+        def run():
+            if stage is None:
+                return fn(*args, **kwargs)
+            with self.timed(stage):
+                return fn(*args, **kwargs)
+        return step_executor.submit(run)
+
+    def result(self, future, stage, timeout, default=None):
+        """
+        future 결과를 timeout(초)까지 기다림
+        - 시간 초과/오류면 default 반환 (실행 중인 단계는 취소되지 않고 백그라운드에서 끝남)
+        """
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            print(f"[WARN] step '{stage}' timed out after {timeout}s")
+            self.timings[f"{stage}_timeout"] = timeout * 1000
+            STAGE_TIMEOUTS.inc(stage=stage, reason="timeout")
+        except Exception as e:
+            print(f"[ERROR] step '{stage}' failed:", repr(e))
+            STAGE_TIMEOUTS.inc(stage=stage, reason="error")
+        return default
+
+    def format_timings(self):
+        return ", ".join(f"{k}={v:.1f}ms" for k, v in self.timings.items())
@@ -0,0 +1,807 @@
+# my_slack_bot/modules/scripts/bench_e2e.py
+"""
+오프라인 end-to-end 부하/재생 벤치마크 (네트워크 불필요)
+
+- 로컬에 가짜 Slack Web API / OpenAI / 시트(Apps Script) 서버를 띄우고
+  SLACK_API_BASE_URL / OPENAI_BASE_URL / GOOGLE_APPS_SCRIPT_URL_DATA_ALL을 그쪽으로 돌린 뒤 create_app() 실행
+- 가짜 서버는 지연(ms)과 오류 비율(HTTP 500)을 주입할 수 있음
+- 서명된 /slack/events (메시지 이벤트, 일부는 Slack 재전송 흉내) + /slack/actions (10개 폼 열기/제출) 요청을
+  지정한 동시성으로 전송하고, 백그라운드 처리(메시지 워커, 알림 대기열)가 끝날 때까지 대기
+- 결과: HTTP 요청 rps / p50 / p99, 메시지·폼 end-to-end 지연, 외부 호출 수, 중복 답변 수 -> JSON
+
+실행 (프로젝트 루트에서):
+  python -m modules.scripts.bench_e2e --messages 200 --forms 50 --concurrency 16 --output bench.json
+  python -m modules.scripts.bench_e2e --openai-latency 300 --chat-latency 800 --slack-error-rate 0.05
+  python -m modules.scripts.bench_e2e --replay recorded.jsonl --compare bench.json
+
+--replay 파일 형식 (JSONL, 한 줄에 요청 1건):
+  {"path": "/slack/events", "body": {...이벤트 콜백 JSON...}}
+  {"path": "/slack/actions", "payload": {...인터랙션 payload...}}
+"""
+
+import argparse
+import base64
+import contextlib
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+EMBEDDING_DIM = 64
+SIGNING_SECRET = "bench-signing-secret"
+
+# 채널 ID -> 이름 (선릉/마포 후처리도 타도록)
+CHANNELS = {
+    "CBENCH001": "선릉-문의",
+    "CBENCH002": "마포-문의",
+    "CBENCH003": "general-문의",
+}
+
+# 가짜 임베딩은 첫 단어가 같으면 비슷한 벡터가 나옴 -> 첫 단어 = 주제
+# (종류, 상세내용, FAQ 질문 목록)
+TOPICS = [
+    ("주차", "주차 등록, 차량 변경, 주차 요금, 방문 차량",
+     ["주차 등록은 어떻게 하나요?", "주차 요금은 얼마인가요?", "주차 방문 차량 등록 방법"]),
+    ("멤버십", "멤버십 가입, 멤버십 해지, 멤버십 혜택",
+     ["멤버십 혜택이 궁금합니다", "멤버십 해지 절차 알려주세요"]),
+    ("고정석/자율석/카드키", "고정석 자율석 카드키 발급 분실 재발급",
+     ["고정석 배정은 어떻게 되나요?", "고정석 카드키를 분실했어요"]),
+    ("홈페이지", "홈페이지 계정, 로그인, 비밀번호, 회사 정보 수정",
+     ["홈페이지 로그인이 안 됩니다", "홈페이지 회사 정보 수정 요청"]),
+    ("네트워크", "네트워크 와이파이 느림, 고정 IP, 인터넷 장애",
+     ["네트워크 와이파이가 느려요", "네트워크 고정 IP 신청 방법"]),
+    ("시설/비품", "시설 비품 엘리베이터 서랍 회의실 고장",
+     ["시설 고장 신고는 어디에 하나요?", "시설 서랍 비밀번호를 잊어버렸어요"]),
+    ("대관", "대관 행사장 회의실 예약 비용",
+     ["대관 신청은 어떻게 하나요?", "대관 비용이 궁금합니다"]),
+]
+
+# 어떤 주제에도 속하지 않는 질문 (-> "기타", 담당자 DM만 전송)
+OTHER_MESSAGES = ["오늘 점심 메뉴 추천해주세요", "다음주 워크숍 일정 아시는 분", "택배 보관 가능한가요"]
+
+ADMIN_IDS = {cat: f"UADMIN{i:02d}" for i, (cat, _, _) in enumerate(TOPICS)}
+ADMIN_IDS["기타"] = "UADMIN99"
+
+
+# ----------------------------------------------------------------------
+# 가짜 임베딩 / 합성 데이터
+# ----------------------------------------------------------------------
+def _hash_vector(text):
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(EMBEDDING_DIM)
+
+
+def fake_embedding(text, noise=0.2):
+    """첫 단어(주제) 벡터 + 문장별 잡음. 같은 주제끼리 코사인 유사도 약 0.96, 다른 주제는 0 근처"""
+    words = text.split()
+    vec = _hash_vector(words[0] if words else "") + noise * _hash_vector(text)
+    return (vec / np.linalg.norm(vec)).astype(np.float32)
+
+
+def dept_rows():
+    rows = [{"종류": cat, "상세내용": detail, "SlackUserID": ADMIN_IDS[cat],
+             "담당부서": f"{cat} 담당", "SlackName": f"admin-{i}"}
+            for i, (cat, detail, _) in enumerate(TOPICS)]
+    rows.append({"종류": "기타", "상세내용": "", "SlackUserID": ADMIN_IDS["기타"],
+                 "담당부서": "운영", "SlackName": "admin-etc"})
+    return rows
+
+
+def build_faq_store(base_path):
+    """주제별 FAQ로 FAQ_EMBEDDINGS_PATH 저장소(.npy + .meta.json) 생성"""
+    from modules.embedding_store import save_embedding_store
+
+    records, vectors = [], []
+    for cat, _, questions in TOPICS:
+        for q in questions:
+            records.append({"question": q, "answer": f"{cat} 관련 안내입니다. ({q})",
+                            "needs_personal_info": "N"})
+            vectors.append(fake_embedding(q))
+    save_embedding_store(base_path, np.vstack(vectors), records)
+    return len(records)
+
+
+# ----------------------------------------------------------------------
+# 가짜 서버
+# ----------------------------------------------------------------------
+class FakeServer(ThreadingHTTPServer):
+    """
+    127.0.0.1 임의 포트에서 도는 가짜 API 서버
+    - latency_ms: 응답 전 대기 시간, error_rate: HTTP 500으로 응답할 비율
+    - counts: 엔드포인트별 호출 수
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler, latency_ms=0.0, error_rate=0.0, seed=0):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self.counts = {}
+        self.errors = {}
+        self._rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name=f"fake-{self.url}", daemon=True).start()
+        return self
+
+    def hit(self, key):
+        """호출 기록 + 지연 주입. 반환: 오류를 주입해야 하면 True"""
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors[key] = self.errors.get(key, 0) + 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return fail
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self):
+        """query string + body(JSON 또는 form) 합친 dict"""
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if raw:
+            if "json" in (self.headers.get("Content-Type") or ""):
+                params.update(json.loads(raw))
+            else:
+                params.update({k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()})
+        return parsed.path, params
+
+    def _send_json(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SlackState:
+    """가짜 Slack이 받은 메시지 전송/수정 기록 (중복 답변, end-to-end 지연 계산용)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.posts = []      # (time, method, channel, thread_ts, ts, text)
+        self.ts_root = {}    # 봇이 보낸 메시지 ts -> 스레드 원글 ts
+        self._seq = 0
+
+    def next_ts(self):
+        with self.lock:
+            self._seq += 1
+            return f"{int(time.time())}.{self._seq:06d}"
+
+    def record(self, method, channel, thread_ts, ts, text):
+        with self.lock:
+            if method == "chat.postMessage" and thread_ts:
+                self.ts_root[ts] = thread_ts
+            self.posts.append((time.perf_counter(), method, channel, thread_ts, ts, text or ""))
+
+
+class SlackHandler(_Handler):
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        path, params = self._params()
+        method = path.rsplit("/", 1)[-1]
+        if self.server.hit(method):
+            return self._send_json({"ok": False, "error": "internal_error"}, status=500)
+        state = self.server.state
+        channel = params.get("channel", "")
+
+        if method == "chat.postMessage":
+            ts = state.next_ts()
+            state.record(method, channel, params.get("thread_ts"), ts, params.get("text"))
+            return self._send_json({"ok": True, "channel": channel, "ts": ts})
+        if method == "chat.update":
+            state.record(method, channel, None, params.get("ts"), params.get("text"))
+            return self._send_json({"ok": True, "channel": channel, "ts": params.get("ts")})
+        if method == "conversations.info":
+            return self._send_json({"ok": True, "channel": {
+                "id": channel, "name": CHANNELS.get(channel, "unknown")}})
+        if method == "conversations.list":
+            return self._send_json({"ok": True, "response_metadata": {"next_cursor": ""}, "channels": [
+                {"id": cid, "name": name} for cid, name in CHANNELS.items()]})
+        if method == "conversations.open":
+            users = params.get("users", "")
+            user = users[0] if isinstance(users, list) else str(users).split(",")[0]
+            return self._send_json({"ok": True, "channel": {"id": f"D{user}"}})
+        if method == "users.info":
+            user = params.get("user", "")
+            return self._send_json({"ok": True, "user": {
+                "id": user, "profile": {"display_name": f"bench-{user}"}}})
+        if method == "users.list":
+            return self._send_json({"ok": True, "members": [], "response_metadata": {"next_cursor": ""}})
+        if method == "views.open":
+            return self._send_json({"ok": True, "view": {"id": f"V{state.next_ts()}"}})
+        return self._send_json({"ok": True})
+
+
+class OpenAIHandler(_Handler):
+    def do_POST(self):
+        path, params = self._params()
+        endpoint = path.rsplit("/", 1)[-1]
+        model = params.get("model", "")
+        if self.server.hit(f"{endpoint}:{model}"):
+            return self._send_json({"error": {"message": "injected error", "type": "server_error"}},
+                                   status=500)
+        if endpoint == "embeddings":
+            return self._embeddings(params)
+        if endpoint == "completions":
+            return self._chat(params)
+        return self._send_json({"error": {"message": "not found"}}, status=404)
+
+    def _embeddings(self, params):
+        inputs = params.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        as_base64 = params.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(inputs):
+            vec = fake_embedding(str(text))
+            emb = base64.b64encode(vec.astype("<f4").tobytes()).decode() if as_base64 else vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        tokens = sum(len(str(t)) for t in inputs)
+        return self._send_json({"object": "list", "data": data, "model": params.get("model"),
+                                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _chat(self, params):
+        model = params.get("model", "")
+        prompt = " ".join(str(m.get("content", "")) for m in params.get("messages", []))
+        answer = "안녕하세요. 문의하신 내용은 FAQ 안내를 참고해 주세요. " * 3
+        usage = {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(answer) // 2,
+                 "total_tokens": (len(prompt) + len(answer)) // 2}
+        if not params.get("stream"):
+            return self._send_json({
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+                "model": model, "usage": usage,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": answer}}],
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(choices, **extra):
+            body = {"id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": model, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(body, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        step = max(1, len(answer) // 8)
+        for i in range(0, len(answer), step):
+            chunk([{"index": 0, "delta": {"content": answer[i:i + step]}, "finish_reason": None}])
+            if self.server.chunk_delay > 0:
+                time.sleep(self.server.chunk_delay)
+        chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (params.get("stream_options") or {}).get("include_usage"):
+            chunk([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class SheetHandler(_Handler):
+    def do_GET(self):
+        self._params()
+        if self.server.hit("manager"):
+            return self._send_json({"error": "injected"}, status=500)
+        return self._send_json({"manager": dept_rows()})
+
+
+# ----------------------------------------------------------------------
+# 요청 생성
+# ----------------------------------------------------------------------
+class WorkItem:
+    """보낼 요청 1건. marker: 답변/DM을 이 요청과 연결하는 문자열 (없으면 스레드 ts로만 연결)"""
+
+    __slots__ = ("kind", "path", "body", "headers", "marker", "root_ts", "sent_at", "status", "latency")
+
+    def __init__(self, kind, path, body, headers=None, marker=None, root_ts=None):
+        self.kind = kind
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+        self.marker = marker
+        self.root_ts = root_ts
+        self.sent_at = None
+        self.status = None
+        self.latency = None
+
+
+def message_event(seq, text, channel, user):
+    ts = f"{1700000000 + seq}.{seq % 1000000:06d}"
+    return {
+        "token": "bench", "team_id": "TBENCH", "api_app_id": "ABENCH", "type": "event_callback",
+        "event_id": f"EvBENCH{seq:08d}", "event_time": int(time.time()),
+        "event": {"type": "message", "channel": channel, "user": user, "text": text, "ts": ts,
+                  "channel_type": "channel", "client_msg_id": f"bench-{seq}"},
+    }
+
+
+def form_values(view, marker):
+    """모달 view의 input 블록마다 유효한 값 채우기 (이메일 칸은 이메일 형식)"""
+    values = {}
+    for block in view.get("blocks", []):
+        if block.get("type") != "input":
+            continue
+        element = block["element"]
+        block_id, action_id = block["block_id"], element["action_id"]
+        if element["type"] == "static_select":
+            state = {"type": "static_select", "selected_option": element["options"][0]}
+        elif "email" in block_id or "email" in action_id:
+            state = {"type": "plain_text_input", "value": f"{marker}@example.com"}
+        else:
+            state = {"type": "plain_text_input", "value": f"{marker} {block_id}"}
+        values[block_id] = {action_id: state}
+    return values
+
+
+def synthetic_workload(args, rng):
+    from modules.forms.registry import FORMS, get_form_view
+
+    items = []
+    topic_messages = [q for _, _, questions in TOPICS for q in questions]
+    for seq in range(args.messages):
+        marker = f"bench-m{seq}"
+        if rng.random() < args.other_ratio:
+            text = f"{rng.choice(OTHER_MESSAGES)} ({marker})"
+        else:
+            text = f"{rng.choice(topic_messages)} ({marker})"
+        body = message_event(seq, text, rng.choice(list(CHANNELS)), f"UUSER{seq % 50:03d}")
+        items.append(WorkItem("message", "/slack/events", body, marker=marker, root_ts=body["event"]["ts"]))
+        if rng.random() < args.retry_ratio:
+            # Slack 재전송 흉내 (같은 event_id, 재시도 헤더) -> 중복 제거되어야 함
+            items.append(WorkItem("message_retry", "/slack/events", body,
+                                  headers={"X-Slack-Retry-Num": "1", "X-Slack-Retry-Reason": "http_timeout"}))
+
+    for seq in range(args.forms):
+        spec = FORMS[seq % len(FORMS)]
+        marker = f"bench-f{seq}"
+        user = {"id": f"UUSER{seq % 50:03d}", "name": f"user{seq}"}
+        items.append(WorkItem("form_open", "/slack/actions", {
+            "type": "block_actions", "trigger_id": f"trigger-{seq}", "user": user,
+            "actions": [{"action_id": spec.action_id, "type": "button", "value": spec.action_id}],
+        }))
+        items.append(WorkItem("form_submit", "/slack/actions", {
+            "type": "view_submission", "user": user,
+            "view": {"callback_id": spec.callback_id,
+                     "state": {"values": form_values(get_form_view(spec.action_id), marker)}},
+        }, marker=marker))
+
+    rng.shuffle(items)
+    return items
+
+
+def replay_workload(path):
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if rec["path"] == "/slack/events":
+                body = rec["body"]
+                items.append(WorkItem("message", rec["path"], body, headers=rec.get("headers"),
+                                      root_ts=(body.get("event") or {}).get("ts")))
+            else:
+                payload = rec.get("payload") or rec.get("body")
+                kind = "form_submit" if payload.get("type") == "view_submission" else "form_open"
+                items.append(WorkItem(kind, rec["path"], payload, headers=rec.get("headers")))
+    return items
+
+
+def sign(body, timestamp):
+    base = f"v0:{timestamp}:".encode("utf-8") + body
+    return "v0=" + hmac.new(SIGNING_SECRET.encode("utf-8"), base, hashlib.sha256).hexdigest()
+
+
+def encode_request(item):
+    """(body bytes, headers) - 이벤트는 JSON, 액션은 form(payload=...), 둘 다 Slack 서명 포함"""
+    if item.path == "/slack/events":
+        body = json.dumps(item.body, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json"
+    else:
+        body = ("payload=" + requests.utils.quote(json.dumps(item.body, ensure_ascii=False))).encode("utf-8")
+        content_type = "application/x-www-form-urlencoded"
+    timestamp = str(int(time.time()))
+    headers = {"Content-Type": content_type, "X-Slack-Request-Timestamp": timestamp,
+               "X-Slack-Signature": sign(body, timestamp), **item.headers}
+    return body, headers
+
+
+def send_all(base_url, items, concurrency, rate):
+    """items를 동시성 concurrency로 전송 (rate > 0이면 초당 rate건 간격으로 시작)"""
+    local = threading.local()
+    start = time.perf_counter()
+
+    def send(index):
+        item = items[index]
+        if rate > 0:
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        body, headers = encode_request(item)
+        item.sent_at = time.perf_counter()
+        try:
+            resp = session.post(base_url + item.path, data=body, headers=headers, timeout=30)
+            item.status = resp.status_code
+        except requests.RequestException:
+            item.status = 0
+        item.latency = time.perf_counter() - item.sent_at
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(len(items))))
+    return time.perf_counter() - start
+
+
+# ----------------------------------------------------------------------
+# 집계
+# ----------------------------------------------------------------------
+def latency_summary(values):
+    if not values:
+        return {"count": 0}
+    arr = np.asarray(values) * 1000
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p90_ms": round(float(np.percentile(arr, 90)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        "max_ms": round(float(arr.max()), 2),
+        "mean_ms": round(float(arr.mean()), 2),
+    }
+
+
+def http_summary(items, elapsed):
+    result = {"total": {"requests": len(items), "elapsed_s": round(elapsed, 3),
+                        "rps": round(len(items) / elapsed, 2) if elapsed else 0.0}}
+    for kind in sorted({i.kind for i in items}):
+        group = [i for i in items if i.kind == kind]
+        summary = latency_summary([i.latency for i in group if i.latency is not None])
+        summary["errors"] = sum(1 for i in group if i.status != 200)
+        result[kind] = summary
+    result["total"].update(latency_summary([i.latency for i in items if i.latency is not None]))
+    result["total"]["errors"] = sum(1 for i in items if i.status != 200)
+    return result
+
+
+def delivery_summary(items, state):
+    """
+    가짜 Slack 기록으로 요청별 답변/DM을 찾아 end-to-end 지연과 중복 답변 계산
+    - 스레드 답변: thread_ts == 원글 ts (스트리밍 placeholder의 chat.update도 원글로 연결)
+    - DM: 본문에 marker 포함
+    """
+    thread_posts, last_seen, dm_by_marker = {}, {}, {}
+    markers = {i.marker: i for i in items if i.marker}
+    with state.lock:
+        posts = list(state.posts)
+        ts_root = dict(state.ts_root)
+    for t, method, channel, thread_ts, ts, text in posts:
+        if channel.startswith("D"):
+            for marker in _markers_in(text, markers):
+                dm_by_marker[marker] = dm_by_marker.get(marker, 0) + 1
+                last_seen[marker] = max(last_seen.get(marker, 0), t)
+            continue
+        root = thread_ts if method == "chat.postMessage" else ts_root.get(ts)
+        if root is None:
+            continue
+        if method == "chat.postMessage":
+            thread_posts[root] = thread_posts.get(root, 0) + 1
+        last_seen[root] = max(last_seen.get(root, 0), t)
+
+    result = {}
+    for kind in ("message", "form_submit"):
+        group = [i for i in items if i.kind == kind and i.status == 200]
+        e2e, missing = [], 0
+        for item in group:
+            done = max(last_seen.get(item.root_ts, 0) if item.root_ts else 0,
+                       last_seen.get(item.marker, 0) if item.marker else 0)
+            if done:
+                e2e.append(done - item.sent_at)
+            else:
+                missing += 1
+        summary = latency_summary(e2e)
+        summary["missing"] = missing
+        result[kind] = summary
+
+    result["duplicates"] = {
+        "thread_replies": sum(n - 1 for n in thread_posts.values() if n > 1),
+        "dms": sum(n - 1 for n in dm_by_marker.values() if n > 1),
+    }
+    return result
+
+
+def _markers_in(text, markers):
+    # marker 형식: bench-m<n> / bench-f<n> (뒤에 숫자가 더 붙은 marker와 구분)
+    found = []
+    start = text.find("bench-")
+    while start != -1:
+        end = start + len("bench-") + 1
+        while end < len(text) and text[end].isdigit():
+            end += 1
+        marker = text[start:end]
+        if marker in markers and marker not in found:
+            found.append(marker)
+        start = text.find("bench-", end)
+    return found
+
+
+def wait_for_drain(timeout):
+    """메시지 워커 큐와 폼 알림 대기열이 빌 때까지 대기. 반환: 걸린 시간(초)"""
+    from modules.notification_queue import notification_dispatcher, notification_queue
+    from modules.slack_events import message_pool
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    done = threading.Event()
+    threading.Thread(target=lambda: (message_pool.join(), done.set()), daemon=True).start()
+    done.wait(timeout)
+    while time.perf_counter() < deadline:
+        counts = notification_queue.counts()
+        if not counts.get("pending") and not counts.get("sending"):
+            break
+        notification_dispatcher.wake()
+        time.sleep(0.05)
+    return time.perf_counter() - start
+
+
+def app_stats():
+    from modules.answer_cache import answer_cache
+    from modules.notification_queue import notification_dispatcher
+    from modules.openai_service import chat_stats
+    from modules.slack_events import event_dedup, message_pool
+    from modules.slack_utils import slack_client
+
+    return {
+        "slack_client": slack_client.stats(),
+        "message_pool": message_pool.stats(),
+        "event_dedup": event_dedup.stats(),
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "openai_chat": chat_stats.snapshot(),
+        "notifications": notification_dispatcher.stats(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+# 회귀 비교에 쓰는 주요 지표 (JSON 경로)
+COMPARE_KEYS = [
+    ("http.total.rps", "higher"),
+    ("http.total.p99_ms", "lower"),
+    ("delivery.message.p50_ms", "lower"),
+    ("delivery.message.p99_ms", "lower"),
+    ("delivery.form_submit.p99_ms", "lower"),
+    ("outbound.slack_total", "lower"),
+    ("outbound.openai_total", "lower"),
+    ("delivery.duplicates.thread_replies", "lower"),
+]
+
+
+def _lookup(result, dotted):
+    for key in dotted.split("."):
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def print_comparison(result, baseline):
+    print(f"\n{'metric':<38} {'baseline':>12} {'current':>12} {'change':>9}")
+    for key, better in COMPARE_KEYS:
+        old, new = _lookup(baseline, key), _lookup(result, key)
+        if old is None or new is None:
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        worse = (new < old) if better == "higher" else (new > old)
+        print(f"{key:<38} {old:>12} {new:>12} {change:>9}{'  !' if worse and old and abs(new - old) / old > 0.1 else ''}")
+
+
+def print_summary(result):
+    http, delivery, outbound = result["http"], result["delivery"], result["outbound"]
+    print(f"\n[bench_e2e] commit={result['commit']} requests={http['total']['requests']} "
+          f"concurrency={result['params']['concurrency']}")
+    print(f"{'':<16} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for kind, s in http.items():
+        print(f"http {kind:<11} {s.get('count', 0):>7} {s.get('p50_ms', 0):>9} {s.get('p99_ms', 0):>9} "
+              f"{s.get('errors', 0):>7}")
+    for kind in ("message", "form_submit"):
+        s = delivery[kind]
+        print(f"e2e  {kind:<11} {s.get('count', 0):>7} {s.get('p50_ms', 0):>9} {s.get('p99_ms', 0):>9} "
+              f"{'missing=' + str(s['missing']):>7}")
+    print(f"rps={http['total']['rps']} drain={result['drain_s']}s "
+          f"slack_calls={outbound['slack_total']} openai_calls={outbound['openai_total']} "
+          f"duplicates={delivery['duplicates']}")
+
+
+# ----------------------------------------------------------------------
+# 실행
+# ----------------------------------------------------------------------
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="오프라인 end-to-end 부하/재생 벤치마크")
+    p.add_argument("--messages", type=int, default=200, help="합성 메시지 이벤트 수")
+    p.add_argument("--forms", type=int, default=50, help="합성 폼 제출 수 (10개 폼을 순서대로, 열기+제출)")
+    p.add_argument("--other-ratio", type=float, default=0.2, help="주제 없는('기타') 메시지 비율")
+    p.add_argument("--retry-ratio", type=float, default=0.1, help="Slack 재전송을 흉내 내 한 번 더 보낼 비율")
+    p.add_argument("--replay", help="합성 대신 재생할 요청 JSONL 파일")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--rate", type=float, default=0.0, help="초당 요청 수 상한 (0이면 제한 없음)")
+    p.add_argument("--slack-latency", type=float, default=20.0, help="가짜 Slack 응답 지연(ms)")
+    p.add_argument("--slack-error-rate", type=float, default=0.0)
+    p.add_argument("--openai-latency", type=float, default=50.0, help="가짜 OpenAI 임베딩 지연(ms)")
+    p.add_argument("--chat-latency", type=float, default=200.0, help="가짜 OpenAI 첫 토큰까지 지연(ms)")
+    p.add_argument("--chat-chunk-delay", type=float, default=20.0, help="스트리밍 조각 사이 지연(ms)")
+    p.add_argument("--openai-error-rate", type=float, default=0.0)
+    p.add_argument("--drain-timeout", type=float, default=120.0, help="백그라운드 처리 대기 한도(초)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--output", help="결과 JSON 파일 경로")
+    p.add_argument("--compare", help="비교할 이전 결과 JSON")
+    p.add_argument("--json", action="store_true", help="요약 대신 결과 JSON을 stdout으로 출력")
+    p.add_argument("--verbose", action="store_true", help="앱 로그를 그대로 출력 (기본: 임시 파일로)")
+    return p.parse_args(argv)
+
+
+def configure_environment(workdir, slack, openai_server, sheet):
+    """앱 모듈(config)을 import하기 전에 호출해야 함"""
+    os.environ.update({
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+        "OPENAI_API_KEY": "sk-bench",
+        "SECRET_TOKEN": "bench",
+        "SLACK_API_BASE_URL": slack.url + "/api/",
+        "OPENAI_BASE_URL": openai_server.url + "/v1",
+        "GOOGLE_APPS_SCRIPT_URL_DATA_ALL": sheet.url + "/exec",
+        "FAQ_EMBEDDINGS_PATH": os.path.join(workdir, "faq"),
+        "NOTIFY_QUEUE_PATH": os.path.join(workdir, "notifications.sqlite3"),
+        "EMBEDDING_CACHE_PATH": "",
+        "DEPT_EMBEDDING_CACHE_PATH": "",
+        "DM_CHANNEL_CACHE_PATH": "",
+        "DEDUP_BACKEND": "memory",
+        "DATA_REFRESH_INTERVAL": "0",
+        "PROFILE_ENABLED": "false",
+    })
+    # 조절 가능한 값은 환경 변수로 덮어쓸 수 있게 기본값만 지정
+    # (토큰 버킷 대기는 실제 Slack 한도 보호용이라 로컬 측정에서는 끔)
+    for key, value in {
+        "SLACK_THROTTLE_MAX_WAIT": "0",
+        "NOTIFY_POLL_INTERVAL": "0.2",
+        "NOTIFY_RETRY_BASE": "0.2",
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="bench-e2e-")
+
+    slack = FakeServer(SlackHandler, args.slack_latency, args.slack_error_rate, seed=args.seed).start()
+    slack.state = SlackState()
+    openai_server = FakeServer(OpenAIHandler, 0.0, args.openai_error_rate, seed=args.seed + 1).start()
+    openai_server.chunk_delay = args.chat_chunk_delay / 1000.0
+    sheet = FakeServer(SheetHandler).start()
+    configure_environment(workdir, slack, openai_server, sheet)
+
+    # 임베딩/채팅 지연을 따로 주기 위해 hit()을 감쌈
+    base_hit = openai_server.hit
+
+    def openai_hit(key):
+        delay = args.chat_latency if key.startswith("completions") else args.openai_latency
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return base_hit(key)
+    openai_server.hit = openai_hit
+
+    log_path = os.path.join(workdir, "app.log")
+    with open(log_path, "w", encoding="utf-8") as log, \
+            (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(log)):
+        from werkzeug.serving import make_server
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+        faq_rows = build_faq_store(os.environ["FAQ_EMBEDDINGS_PATH"])
+        from app import create_app
+        startup = time.perf_counter()
+        flask_app = create_app()
+        startup = time.perf_counter() - startup
+        server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+        threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        # 앱 시작 중 호출(시트/임베딩/채널 캐시)은 측정에서 뺌
+        with slack.lock:
+            startup_slack = dict(slack.counts)
+            slack.counts.clear()
+        with openai_server.lock:
+            startup_openai = dict(openai_server.counts)
+            openai_server.counts.clear()
+
+        items = replay_workload(args.replay) if args.replay else synthetic_workload(args, rng)
+        elapsed = send_all(base_url, items, args.concurrency, args.rate)
+        drain = wait_for_drain(args.drain_timeout)
+        server.shutdown()
+
+    slack_counts, openai_counts = dict(slack.counts), dict(openai_server.counts)
+    return {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "json", "verbose")},
+        "startup_s": round(startup, 3),
+        "faq_rows": faq_rows,
+        "drain_s": round(drain, 3),
+        "http": http_summary(items, elapsed),
+        "delivery": delivery_summary(items, slack.state),
+        "outbound": {
+            "slack": slack_counts,
+            "slack_total": sum(slack_counts.values()),
+            "slack_injected_errors": dict(slack.errors),
+            "openai": openai_counts,
+            "openai_total": sum(openai_counts.values()),
+            "openai_injected_errors": dict(openai_server.errors),
+            "startup": {"slack": startup_slack, "openai": startup_openai},
+        },
+        "app_stats": app_stats(),
+        "app_log": log_path if not args.verbose else None,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_summary(result)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(result, json.load(f))
+    # 앱의 백그라운드 스레드(daemon)는 기다리지 않고 종료
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
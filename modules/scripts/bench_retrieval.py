@@ -0,0 +1,386 @@
+# my_slack_bot/modules/scripts/bench_retrieval.py
+"""
+검색/분류 마이크로 벤치마크 (search_similar_data, classify_by_detail)
+
+- 합성 임베딩 코퍼스(군집 구조, 기본 1k ~ 1M개)를 만들고 검색 방식별로 측정
+  - python_loop: 행마다 cosine_similarity 호출 (예전 방식, --loop-max 이하 크기에서만)
+  - float32    : FaqIndex + search_similar_data (현재 방식, 행렬-벡터 곱 1번)
+  - int8       : 행별 스케일로 양자화한 행렬 (메모리 1/4) x int8 양자화 질문, 정수 곱(int32 누적)
+  - ivf        : k-means 군집(nlist개) 중 가까운 nprobe개만 검색하는 근사 인덱스
+  - dept_classify: DeptIndex + classify_by_detail (부서 행 수는 --dept-max까지)
+- 측정: 인덱스 생성 시간, 질문 1건 지연(p50/p99), 초당 질문 수, recall@k(float32 정확 검색 기준),
+        인덱스 크기, 생성 전후 RSS 차이
+- 결과: 표 출력 + --output JSON
+
+실행 (프로젝트 루트에서):
+  python -m modules.scripts.bench_retrieval                 # 1k ~ 1M, dim 256 (1M에서 최대 약 3GB)
+  python -m modules.scripts.bench_retrieval --sizes 1000,10000,100000 --dim 1536 --output retrieval.json
+  - 기본 dim 256은 1M 행까지 한 번에 측정하기 위한 값. 지연은 dim에 거의 비례하므로
+    ada-002(1536) 기준 수치는 --dim 1536으로 (1M은 약 18GB 필요, --max-memory-mb로 허용)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# 앱 모듈 import 전에: 임베딩 캐시 SQLite 파일을 만들지 않고, OpenAI 키 없이도 import 가능하게
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+for _key in ("EMBEDDING_CACHE_PATH", "DEPT_EMBEDDING_CACHE_PATH", "DM_CHANNEL_CACHE_PATH"):
+    os.environ.setdefault(_key, "")
+
+from modules.data_embedding import FaqIndex, search_similar_data  # noqa: E402
+from modules.dept_service import DeptIndex, classify_by_detail  # noqa: E402
+from modules.embedding_store import normalize_rows  # noqa: E402
+
+_CHUNK_ROWS = 65536
+
+
+# ----------------------------------------------------------------------
+# 합성 데이터
+# ----------------------------------------------------------------------
+def synthetic_corpus(n, dim, rng, spread=0.6):
+    """
+    군집 구조의 정규화된 (n, dim) float32 행렬
+    - 군집 중심과 코사인 유사도 약 1/sqrt(1 + spread^2) (기본 0.86)
+    """
+    clusters = min(1000, max(8, n // 200))
+    centers = normalize_rows(rng.standard_normal((clusters, dim), dtype=np.float32))
+    matrix = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, _CHUNK_ROWS):
+        end = min(n, start + _CHUNK_ROWS)
+        noise = rng.standard_normal((end - start, dim), dtype=np.float32) * (spread / np.sqrt(dim))
+        matrix[start:end] = centers[rng.integers(0, clusters, end - start)] + noise
+        matrix[start:end] = normalize_rows(matrix[start:end])
+    return matrix
+
+
+def synthetic_queries(matrix, count, rng, noise=0.3):
+    """코퍼스 행에 잡음을 더한 질문 (정답 근처 이웃이 있도록)"""
+    dim = matrix.shape[1]
+    rows = matrix[rng.integers(0, matrix.shape[0], count)]
+    return normalize_rows(rows + rng.standard_normal(rows.shape, dtype=np.float32) * (noise / np.sqrt(dim)))
+
+
+def exact_top_k(matrix, queries, k):
+    """float32 정확 검색 결과 (recall 기준)"""
+    truth = []
+    for q in queries:
+        scores = matrix @ q
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        truth.append(set(int(i) for i in top))
+    return truth
+
+
+# ----------------------------------------------------------------------
+# 검색 방식
+# ----------------------------------------------------------------------
+def cosine_similarity(vecA, vecB):
+    """예전 data_embedding.cosine_similarity (행마다 list -> np.array 변환 후 계산). python_loop 기준선용"""
+    if not (vecA and vecB):
+        return 0.0
+    a = np.array(vecA)
+    b = np.array(vecB)
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class LoopBackend:
+    """행마다 cosine_similarity(list, list) 호출 - 예전 search_similar_data 방식"""
+
+    name = "python_loop"
+
+    def __init__(self, matrix):
+        self.rows = matrix.tolist()
+
+    def search(self, q, k):
+        q = q.tolist()
+        scores = [(cosine_similarity(q, row), i) for i, row in enumerate(self.rows)]
+        scores.sort(reverse=True)
+        return [i for _, i in scores[:k]]
+
+    def nbytes(self):
+        return None
+
+
+class Float32Backend:
+    """현재 운영 방식: FaqIndex 행렬 + search_similar_data"""
+
+    name = "float32"
+
+    def __init__(self, matrix):
+        records = [{"question": "", "answer": ""} for _ in range(matrix.shape[0])]
+        self.index = FaqIndex(np.ascontiguousarray(normalize_rows(matrix), dtype=np.float32),
+                              records, version="bench")
+
+    def search(self, q, k):
+        hits = search_similar_data("", top_n=k, min_sim=-1.0, query_embedding=q, index=self.index)
+        return [hit["id"] for hit in hits]
+
+    def nbytes(self):
+        return self.index.matrix.nbytes
+
+
+class Int8Backend:
+    """
+    행별 max-abs 스케일 int8 양자화
+    - 질문도 int8로 양자화해 정수 곱(int32 누적)으로 점수 계산 후 행 스케일만 곱함 (float32 변환 없음)
+    - numpy에는 int8 GEMM(BLAS) 커널이 없어 einsum 정수 루프로 계산하므로,
+      지연은 VNNI 등 int8 전용 커널을 쓰는 검색 엔진보다 느리게 나옴 (메모리/recall 비교가 주 목적)
+    """
+
+    name = "int8"
+
+    def __init__(self, matrix):
+        self.scales = np.abs(matrix).max(axis=1).astype(np.float32) / 127.0
+        self.scales[self.scales == 0] = 1.0
+        self.codes = np.empty(matrix.shape, dtype=np.int8)
+        for start in range(0, matrix.shape[0], _CHUNK_ROWS):
+            end = start + _CHUNK_ROWS
+            self.codes[start:end] = np.round(matrix[start:end] / self.scales[start:end, None])
+
+    def search(self, q, k):
+        # 질문의 스케일은 모든 행에 같으므로 순위에 영향 없음 -> 행 스케일만 곱함
+        q_scale = float(np.abs(q).max()) / 127.0 or 1.0
+        q_codes = np.round(q / q_scale).astype(np.int32)
+        n = self.codes.shape[0]
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _CHUNK_ROWS):
+            end = min(n, start + _CHUNK_ROWS)
+            scores[start:end] = np.einsum("ij,j->i", self.codes[start:end], q_codes) * self.scales[start:end]
+        return _top_k(scores, k)
+
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+
+class IVFBackend:
+    """
+    역색인(IVF) 근사 검색
+    - 구면 k-means로 nlist개 중심 학습 -> 각 행을 가장 가까운 중심 목록에 배정 (목록별로 연속 저장)
+    - 검색: 질문과 가까운 중심 nprobe개의 목록만 행렬-벡터 곱
+    """
+
+    name = "ivf"
+
+    def __init__(self, matrix, nlist=None, nprobe=8, iterations=8, seed=0):
+        n = matrix.shape[0]
+        self.nlist = nlist or max(1, int(np.sqrt(n)))
+        self.nprobe = min(nprobe, self.nlist)
+        rng = np.random.default_rng(seed)
+
+        sample = matrix[rng.choice(n, size=min(n, self.nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            filled = np.bincount(assign, minlength=self.nlist) > 0
+            centroids[filled] = normalize_rows(sums[filled])
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, _CHUNK_ROWS):
+            assign[start:start + _CHUNK_ROWS] = np.argmax(matrix[start:start + _CHUNK_ROWS] @ self.centroids.T, axis=1)
+        self.ids = np.argsort(assign, kind="stable").astype(np.int64)
+        self.matrix = np.ascontiguousarray(matrix[self.ids])
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=self.nlist))])
+
+    def search(self, q, k):
+        probes = _top_k(self.centroids @ q, self.nprobe)
+        ids, scores = [], []
+        for c in probes:
+            start, end = self.offsets[c], self.offsets[c + 1]
+            if end > start:
+                ids.append(self.ids[start:end])
+                scores.append(self.matrix[start:end] @ q)
+        if not ids:
+            return []
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        return [int(ids[i]) for i in _top_k(scores, k)]
+
+    def nbytes(self):
+        return self.matrix.nbytes + self.centroids.nbytes + self.ids.nbytes + self.offsets.nbytes
+
+
+def _top_k(scores, k):
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class DeptClassifyBackend:
+    """부서 분류: 시트 행(list 임베딩) -> DeptIndex, classify_by_detail로 1위 종류 반환"""
+
+    name = "dept_classify"
+
+    def __init__(self, matrix):
+        rows = [{"종류": f"cat{i}", "상세내용": "", "detail_embedding": row}
+                for i, row in enumerate(matrix.tolist())]
+        self.index = DeptIndex(rows)
+
+    def search(self, q, k):
+        cat = classify_by_detail("", self.index, threshold=-1.0, user_emb=q)
+        return [int(cat[len("cat"):])] if cat.startswith("cat") else []
+
+    def nbytes(self):
+        return self.index.matrix.nbytes
+
+
+# ----------------------------------------------------------------------
+# 측정
+# ----------------------------------------------------------------------
+def rss_mb():
+    """현재 프로세스 RSS(MB). /proc 없으면 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(factory, matrix, queries, truth, k):
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    backend = factory(matrix)
+    build_s = time.perf_counter() - start
+    rss_delta = rss_mb() - rss_before
+
+    latencies, hits = [], 0
+    for q, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        found = backend.search(q, k)
+        latencies.append(time.perf_counter() - t0)
+        hits += len(expected.intersection(found))
+    lat = np.asarray(latencies) * 1000
+    nbytes = backend.nbytes()
+    result = {
+        "backend": backend.name,
+        "build_s": round(build_s, 4),
+        "queries": len(latencies),
+        "p50_ms": round(float(np.percentile(lat, 50)), 4),
+        "p99_ms": round(float(np.percentile(lat, 99)), 4),
+        "mean_ms": round(float(lat.mean()), 4),
+        "qps": round(len(lat) / (lat.sum() / 1000), 1) if lat.sum() else None,
+        "recall_at_k": round(hits / sum(len(t) for t in truth), 4) if truth else None,
+        "index_mb": round(nbytes / 2**20, 2) if nbytes is not None else None,
+        "rss_delta_mb": round(rss_delta, 1),
+    }
+    del backend
+    return result
+
+
+def estimated_mb(n, dim):
+    """한 크기를 측정하는 동안 최대 메모리 추정 (코퍼스 + 방식별 float32 복사본 + 정규화 임시 배열, 실측 기준)"""
+    return n * dim * (4 + 4 + 4) / 2**20
+
+
+def run(args):
+    rng = np.random.default_rng(args.seed)
+    results, skipped = [], []
+    for n in args.sizes:
+        need = estimated_mb(n, args.dim)
+        if need > args.max_memory_mb:
+            print(f"[WARN] size={n} dim={args.dim}: needs ~{need:.0f}MB > --max-memory-mb "
+                  f"{args.max_memory_mb}, skipped", file=sys.stderr)
+            skipped.append({"size": n, "estimated_mb": round(need)})
+            continue
+
+        start = time.perf_counter()
+        matrix = synthetic_corpus(n, args.dim, rng)
+        queries = synthetic_queries(matrix, args.queries, rng)
+        truth = exact_top_k(matrix, queries, args.top_k)
+        print(f"[INFO] size={n}: corpus ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        backends = [
+            ("float32", Float32Backend, queries, truth),
+            ("int8", Int8Backend, queries, truth),
+            ("ivf", lambda m: IVFBackend(m, nlist=args.nlist, nprobe=args.nprobe, seed=args.seed),
+             queries, truth),
+        ]
+        if n <= args.loop_max:
+            few = min(args.loop_queries, len(queries))
+            backends.insert(0, ("python_loop", LoopBackend, queries[:few], truth[:few]))
+        if n <= args.dept_max:
+            top1 = [set([max(t, key=lambda i: float(matrix[i] @ q))]) for q, t in zip(queries, truth)]
+            backends.append(("dept_classify", DeptClassifyBackend, queries, top1))
+
+        for name, factory, qs, tr in backends:
+            if args.backends and name not in args.backends:
+                continue
+            k = 1 if name == "dept_classify" else args.top_k
+            row = {"size": n, "dim": args.dim, **measure(factory, matrix, qs, tr, k)}
+            results.append(row)
+            print_row(row)
+        del matrix
+    return results, skipped
+
+
+HEADER = (f"{'size':>9} {'backend':<14} {'build s':>9} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'qps':>9} {'recall':>7} {'index MB':>9} {'rss +MB':>8}")
+
+
+def print_row(row):
+    if not getattr(print_row, "_header", False):
+        print(HEADER)
+        print_row._header = True
+    fmt = lambda v, spec: format(v, spec) if v is not None else "-"  # noqa: E731
+    print(f"{row['size']:>9} {row['backend']:<14} {fmt(row['build_s'], '>9.3f')} {fmt(row['p50_ms'], '>9.3f')} "
+          f"{fmt(row['p99_ms'], '>9.3f')} {fmt(row['qps'], '>9.1f')} {fmt(row['recall_at_k'], '>7.3f')} "
+          f"{fmt(row['index_mb'], '>9.1f')} {fmt(row['rss_delta_mb'], '>8.1f')}", flush=True)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="검색/분류 마이크로 벤치마크")
+    p.add_argument("--sizes", default="1000,10000,100000,1000000",
+                   type=lambda s: [int(x) for x in s.split(",") if x])
+    p.add_argument("--dim", type=int, default=256,
+                   help="임베딩 차원 (기본 256: 1M까지 약 3GB. text-embedding-ada-002 = 1536)")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--top-k", type=int, default=3)
+    p.add_argument("--backends", type=lambda s: [x for x in s.split(",") if x], default=None,
+                   help="측정할 방식만 (예: float32,ivf)")
+    p.add_argument("--nlist", type=int, default=None, help="IVF 군집 수 (기본 sqrt(N))")
+    p.add_argument("--nprobe", type=int, default=8, help="IVF 검색할 군집 수")
+    p.add_argument("--loop-max", type=int, default=5000, help="python_loop을 측정할 최대 크기")
+    p.add_argument("--loop-queries", type=int, default=5, help="python_loop 질문 수")
+    p.add_argument("--dept-max", type=int, default=10000, help="dept_classify를 측정할 최대 행 수")
+    p.add_argument("--max-memory-mb", type=float, default=4096, help="이보다 메모리가 더 필요한 크기는 건너뜀")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", help="결과 JSON 파일 경로")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results, skipped = run(args)
+    report = {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "numpy": np.__version__,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+        "skipped": skipped,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import sys
+
+# 실행: 프로젝트 루트에서
+#   python -m modules.scripts.convert_embeddings_to_store [JSON 경로] [저장소 경로(확장자 없이)]
+from modules.embedding_store import convert_json_to_store, store_paths
+
+DEFAULT_JSON_PATH  = "data/combined_slack_dcamp_embeddings.json"
+DEFAULT_STORE_PATH = "data/combined_slack_dcamp_embeddings"
+
+
+def main():
+    json_path  = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_JSON_PATH
+    store_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_STORE_PATH
+
+    meta = convert_json_to_store(json_path, store_path)
+    npy_path, meta_path = store_paths(store_path)
+    print(f"[완료] {json_path} -> {npy_path}, {meta_path}")
+    print(f"       count={meta['count']} dim={meta['dim']} checksum={meta['checksum']}")
+
+
+if __name__ == "__main__":
+    main()
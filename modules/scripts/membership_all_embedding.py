@@ -1,15 +1,21 @@
 import os
-import json
+import hashlib
+import numpy as np
 import requests
-import openai
 from dotenv import load_dotenv
 
+# 실행: 프로젝트 루트에서 python -m modules.scripts.membership_all_embedding
+from modules.embedding_store import (
+    load_embedding_store, normalize_rows, save_embedding_store, store_exists, store_paths,
+)
+from modules.openai_service import compute_embeddings
+
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 GOOGLE_APPS_SCRIPT_URL_DATA_ALL = os.getenv("GOOGLE_APPS_SCRIPT_URL_DATA_ALL", "")
 
-openai.api_key = OPENAI_API_KEY
+EMBEDDING_MODEL = "text-embedding-ada-002"
+OUTPUT_BASE = os.path.join("data", "combined_slack_dcamp_embeddings")
 
 
 def fetch_sheet_data():
@@ -96,20 +102,89 @@ def process_slack(slack_rows):
     return results
 
 
-def compute_embedding(text: str):
+def pair_text(question, answer):
+    """임베딩 대상 텍스트"""
+    return f"Q: {question}\nA: {answer}"
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_previous_vectors(base_path, model=EMBEDDING_MODEL):
     """
-    OpenAI의 text-embedding-ada-002 모델로
-    문자열을 벡터(list[float])로 변환
+    이전 저장소에서 {text_hash: 정규화된 벡터}, {질문: 이전 record}를 읽어옴
+    - 저장소가 없거나 모델/포맷 버전이 다르면 빈 값 (전체 재임베딩)
     """
+    if not store_exists(base_path):
+        return {}, {}
     try:
-        response = openai.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
+        matrix, records, meta = load_embedding_store(base_path)
     except Exception as e:
-        print("[오류] compute_embedding error:", e)
-        return None
+        print("[경고] 이전 임베딩 저장소를 읽지 못해 전체 재임베딩합니다:", e)
+        return {}, {}
+    if meta.get("model") != model:
+        print(f"[안내] 모델 변경({meta.get('model')} -> {model}), 전체 재임베딩합니다.")
+        return {}, {}
+
+    vectors, prev_records = {}, {}
+    for i, rec in enumerate(records):
+        h = rec.get("text_hash") or text_hash(pair_text(rec.get("question", ""), rec.get("answer", "")))
+        vectors[h] = matrix[i]
+        prev_records[rec.get("question", "")] = {
+            "question": rec.get("question", ""), "answer": rec.get("answer", ""), "text_hash": h,
+        }
+    return vectors, prev_records
+
+
+def build_incremental(all_pairs, prev_vectors, prev_questions, model=EMBEDDING_MODEL):
+    """
+    이전 벡터를 재사용하고 추가/변경된 쌍만 임베딩
+    - prev_questions: load_previous_vectors의 {질문: 이전 record}
+    반환: (matrix, records, summary)
+    - summary: {"unchanged", "added", "changed", "removed", "failed"} 건수
+    - 임베딩에 실패한 변경 쌍은 이전 벡터/record를 그대로 유지 (failed로 집계), 실패한 추가 쌍은 제외
+    """
+    hashes = [text_hash(pair_text(q, a)) for (q, a) in all_pairs]
+
+    # 새로 임베딩할 쌍 (같은 텍스트는 한 번만)
+    new_texts = {}
+    for (q, a), h in zip(all_pairs, hashes):
+        if h not in prev_vectors and h not in new_texts:
+            new_texts[h] = pair_text(q, a)
+    new_embeddings = compute_embeddings(list(new_texts.values()), model=model, cache=None)
+    new_vectors = {}
+    for h, emb in zip(new_texts.keys(), new_embeddings):
+        if emb is not None:
+            new_vectors[h] = normalize_rows(np.asarray([emb], dtype=np.float32))[0]
+
+    summary = {"unchanged": 0, "added": 0, "changed": 0, "removed": 0, "failed": 0}
+    rows, records = [], []
+    for (q, a), h in zip(all_pairs, hashes):
+        if h in prev_vectors:
+            vec = prev_vectors[h]
+            summary["unchanged"] += 1
+        elif h in new_vectors:
+            vec = new_vectors[h]
+            summary["changed" if q in prev_questions else "added"] += 1
+        else:
+            summary["failed"] += 1
+            prev = prev_questions.get(q)
+            if prev is not None and prev["text_hash"] in prev_vectors:
+                rows.append(prev_vectors[prev["text_hash"]])
+                records.append(dict(prev))
+            continue
+        rows.append(vec)
+        records.append({"question": q, "answer": a, "text_hash": h})
+
+    # 삭제: 이전에 있던 질문이 더 이상 없음 (답변만 바뀐 경우는 "변경")
+    summary["removed"] = len(prev_questions.keys() - {q for (q, _) in all_pairs})
+
+    if rows:
+        matrix = np.ascontiguousarray(np.stack(rows), dtype=np.float32)
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+    return matrix, records, summary
 
 
 def main():
@@ -133,27 +208,29 @@ def main():
         print("[안내] 임베딩할 항목이 없습니다. 종료합니다.")
         return
 
-    # 5) 임베딩 + 결과 구조화
-    result_list = []
-    for (q, a) in all_pairs:
-        text = f"Q: {q}\nA: {a}"
-        emb = compute_embedding(text)
-        if emb is None:
-            continue
-        result_list.append({
-            "question": q,
-            "answer": a,
-            "embedding": emb
-        })
-
-    # 6) 결과를 JSON으로 저장
-    output_dir = "data"
-    os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, "combined_slack_dcamp_embeddings.json")
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(result_list, f, ensure_ascii=False)
-
-    print(f"[완료] 임베딩 {len(result_list)}건 -> {output_file}")
+    # 5) 이전 저장소와 비교해 추가/변경된 쌍만 임베딩(배치 요청)
+    prev_vectors, prev_questions = load_previous_vectors(OUTPUT_BASE)
+    matrix, records, summary = build_incremental(all_pairs, prev_vectors, prev_questions)
+    print(
+        f"[변경 요약] 유지 {summary['unchanged']} / 추가 {summary['added']} / "
+        f"변경 {summary['changed']} / 삭제 {summary['removed']} / 실패 {summary['failed']}"
+    )
+
+    if summary["failed"]:
+        # 일부라도 실패하면 저장하지 않음 (장애 중 실행으로 운영 저장소가 줄어들거나 비는 것 방지)
+        print(f"[오류] 임베딩 실패 {summary['failed']}건, 기존 저장소를 그대로 둡니다. 다시 실행해 주세요.")
+        return
+
+    if (prev_vectors and not (summary["added"] or summary["changed"] or summary["removed"])
+            and set(prev_vectors) == {rec["text_hash"] for rec in records}):
+        print("[안내] 변경 사항이 없어 저장소를 그대로 둡니다.")
+        return
+
+    # 6) 결과를 바이너리 저장소(.npy + .meta.json)로 저장
+    os.makedirs(os.path.dirname(OUTPUT_BASE), exist_ok=True)
+    save_embedding_store(OUTPUT_BASE, matrix, records, model=EMBEDDING_MODEL)
+
+    print(f"[완료] 임베딩 {len(records)}건 -> {', '.join(store_paths(OUTPUT_BASE))}")
 
 
 if __name__ == "__main__":
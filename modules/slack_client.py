@@ -0,0 +1,269 @@
+# my_slack_bot/modules/slack_client.py
+
+import inspect
+import io
+import threading
+import time
+from http.client import HTTPMessage
+from urllib.error import HTTPError, URLError
+
+import requests
+from requests.adapters import HTTPAdapter
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_handlers import (
+    ConnectionErrorRetryHandler,
+    RateLimitErrorRetryHandler,
+    ServerErrorRetryHandler,
+)
+from slack_sdk.http_retry.builtin_interval_calculators import BackoffRetryIntervalCalculator
+from slack_sdk.http_retry.jitter import RandomJitter
+
+# Slack Web API rate limit tier (분당 허용 호출 수)
+# https://api.slack.com/docs/rate-limits
+TIER_LIMITS = {
+    "tier1": 1,
+    "tier2": 20,
+    "tier3": 50,
+    "tier4": 100,
+    "post": 60,  # chat.postMessage: 채널당 초당 1건 수준 (special tier, 채널별 버킷)
+}
+
+METHOD_TIERS = {
+    "chat.postMessage":     "post",
+    "chat.update":          "tier3",
+    "conversations.info":   "tier3",
+    "conversations.open":   "tier3",
+    "conversations.list":   "tier2",
+    "users.info":           "tier4",
+    "users.list":           "tier2",
+    "views.open":           "tier4",
+}
+DEFAULT_TIER = "tier3"
+
+# 채널마다 따로 제한되는 메서드 (버킷을 메서드 + 채널로 나눔)
+PER_CHANNEL_METHODS = {"chat.postMessage"}
+
+# 사용자 상호작용 응답 경로의 메서드: trigger_id가 3초 안에 만료되므로 요청 스레드를 오래 붙잡지 않음
+# (이 시간보다 오래 기다려야 하면 바로 보내고 429 재시도에 맡김)
+INTERACTIVE_METHODS = {"views.open", "views.push"}
+INTERACTIVE_MAX_WAIT = 0.5
+
+
+class TokenBucket:
+    """
+    분당 rate_per_min개 토큰이 채워지는 버킷 (최대 burst개까지 모아둠)
+    - acquire(): 토큰이 없으면 생길 때까지 대기. 대기 시간이 max_wait를 넘으면 기다리지 않고 통과
+      (이 경우 Slack의 429 + Retry-After 재시도에 맡김)
+    """
+
+    def __init__(self, rate_per_min, burst=None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(burst or max(1, rate_per_min // 6))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait=5.0):
+        """대기한 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            if wait > max_wait:
+                # 기다리지 않고 통과, 빌려 쓴 토큰은 돌려놓음
+                self.tokens += 1
+                return 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _CountingMixin:
+    """재시도 handler가 재시도할 때마다 SlackClient 통계에 기록"""
+
+    reason = ""
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def prepare_for_next_attempt(self, **kwargs):
+        self._stats.count_retry(self.reason)
+        super().prepare_for_next_attempt(**kwargs)
+
+
+class CountingRateLimitRetryHandler(_CountingMixin, RateLimitErrorRetryHandler):
+    """429: Retry-After 헤더만큼 기다렸다가 재시도"""
+    reason = "rate_limited"
+
+
+class CountingServerErrorRetryHandler(_CountingMixin, ServerErrorRetryHandler):
+    """5xx: 지수 백오프 후 재시도"""
+    reason = "server_error"
+
+    def _can_retry(self, *, state, request, response=None, error=None):
+        return response is not None and response.status_code in (500, 502, 503, 504)
+
+
+class CountingConnectionErrorRetryHandler(_CountingMixin, ConnectionErrorRetryHandler):
+    """연결 오류: 지수 백오프 후 재시도"""
+    reason = "connection_error"
+
+
+class SlackClientStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}        # method -> 호출 수
+        self.retries = {}      # reason -> 재시도 수
+        self.errors = {}       # method -> 오류 응답(SlackApiError) 수
+        self.throttled = 0     # 토큰 버킷 때문에 대기한 횟수
+        self.throttled_seconds = 0.0
+
+    def count_call(self, method):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def count_error(self, method):
+        with self._lock:
+            self.errors[method] = self.errors.get(method, 0) + 1
+
+    def count_retry(self, reason):
+        with self._lock:
+            self.retries[reason] = self.retries.get(reason, 0) + 1
+
+    def count_throttle(self, waited):
+        with self._lock:
+            self.throttled += 1
+            self.throttled_seconds += waited
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "retries": dict(self.retries),
+                "errors": dict(self.errors),
+                "throttled": self.throttled,
+                "throttled_seconds": self.throttled_seconds,
+            }
+
+
+# requests.Session으로 바꿔 끼우는 slack_sdk 내부 전송 메서드 (slack_sdk에 공개 transport 설정이 없어 비공개 메서드를 재정의)
+# slack_sdk 버전은 requirements.txt에 고정. 버전을 올려 이 메서드가 없어지거나 인자가 바뀌면 시작 시 경고
+_SDK_TRANSPORT_METHOD = "_perform_urllib_http_request_internal"
+_SDK_TRANSPORT_PARAMS = ["self", "url", "req"]
+
+
+def sdk_transport_supported():
+    """설치된 slack_sdk가 재정의하는 전송 메서드를 그대로 갖고 있는지"""
+    method = getattr(WebClient, _SDK_TRANSPORT_METHOD, None)
+    if method is None:
+        return False
+    try:
+        return list(inspect.signature(method).parameters) == _SDK_TRANSPORT_PARAMS
+    except (TypeError, ValueError):
+        return False
+
+
+class SlackClient(WebClient):
+    """
+    Slack WebClient 확장
+    - HTTP keep-alive 커넥션 풀 (requests.Session) 재사용
+    - 메서드별(chat.postMessage는 채널별) 토큰 버킷으로 호출 속도 조절 (한도는 메서드의 rate limit tier)
+      Slack 한도는 tier 전체가 아니라 메서드마다 적용되므로 같은 tier라도 버킷을 나눔
+    - 429(Retry-After), 5xx, 연결 오류 시 백오프 재시도
+    - stats(): 메서드별 호출/오류 수, 재시도 수, 대기(throttle) 통계
+    """
+
+    def __init__(self, token=None, max_retries=3, pool_size=10, throttle_max_wait=5.0, **kwargs):
+        self.client_stats = SlackClientStats()
+        backoff = BackoffRetryIntervalCalculator(backoff_factor=0.5, jitter=RandomJitter())
+        kwargs.setdefault("retry_handlers", [
+            CountingRateLimitRetryHandler(self.client_stats, max_retry_count=max_retries),
+            CountingServerErrorRetryHandler(self.client_stats, max_retry_count=max_retries,
+                                            interval_calculator=backoff),
+            CountingConnectionErrorRetryHandler(self.client_stats, max_retry_count=max_retries,
+                                                interval_calculator=backoff),
+        ])
+        super().__init__(token=token, **kwargs)
+
+        self.throttle_max_wait = throttle_max_wait
+        self._buckets = {}  # method 또는 (method, channel) -> TokenBucket
+        self._buckets_lock = threading.Lock()
+
+        if not sdk_transport_supported():
+            print(f"[WARN] slack_sdk {_SDK_TRANSPORT_METHOD} changed; HTTP connection pooling may be bypassed "
+                  "(check the slack_sdk version pinned in requirements.txt)")
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def api_call(self, api_method, **kwargs):
+        max_wait = self.throttle_max_wait
+        if api_method in INTERACTIVE_METHODS:
+            max_wait = min(max_wait, INTERACTIVE_MAX_WAIT)
+        waited = self._bucket(api_method, kwargs).acquire(max_wait=max_wait)
+        if waited > 0:
+            self.client_stats.count_throttle(waited)
+        self.client_stats.count_call(api_method)
+        try:
+            return super().api_call(api_method, **kwargs)
+        except SlackApiError:
+            self.client_stats.count_error(api_method)
+            raise
+
+    def stats(self):
+        return self.client_stats.snapshot()
+
+    def _bucket(self, api_method, kwargs):
+        """api_method(채널별 메서드면 + channel)에 해당하는 버킷, 없으면 tier 한도로 새로 만듦"""
+        key = api_method
+        if api_method in PER_CHANNEL_METHODS:
+            key = (api_method, _request_channel(kwargs))
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(TIER_LIMITS[METHOD_TIERS.get(api_method, DEFAULT_TIER)])
+                self._buckets[key] = bucket
+            return bucket
+
+    def _perform_urllib_http_request_internal(self, url, req):
+        """
+        urllib(요청마다 새 연결) 대신 requests.Session 커넥션 풀로 전송
+        - slack_sdk 재시도 로직이 그대로 동작하도록 오류는 urllib 예외(HTTPError/URLError)로 변환
+        """
+        if self.proxy is not None or self.ssl is not None or not url.lower().startswith("http"):
+            return super()._perform_urllib_http_request_internal(url, req)
+
+        try:
+            resp = self._session.post(
+                url,
+                data=req.data,
+                headers={k: str(v) for k, v in req.header_items()},
+                timeout=self.timeout,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise URLError(e)
+
+        if resp.status_code >= 400:
+            headers = HTTPMessage()
+            for k, v in resp.headers.items():
+                headers[k] = v
+            raise HTTPError(url, resp.status_code, resp.reason, headers, io.BytesIO(resp.content))
+
+        if resp.headers.get("Content-Type", "").startswith("application/gzip"):
+            return {"status": resp.status_code, "headers": resp.headers, "body": resp.content}
+        resp.encoding = resp.encoding or "utf-8"
+        return {"status": resp.status_code, "headers": resp.headers, "body": resp.text}
+
+
+def _request_channel(kwargs):
+    """api_call 인자(json/params/data)에서 channel 값 추출 (없으면 "")"""
+    for field in ("json", "params", "data"):
+        value = kwargs.get(field)
+        if isinstance(value, dict) and value.get("channel"):
+            return value["channel"]
+    return ""
@@ -1,18 +1,42 @@
 # my_slack_bot/modules/slack_events.py
 
 import re
-from flask import current_app
-from modules.slack_utils import send_message, send_blocks, send_dm_to_admin, get_channel_name
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, request, has_request_context
+from modules.config import (
+    MESSAGE_WORKERS, MESSAGE_QUEUE_SIZE, ANSWER_STREAMING, STREAM_UPDATE_INTERVAL,
+    CHANNEL_LOOKUP_TIMEOUT, EMBEDDING_TIMEOUT, CLASSIFY_TIMEOUT,
+)
+from modules.dedup_store import EventDeduplicator, create_dedup_store
+from modules.metrics import STAGE_SECONDS, MESSAGES_TOTAL
+from modules.profiling import request_profiler
+from modules.slack_utils import (
+    send_message, send_blocks, update_message, send_dm_to_admin, get_channel_name,
+    handle_channel_rename, handle_user_change,
+)
+from modules.answer_cache import answer_cache
 from modules.data_embedding import search_similar_data
-from modules.openai_service import generate_chat_completion
-from modules.dept_service import classify_by_detail, match_dept_info
+from modules.data_snapshot import current_snapshot
+from modules.openai_service import chat_deadline, generate_tiered_completion, stream_tiered_completion
+from modules.dept_service import CLASSIFY_THRESHOLD, classify_by_detail, match_dept_info
+from modules.query_context import QueryContext
+from modules.task_queue import WorkerPool
 
-processed_keys = set()
+# 중복 이벤트 제거 (TTL + 최대 개수 제한, DEDUP_BACKEND로 memory/sqlite 선택)
+event_dedup = EventDeduplicator(create_dedup_store())
+
+# 메시지 처리 파이프라인(임베딩/GPT/Slack 전송)은 워커 풀에서 실행
+# - 이벤트 요청은 검증/중복 제거/큐 등록만 하고 바로 200 응답 (Slack 3초 제한)
+message_pool = WorkerPool("message-worker", workers=MESSAGE_WORKERS, queue_size=MESSAGE_QUEUE_SIZE)
+
+# 스트리밍 중간 갱신(chat.update) 전송 스레드. 메시지 워커가 Slack rate limit 대기로 GPT 스트림을 늦추지 않도록 분리
+stream_update_executor = ThreadPoolExecutor(max_workers=MESSAGE_WORKERS, thread_name_prefix="stream-update")
 
 def register_slack_events(slack_events_adapter):
     @slack_events_adapter.on("message")
     def handle_message(event_data):
-        dept_data = current_app.config.get("DEPT_DATA", [])
         event = event_data.get("event", {})
 
         # (1) 스레드 내 메시지는 무시
@@ -32,103 +56,306 @@ def register_slack_events(slack_events_adapter):
 
         channel_id    = event.get("channel")
         user_id       = event.get("user")
-        text          = event.get("text", "")
         msg_ts        = event.get("ts", "")
-        client_msg_id = event.get("client_msg_id")
-
-        channel_name = get_channel_name(channel_id)
 
         # 메시지 유효성 체크
         if not channel_id or not user_id or not msg_ts:
             return
 
-        # 동일 메시지(중복) 처리 방지
-        unique_key = (channel_id, client_msg_id) if client_msg_id else (channel_id, msg_ts)
-        if unique_key in processed_keys:
+        # 동일 메시지(중복/Slack 재전송) 처리 방지
+        retry_num = request.headers.get("X-Slack-Retry-Num") if has_request_context() else None
+        if event_dedup.is_duplicate(event_data, retry_num=retry_num):
+            print(f"[INFO] duplicate event suppressed: channel={channel_id} ts={msg_ts} retry={retry_num}")
             return
-        processed_keys.add(unique_key)
 
-        # 부서 데이터 유무 검사
-        if not dept_data:
-            parent_ts = event.get("thread_ts", msg_ts)
-            send_message(channel_id, "담당자 시트 데이터를 불러오지 못했습니다.", thread_ts=parent_ts)
-            return
+        # 워커 풀에 등록 후 즉시 반환
+        app = current_app._get_current_object()
+        if not message_pool.submit(run_in_app_context, app, process_message, event):
+            # 큐가 가득 차면 처리하지 않고, Slack 재전송 때 다시 받을 수 있도록 키를 지움
+            event_dedup.forget(event_data)
 
-        # (2) 사용자 입력 언어 감지
-        lang = detect_language(text)
 
-        # (3) FAQ 검색
-        top_data = search_similar_data(text)
-        
-        if not top_data:
-            # FAQ가 전혀 없으면 cat="기타"
-            cat = "기타"
-        else:
-            # FAQ가 있으면 임베딩으로 부서 분류
-            cat = classify_by_detail(text, dept_data)
-            print(f"[DEBUG] classify_by_detail -> cat={cat}")
-
-        # (4) 선릉/마포 후처리 (주차/멤버십/고정석...에 한정)
-        cat = refine_category_by_location(cat, channel_name)
-        print(f"[DEBUG] final cat after location -> {cat}")
-
-        # (5) 만약 cat == "기타"라면 (FAQ 없음 or threshold 미달)
-        # => 채널 답변 없이 DM만 보내고 끝낸다
-        if cat == "기타":
-            dm_text = (
-                f"[{channel_name}] 채널에 문의가 들어왔습니다.\n"
-                f"카테고리를 특정할 수 없어 '기타'로 분류되었습니다.\n"
-                f"사용자 ID: <@{user_id}>\n"
-                f"문의 내용: {text}"
-            )
-            send_dm_to_admin(cat, dm_text)
-            return
+    @slack_events_adapter.on("channel_rename")
+    @slack_events_adapter.on("group_rename")
+    def handle_rename(event_data):
+        # 채널 이름 변경 시 채널 캐시 갱신
+        handle_channel_rename(event_data.get("event", {}))
 
-        # (6) FAQ 존재 & cat != "기타" -> ChatCompletion 이용해 답변 생성
-        best_data = top_data[0]
-        for data in top_data:
-            data.pop("embedding", None)  # embedding 제거 (불필요)
+    @slack_events_adapter.on("user_change")
+    def handle_user_profile_change(event_data):
+        # 프로필 변경 시 사용자 이름 캐시 갱신
+        handle_user_change(event_data.get("event", {}))
 
-        system_prompt = build_system_prompt(lang)
-        user_prompt = f"""User query: {text}
 
-FAQ Question: {best_data['question']}
-FAQ Answer: {best_data['answer']}
-"""
-        raw_answer = generate_chat_completion(system_prompt, user_prompt) or ""
-        answer_body = post_process(raw_answer)
-
-        # (7) 최종 메시지 구성
-        if lang == "ko":
-            final_msg = (
-                f"{answer_body}\n\n"
-                "잠시만 기다려주시면, 유관 부서 담당자가 댓글을 남겨 드릴 것입니다."
-            )
-        else:
-            final_msg = (
-                f"{answer_body}\n\n"
-                "Please wait a moment, the relevant department will post a reply soon."
-            )
-
-        # (8) 블록 빌드 시에는 cat가 "주차(선릉)" 등일 수 있으므로,
-        #     실제 블록은 "주차", "멤버십", "고정석/자율석/카드키", etc...
-        base_cat = get_base_cat(cat)
-        blocks = build_category_blocks(base_cat, final_msg)
-
-        parent_ts = thread_ts or msg_ts
-        if blocks:
-            send_blocks(channel_id, blocks, thread_ts=parent_ts, fallback_text=f"{cat} 안내")
-        else:
-            send_message(channel_id, final_msg, thread_ts=parent_ts)
+def run_in_app_context(app, fn, *args):
+    """워커 스레드에서 Flask app context(app.config 등)를 열고 실행"""
+    with app.app_context():
+        fn(*args)
+
+
+def process_message(event):
+    """
+    메시지 1건 처리 (워커 스레드에서 실행)
+    채널 조회 -> FAQ 검색 -> 부서 분류 -> 답변 생성 -> 스레드 답변 + 담당자 DM
+    - 전체 소요 시간(stage="total")과 처리 결과(outcome)를 metrics에 기록
+    - 프로파일링 대상이면 단계별 소요 시간과 함께 profile 저장 (modules/profiling.py)
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    ctx = QueryContext(event.get("text", ""), channel_id=event.get("channel"), user_id=event.get("user"))
+    run = request_profiler.start("message")
+    try:
+        outcome = _process_message(event, ctx)
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="total")
+        MESSAGES_TOTAL.inc(outcome=outcome)
+        request_profiler.finish(run, name=event.get("type", "message"), timings=ctx.timings,
+                                extra={"outcome": outcome, "channel": event.get("channel")})
+
+
+def _process_message(event, ctx):
+    """process_message 본문. 반환: 처리 결과 (no_dept_data / dm_only / answered / answered_cached)"""
+    # 처리하는 동안에는 시작 시점의 스냅샷 하나만 사용 (도중에 갱신되어도 섞이지 않음)
+    snapshot = current_snapshot()
+    dept_data = snapshot.dept_index
+
+    channel_id = event.get("channel")
+    user_id    = event.get("user")
+    text       = event.get("text", "")
+    msg_ts     = event.get("ts", "")
+    thread_ts  = event.get("thread_ts")
+
+    # 부서 데이터 유무 검사
+    if not dept_data:
+        parent_ts = event.get("thread_ts", msg_ts)
+        send_message(channel_id, "담당자 시트 데이터를 불러오지 못했습니다.", thread_ts=parent_ts)
+        return "no_dept_data"
+
+    # (2) 사용자 입력 언어 감지
+    #     (질문 임베딩은 ctx.embedding에서 한 번만 계산해 FAQ 검색/부서 분류가 공유)
+    ctx.lang = detect_language(text)
+
+    # 서로 의존하지 않는 단계는 동시에 실행
+    #   (채널 이름은 지역 후처리뿐 아니라 담당자 DM에도 쓰이므로 항상 조회)
+    #   채널 조회 ─────────────────────────────┐
+    #   질문 임베딩 ─┬─ FAQ 검색 ───────────────┼─ 카테고리 결정
+    #               └─ 부서 분류 (동시 실행) ───┘
+    channel_future = ctx.submit("channel_lookup", get_channel_name, channel_id)
+    embedding_future = ctx.submit(None, lambda: ctx.embedding)
+    query_emb = ctx.result(embedding_future, "embedding", EMBEDDING_TIMEOUT)
+
+    # (3) FAQ 검색 + 부서 분류
+    classify_future = None
+    if query_emb:
+        classify_future = ctx.submit("classify", classify_by_detail, text, dept_data,
+                                     threshold=CLASSIFY_THRESHOLD, user_emb=query_emb)
+    with ctx.timed("faq_search"):
+        top_data = search_similar_data(text, query_embedding=query_emb,
+                                       index=snapshot.faq_index) if query_emb else []
+
+    if not top_data:
+        # FAQ가 전혀 없으면 cat="기타"
+        cat = "기타"
+    else:
+        # FAQ가 있으면 임베딩으로 부서 분류
+        cat = ctx.result(classify_future, "classify", CLASSIFY_TIMEOUT, default="기타")
+        print(f"[DEBUG] classify_by_detail -> cat={cat}")
+
+    ctx.channel_name = ctx.result(channel_future, "channel_lookup", CHANNEL_LOOKUP_TIMEOUT,
+                                  default="Unknown Channel")
+    channel_name = ctx.channel_name
+
+    # (4) 선릉/마포 후처리 (주차/멤버십/고정석...에 한정)
+    cat = refine_category_by_location(cat, ctx.channel_name)
+    print(f"[DEBUG] final cat after location -> {cat}")
 
-        # (9) 담당자 DM
+    # (5) 만약 cat == "기타"라면 (FAQ 없음 or threshold 미달)
+    # => 채널 답변 없이 DM만 보내고 끝낸다
+    if cat == "기타":
         dm_text = (
             f"[{channel_name}] 채널에 문의가 들어왔습니다.\n"
-            f"문의 내용 기반으로 <{cat}> 카테고리로 분류되었습니다.\n"
+            f"카테고리를 특정할 수 없어 '기타'로 분류되었습니다.\n"
             f"사용자 ID: <@{user_id}>\n"
             f"문의 내용: {text}"
         )
+        with ctx.timed("dm_admin"):
+            send_dm_to_admin(cat, dm_text)
+        print(f"[INFO] process_message timings: {ctx.format_timings()}")
+        return "dm_only"
+
+    # (6) FAQ 존재 & cat != "기타" -> ChatCompletion 이용해 답변 생성
+    best_data = top_data[0]
+    for data in top_data:
+        data.pop("embedding", None)  # embedding 제거 (불필요)
+
+    system_prompt = build_system_prompt(ctx.lang)
+    user_prompt = build_user_prompt(ctx, best_data)
+    parent_ts = thread_ts or msg_ts
+
+    # 같은 FAQ에 대한 비슷한 질문의 답변이 캐시에 있으면 GPT 호출 생략
+    index_version = snapshot.faq_version
+    cached_answer = None
+    if answer_cache is not None:
+        cached_answer = answer_cache.get(best_data["id"], ctx.lang, query_emb, index_version)
+
+    # 스트리밍 모드: "작성 중" 메시지를 먼저 올리고, 생성되는 대로 갱신
+    placeholder_ts = None
+    if ANSWER_STREAMING and cached_answer is None:
+        with ctx.timed("slack_placeholder"):
+            placeholder_ts = send_message(channel_id, PLACEHOLDER_TEXT[ctx.lang], thread_ts=parent_ts)
+
+    # 답변 생성 전체(스트림, 모델 전환, 일반 호출 재시도)가 하나의 deadline(CHAT_LATENCY_BUDGET) 안에서 끝나도록
+    deadline = chat_deadline()
+    with ctx.timed("completion"):
+        if cached_answer is not None:
+            raw_answer = cached_answer
+        elif placeholder_ts:
+            raw_answer = stream_answer(ctx, placeholder_ts, system_prompt, user_prompt,
+                                       match_score=best_data.get("score"), deadline=deadline)
+            if not raw_answer:
+                # 스트림이 아무것도 못 받았으면 남은 시간 안에서만 일반 호출로 한 번 더 시도
+                raw_answer = generate_tiered_completion(system_prompt, user_prompt,
+                                                        match_score=best_data.get("score"),
+                                                        deadline=deadline) or ""
+                ctx.answer_complete = bool(raw_answer)
+        else:
+            raw_answer = generate_tiered_completion(system_prompt, user_prompt,
+                                                    match_score=best_data.get("score"),
+                                                    deadline=deadline) or ""
+            ctx.answer_complete = bool(raw_answer)
+    # 중간에 끊긴 답변(deadline/스트림 오류)은 캐시하지 않음 (비슷한 질문에 TTL 동안 잘린 답변이 나가지 않도록)
+    if answer_cache is not None and cached_answer is None and raw_answer and ctx.answer_complete:
+        answer_cache.set(best_data["id"], ctx.lang, query_emb, raw_answer, index_version)
+    answer_body = post_process(raw_answer)
+
+    # (7) 최종 메시지 구성
+    if ctx.lang == "ko":
+        final_msg = (
+            f"{answer_body}\n\n"
+            "잠시만 기다려주시면, 유관 부서 담당자가 댓글을 남겨 드릴 것입니다."
+        )
+    else:
+        final_msg = (
+            f"{answer_body}\n\n"
+            "Please wait a moment, the relevant department will post a reply soon."
+        )
+
+    # (8) 블록 빌드 시에는 cat가 "주차(선릉)" 등일 수 있으므로,
+    #     실제 블록은 "주차", "멤버십", "고정석/자율석/카드키", etc...
+    base_cat = get_base_cat(cat)
+    blocks = build_category_blocks(base_cat, final_msg)
+
+    with ctx.timed("slack_post"):
+        if placeholder_ts:
+            # 스트리밍으로 올린 메시지를 최종 답변 + 카테고리 버튼으로 교체
+            update_message(channel_id, placeholder_ts,
+                           f"{cat} 안내" if blocks else final_msg, blocks=blocks or None)
+        elif blocks:
+            send_blocks(channel_id, blocks, thread_ts=parent_ts, fallback_text=f"{cat} 안내")
+        else:
+            send_message(channel_id, final_msg, thread_ts=parent_ts)
+
+    # (9) 담당자 DM
+    dm_text = (
+        f"[{channel_name}] 채널에 문의가 들어왔습니다.\n"
+        f"문의 내용 기반으로 <{cat}> 카테고리로 분류되었습니다.\n"
+        f"사용자 ID: <@{user_id}>\n"
+        f"문의 내용: {text}"
+    )
+    with ctx.timed("dm_admin"):
         send_dm_to_admin(cat, dm_text)
+    print(f"[INFO] process_message timings: {ctx.format_timings()}")
+    return "answered" if cached_answer is None else "answered_cached"
+
+
+PLACEHOLDER_TEXT = {
+    "ko": "답변을 작성하고 있습니다... :hourglass_flowing_sand:",
+    "en": "Writing an answer... :hourglass_flowing_sand:",
+}
+
+
+def stream_answer(ctx: QueryContext, message_ts: str, system_prompt: str, user_prompt: str,
+                  interval: float = None, match_score: float = None, deadline: float = None) -> str:
+    """
+    GPT 답변을 스트리밍으로 받으면서 message_ts 메시지를 interval초 간격으로 chat.update
+    - chat.update는 StreamUpdater가 별도 스레드에서 보냄 (Slack 대기 때문에 스트림 읽기가 늦어지지 않음)
+    - match_score: FAQ 매칭 점수 (높으면 빠른 모델 사용, openai_service.choose_chat_model)
+    - deadline: openai_service.chat_deadline() 결과. 지나면 받은 데까지만 사용
+    반환: 전체 답변 원문 (끝까지 정상 완료되었는지는 ctx.answer_complete)
+    """
+    interval = STREAM_UPDATE_INTERVAL if interval is None else interval
+    start = time.perf_counter()
+    parts = []
+    last_update = time.monotonic()
+    updater = StreamUpdater(ctx.channel_id, message_ts)
+    result = {}
+
+    def deltas():
+        result["complete"] = yield from stream_tiered_completion(
+            system_prompt, user_prompt, match_score=match_score, deadline=deadline)
+
+    try:
+        for delta in deltas():
+            if not parts:
+                ctx.timings["first_token"] = (time.perf_counter() - start) * 1000
+            parts.append(delta)
+            now = time.monotonic()
+            if now - last_update >= interval:
+                updater.push(post_process("".join(parts)) + " ▌")
+                last_update = now
+    finally:
+        # 최종 답변으로 교체하기 전에 보내는 중인 중간 갱신이 끝나길 기다림 (늦게 도착해 덮어쓰지 않도록)
+        updater.close()
+    ctx.answer_complete = bool(result.get("complete"))
+    return "".join(parts)
+
+
+class StreamUpdater:
+    """
+    스트리밍 중간 갱신을 stream_update_executor에서 보내는 도우미 (메시지 1건당 하나)
+    - push(text): 기다리지 않고 반환. 전송 중이면 최신 text만 남겨 두었다가 끝나면 이어서 전송 (중간 것은 버림)
+    - close(): 남은 text는 버리고, 전송 중인 갱신이 끝날 때까지 대기
+    """
+
+    def __init__(self, channel_id, ts):
+        self.channel_id = channel_id
+        self.ts = ts
+        self._lock = threading.Lock()
+        self._pending = None
+        self._running = False
+        self._closed = False
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def push(self, text):
+        with self._lock:
+            if self._closed:
+                return
+            self._pending = text
+            if self._running:
+                return
+            self._running = True
+            self._idle.clear()
+        stream_update_executor.submit(self._drain)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._pending = None
+        self._idle.wait()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                text, self._pending = self._pending, None
+                if text is None:
+                    self._running = False
+                    self._idle.set()
+                    return
+            try:
+                update_message(self.channel_id, self.ts, text)
+            except Exception as e:
+                print("[WARN] stream update failed:", repr(e))
 
 
 def build_category_blocks(cat: str, final_msg: str):
@@ -370,6 +597,14 @@ Ensure your final answers are in English only.
 """
 
 
+def build_user_prompt(ctx: QueryContext, best_data: dict) -> str:
+    return f"""User query: {ctx.text}
+
+FAQ Question: {best_data['question']}
+FAQ Answer: {best_data['answer']}
+"""
+
+
 def post_process(answer: str) -> str:
     cleaned = answer.replace("[ko]", "").replace("[en]", "")
     cleaned = cleaned.replace("[한국어]", "").replace("[English]", "")
@@ -1,21 +1,44 @@
 # my_slack_bot/modules/slack_utils.py
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from flask import current_app  # for accessing app.config
-from modules.config import SLACK_BOT_TOKEN
+from modules.data_snapshot import current_snapshot
+from modules.config import (
+    SLACK_BOT_TOKEN, SLACK_API_BASE_URL, CHANNEL_CACHE_TTL, CHANNEL_CACHE_SIZE,
+    USER_CACHE_TTL, USER_CACHE_NEGATIVE_TTL, USER_CACHE_SIZE,
+    SLACK_MAX_RETRIES, SLACK_HTTP_POOL_SIZE, SLACK_THROTTLE_MAX_WAIT,
+)
+from modules.dm_channels import dm_channels
+from modules.slack_client import SlackClient
+from modules.ttl_cache import TTLCache
 
-slack_client = WebClient(token=SLACK_BOT_TOKEN)
+# 모든 Slack Web API 호출(메시지/DM/모달/조회)은 이 클라이언트를 거침
+slack_client = SlackClient(
+    token=SLACK_BOT_TOKEN,
+    base_url=SLACK_API_BASE_URL,
+    max_retries=SLACK_MAX_RETRIES,
+    pool_size=SLACK_HTTP_POOL_SIZE,
+    throttle_max_wait=SLACK_THROTTLE_MAX_WAIT,
+)
+
+# channel_id -> 채널 이름 (채널 이름은 거의 바뀌지 않으므로 TTL 동안 재사용)
+channel_cache = TTLCache(maxsize=CHANNEL_CACHE_SIZE, ttl=CHANNEL_CACHE_TTL)
+
+# user_id -> 표시 이름 (폼 제출 시 users.info 호출 절약, user_change 이벤트로 갱신)
+user_name_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+UNKNOWN_USER = "Unknown User"
 
 def send_message(channel_id, reply_text, thread_ts=None):
+    """메시지 전송 후 메시지 ts 반환 (실패 시 None)"""
     if not reply_text:
         return
     try:
-        slack_client.chat_postMessage(
+        resp = slack_client.chat_postMessage(
             channel=channel_id,
             text=reply_text,
             mrkdwn=True,
             thread_ts=thread_ts  # 여기서 thread_ts 사용
         )
+        return resp.get("ts") if resp else None
     except SlackApiError as e:
         print("send_message error:", e.response["error"])
 
@@ -32,57 +55,214 @@ def send_blocks(channel_id, blocks, fallback_text="", thread_ts=None):
         print("send_blocks error:", e.response["error"])
 
 
+def update_message(channel_id, ts, text, blocks=None):
+    """
+    이미 보낸 메시지(ts)를 chat.update로 수정 (스트리밍 답변 갱신용)
+    - blocks를 주면 text는 알림/대체 텍스트로 쓰임
+    """
+    try:
+        kwargs = {"channel": channel_id, "ts": ts, "text": text or " "}
+        if blocks is not None:
+            kwargs["blocks"] = blocks
+        slack_client.chat_update(**kwargs)
+        return True
+    except SlackApiError as e:
+        print("update_message error:", e.response["error"])
+        return False
+
+
 def send_dm_to_admin(category, text):
     """
     'category'와 'text'를 받아,
-    Flask config에 저장된 CATEGORY_USER_MAP에서
+    현재 데이터 스냅샷의 cat_map(종류 -> SlackUserID)에서
     SlackUserID를 찾아 DM을 전송한다.
 
     - category: 시트의 '종류' 값 (예: '주차', '대관', ...)
     - text:     실제 보낼 메시지 내용
+    - 반환: 전송 성공 여부
     """
-    cat_map = current_app.config.get("CATEGORY_USER_MAP", {})
+    cat_map = current_snapshot().cat_map
     user_id = cat_map.get(category)
 
     if not user_id:
         # 카테고리 맵에 해당 키가 없으면 DM 전송 불가
         print(f"[WARN] category='{category}' not found. No DM sent.")
-        return
+        return False
 
     try:
-        resp = slack_client.conversations_open(users=[user_id])
-        dm_channel = resp["channel"]["id"]
-        slack_client.chat_postMessage(channel=dm_channel, text=text)
+        dm_channel = open_dm_channel(user_id)
+        try:
+            slack_client.chat_postMessage(channel=dm_channel, text=text)
+        except SlackApiError as e:
+            if e.response["error"] != "channel_not_found":
+                raise
+            # 저장된 DM 채널이 더 이상 유효하지 않으면 다시 열어서 한 번 재시도
+            dm_channels.discard(user_id)
+            dm_channel = open_dm_channel(user_id)
+            slack_client.chat_postMessage(channel=dm_channel, text=text)
     except SlackApiError as e:
         print("send_dm_to_admin error:", e.response["error"])
+        return False
+    return True
+
+
+def open_dm_channel(user_id: str) -> str:
+    """
+    user_id와의 DM 채널 ID 반환
+    - dm_channels에 저장되어 있으면 conversations.open 호출 없이 반환
+    """
+    dm_channel = dm_channels.get(user_id)
+    if dm_channel:
+        return dm_channel
+    resp = slack_client.conversations_open(users=[user_id])
+    dm_channel = resp["channel"]["id"]
+    dm_channels.set(user_id, dm_channel)
+    return dm_channel
+
+
+def warm_dm_channels(user_ids):
+    """
+    스냅샷 cat_map의 담당자들과의 DM 채널을 미리 열어 둠 (앱 시작 시)
+    - 이미 저장된 사용자는 API 호출 없음
+    """
+    for user_id in sorted(set(user_ids)):
+        try:
+            open_dm_channel(user_id)
+        except Exception as e:
+            # 한 명이 실패해도(네트워크 오류 포함) 나머지 사용자와 앱 시작은 계속
+            print(f"[WARN] warm_dm_channels error ({user_id}):", _warm_error(e))
+    print(f"[INFO] dm channels warmed: {dm_channels.stats()['size']} users")
 
 
 def get_slack_user_name(user_id: str) -> str:
     """
     Slack Web API (users.info) 호출하여, user_id의 display_name 혹은 real_name 반환
+    - user_name_cache에 있으면 API 호출 없이 반환
+    - 없는 사용자(ok=False, user_not_found)는 USER_CACHE_NEGATIVE_TTL 동안 "Unknown User"로 캐시
     """
+    cached = user_name_cache.get(user_id)
+    if cached is not None:
+        return cached
     try:
         response = slack_client.users_info(user=user_id)
         if response["ok"]:
-            user_profile = response["user"]["profile"]
-            # display_name이 있으면 우선 사용. 없으면 real_name.
-            display_name = user_profile.get("display_name") or user_profile.get("real_name") or user_id
+            display_name = profile_display_name(response["user"], user_id)
+            user_name_cache.set(user_id, display_name)
             return display_name
         else:
             print("[WARN] users_info failed, not ok:", response)
+            user_name_cache.set(user_id, UNKNOWN_USER, ttl=USER_CACHE_NEGATIVE_TTL)
     except SlackApiError as e:
         print("[ERROR] get_slack_user_name:", e.response["error"])
-    return "Unknown User"        
+        if e.response["error"] == "user_not_found":
+            user_name_cache.set(user_id, UNKNOWN_USER, ttl=USER_CACHE_NEGATIVE_TTL)
+    return UNKNOWN_USER
+
+
+def profile_display_name(user: dict, default: str) -> str:
+    user_profile = user.get("profile") or {}
+    # display_name이 있으면 우선 사용. 없으면 real_name.
+    return user_profile.get("display_name") or user_profile.get("real_name") or default
+
+
+def handle_user_change(event):
+    """
+    user_change 이벤트로 사용자 이름 캐시 갱신
+    event 예: {"type": "user_change", "user": {"id": "U123", "profile": {...}}}
+    """
+    user = event.get("user") or {}
+    user_id = user.get("id")
+    if user_id:
+        user_name_cache.set(user_id, profile_display_name(user, user_id))
+
+
+def warm_user_cache():
+    """
+    users.list를 페이지 단위로 조회해 user_name_cache를 미리 채움 (USER_CACHE_WARM=true일 때 앱 시작 시)
+    반환: 캐시에 넣은 사용자 수
+    """
+    count = 0
+    cursor = None
+    try:
+        while True:
+            response = slack_client.users_list(limit=200, cursor=cursor)
+            for user in response.get("members", []):
+                if user.get("id") and not user.get("deleted"):
+                    user_name_cache.set(user["id"], profile_display_name(user, user["id"]))
+                    count += 1
+            cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
+    except Exception as e:
+        # 워밍은 최선 노력: 네트워크 오류도 기록만 하고 앱 시작은 계속
+        print("[WARN] warm_user_cache error:", _warm_error(e))
+    print(f"[INFO] user cache warmed: {count} users")
+    return count
+
 
 def get_channel_name(channel_id: str) -> str:
     """
     채널 ID로부터 채널 이름(#general 등)을 조회해서 반환합니다.
-    실패 시 'Unknown Channel' 리턴
+    - channel_cache에 있으면 API 호출 없이 반환
+    실패 시 'Unknown Channel' 리턴 (실패 결과는 캐시하지 않음)
     """
+    cached = channel_cache.get(channel_id)
+    if cached is not None:
+        return cached
     try:
         response = slack_client.conversations_info(channel=channel_id)
         if response["ok"]:
-            return response["channel"]["name"]
+            name = response["channel"]["name"]
+            channel_cache.set(channel_id, name)
+            return name
     except SlackApiError as e:
         print(f"get_channel_name error: {e.response['error']}")
-    return "Unknown Channel"
\ No newline at end of file
+    return "Unknown Channel"
+
+
+def _warm_error(e):
+    """워밍 실패 로그용 오류 문자열 (SlackApiError면 error 코드, 그 외는 repr)"""
+    if isinstance(e, SlackApiError):
+        return e.response["error"]
+    return repr(e)
+
+
+def warm_channel_cache(types="public_channel,private_channel"):
+    """
+    conversations.list를 페이지 단위로 조회해 channel_cache를 미리 채움 (앱 시작 시)
+    반환: 캐시에 넣은 채널 수
+    """
+    count = 0
+    cursor = None
+    try:
+        while True:
+            response = slack_client.conversations_list(
+                types=types, exclude_archived=True, limit=1000, cursor=cursor
+            )
+            for channel in response.get("channels", []):
+                if channel.get("id") and channel.get("name"):
+                    channel_cache.set(channel["id"], channel["name"])
+                    count += 1
+            cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
+    except Exception as e:
+        # 워밍은 최선 노력: URLError 등 네트워크 오류도 기록만 하고 앱 시작은 계속
+        print("[WARN] warm_channel_cache error:", _warm_error(e))
+    print(f"[INFO] channel cache warmed: {count} channels")
+    return count
+
+
+def handle_channel_rename(event):
+    """
+    channel_rename / group_rename 이벤트로 캐시 갱신
+    event 예: {"type": "channel_rename", "channel": {"id": "C123", "name": "new-name"}}
+    """
+    channel = event.get("channel") or {}
+    channel_id = channel.get("id")
+    if not channel_id:
+        return
+    if channel.get("name"):
+        channel_cache.set(channel_id, channel["name"])
+    else:
+        channel_cache.pop(channel_id)
@@ -0,0 +1,40 @@
+# my_slack_bot/modules/sqlite_store.py
+
+import os
+import sqlite3
+import threading
+
+
+class SqliteStore:
+    """
+    여러 gunicorn 워커(프로세스)와 스레드가 함께 쓰는 로컬 SQLite 파일
+    - 스레드/프로세스마다 커넥션을 따로 열고 (fork 이후 커넥션 공유 방지)
+    - WAL 모드 + busy_timeout으로 동시 읽기/쓰기 처리
+    - autocommit 모드 (isolation_level=None)
+    """
+
+    def __init__(self, path, schema, timeout=5.0):
+        self.path = path
+        self.schema = schema
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.schema)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.conn().execute(sql, params)
@@ -0,0 +1,99 @@
+# my_slack_bot/modules/task_queue.py
+
+import os
+import queue
+import threading
+import time
+
+
+class WorkerPool:
+    """
+    크기가 제한된 작업 큐 + 고정 개수 워커 스레드
+    - submit()은 큐에 넣기만 하고 바로 반환 (큐가 가득 차면 False)
+    - 워커 스레드는 첫 submit 때 시작 (gunicorn fork 이후 각 워커 프로세스에서 생성)
+    - stats(): 큐 길이, 처리 중 개수, 누적 처리/실패/거절 건수
+    """
+
+    def __init__(self, name, workers=4, queue_size=100):
+        self.name = name
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._threads = []
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_depth = 0
+        self.total_wait_ms = 0.0
+
+    def submit(self, fn, *args, **kwargs):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.perf_counter(), fn, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            print(f"[WARN] {self.name}: queue full ({self._queue.maxsize}), task rejected")
+            return False
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def join(self):
+        """큐에 들어간 작업이 모두 끝날 때까지 대기 (테스트/종료용)"""
+        self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_depth": self.max_depth,
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": (self.total_wait_ms / done) if done else 0.0,
+            }
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._threads = []
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            enqueued_at, fn, args, kwargs = self._queue.get()
+            with self._lock:
+                self.in_flight += 1
+                self.total_wait_ms += (time.perf_counter() - enqueued_at) * 1000
+            ok = False
+            try:
+                fn(*args, **kwargs)
+                ok = True
+            except Exception as e:
+                print(f"[ERROR] {self.name}: task failed:", repr(e))
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                self._queue.task_done()
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import pytest
+
+# openai_service는 import 시점에 OpenAI 클라이언트를 만들기 때문에
+# 테스트 환경에서는 더미 키를 넣어둔다. (실제 API 호출은 모두 mock 처리)
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+# 테스트 중에는 디스크 캐시(SQLite) 파일을 만들지 않는다.
+os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+os.environ.setdefault("DEPT_EMBEDDING_CACHE_PATH", "")
+os.environ.setdefault("DM_CHANNEL_CACHE_PATH", "")
+# 폼 알림 대기열은 항상 SQLite 파일이 필요하므로 임시 디렉터리에 만든다.
+os.environ.setdefault("NOTIFY_QUEUE_PATH",
+                      os.path.join(tempfile.mkdtemp(prefix="slack-bot-test-"), "notifications.sqlite3"))
+
+
+@pytest.fixture(autouse=True)
+def _clear_slack_caches():
+    """테스트끼리 Slack 조회 캐시(사용자/채널 이름, DM 채널)와 답변 캐시를 공유하지 않도록 비움"""
+    from modules.answer_cache import answer_cache
+    from modules.dm_channels import dm_channels
+    from modules.slack_utils import channel_cache, user_name_cache
+    channel_cache.clear()
+    user_name_cache.clear()
+    dm_channels.clear()
+    if answer_cache is not None:
+        answer_cache.clear()
+    yield
@@ -0,0 +1,38 @@
+from modules.answer_cache import AnswerCache
+
+
+def test_answer_cache_reuses_answer_for_similar_question():
+    """
+    같은 FAQ + 같은 언어에서 질문 임베딩이 충분히 가까우면 캐시된 답변을 돌려준다.
+    """
+    cache = AnswerCache(min_sim=0.95)
+    cache.set(3, "ko", [1.0, 0.0, 0.0], "주차 등록 답변", index_version="v1")
+
+    assert cache.get(3, "ko", [0.99, 0.05, 0.0], index_version="v1") == "주차 등록 답변"
+    assert cache.get(3, "ko", [0.5, 0.5, 0.0], index_version="v1") is None  # 유사도 미달
+    assert cache.get(3, "en", [1.0, 0.0, 0.0], index_version="v1") is None  # 다른 언어
+    assert cache.get(4, "ko", [1.0, 0.0, 0.0], index_version="v1") is None  # 다른 FAQ
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+
+
+def test_answer_cache_invalidated_when_index_changes():
+    cache = AnswerCache()
+    cache.set(3, "ko", [1.0, 0.0], "old", index_version="v1")
+
+    assert cache.get(3, "ko", [1.0, 0.0], index_version="v2") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_answer_cache_ttl_and_per_key_limit():
+    cache = AnswerCache(per_key=2, ttl=0)
+    cache.set(1, "ko", [1.0, 0.0], "expired")
+    assert cache.get(1, "ko", [1.0, 0.0]) is None
+
+    cache = AnswerCache(per_key=2, min_sim=0.99)
+    cache.set(1, "ko", [1.0, 0.0], "a")
+    cache.set(1, "ko", [0.0, 1.0], "b")
+    cache.set(1, "ko", [0.7, 0.7], "c")
+    assert cache.get(1, "ko", [1.0, 0.0]) is None  # 가장 오래된 항목은 밀려남
+    assert cache.get(1, "ko", [0.0, 1.0]) == "b"
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+import modules.data_embedding as data_embedding
+from modules.data_embedding import FaqIndex, search_similar_data
+
+
+@pytest.fixture
+def sample_index():
+    items = [
+        {"question": "주차 등록", "answer": "A1", "embedding": [1.0, 0.0, 0.0]},
+        {"question": "와이파이", "answer": "A2", "embedding": [0.0, 2.0, 0.0]},
+        {"question": "주차 해지", "answer": "A3", "embedding": [0.9, 0.1, 0.0]},
+        {"question": "임베딩 없음", "answer": "A4"},
+    ]
+    index = FaqIndex.from_items(items)
+    with patch.object(data_embedding, "faq_index", index):
+        yield index
+
+
+def test_faq_index_rows_are_normalized(sample_index):
+    """
+    embedding 없는 항목은 제외되고, 각 행은 float32 단위 벡터여야 한다.
+    """
+    assert len(sample_index) == 3
+    assert sample_index.matrix.dtype == np.float32
+    assert sample_index.matrix.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(np.linalg.norm(sample_index.matrix, axis=1), 1.0, rtol=1e-6)
+    assert "embedding" not in sample_index.records[0]
+
+
+@patch("modules.data_embedding.compute_embedding")
+def test_search_similar_data_top_n_order(mock_emb, sample_index):
+    """
+    점수 높은 순으로 top_n개만 반환하고, id/score 필드를 붙인다.
+    """
+    mock_emb.return_value = [1.0, 0.0, 0.0]
+    results = search_similar_data("주차", top_n=2, min_sim=0.0)
+
+    assert [r["question"] for r in results] == ["주차 등록", "주차 해지"]
+    assert results[0]["id"] == 0
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[0]["score"] >= results[1]["score"]
+
+
+@patch("modules.data_embedding.compute_embedding")
+def test_search_similar_data_min_sim(mock_emb, sample_index):
+    """
+    min_sim 미만 항목은 제외, 1등 점수가 min_sim 미만이면 빈 리스트.
+    """
+    mock_emb.return_value = [0.0, 1.0, 0.0]
+    results = search_similar_data("와이파이", top_n=3, min_sim=0.9)
+    assert [r["answer"] for r in results] == ["A2"]
+
+    mock_emb.return_value = [0.0, 0.0, 1.0]
+    assert search_similar_data("무관한 질문", min_sim=0.5) == []
+
+
+def test_load_data_embeddings_from_binary_store(tmp_path):
+    """
+    JSON -> 바이너리 저장소 변환 후, 행렬은 복사 없이 memmap으로 로드되어야 한다.
+    """
+    import json
+    from modules.embedding_store import convert_json_to_store
+
+    items = [
+        {"question": "주차 등록", "answer": "A1", "embedding": [3.0, 4.0]},
+        {"question": "와이파이", "answer": "A2", "embedding": [0.0, 1.0]},
+    ]
+    json_path = tmp_path / "faq.json"
+    json_path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    base_path = str(tmp_path / "faq")
+    meta = convert_json_to_store(str(json_path), base_path)
+    assert meta["version"] == 1 and meta["count"] == 2 and meta["dim"] == 2
+
+    with patch.object(data_embedding, "faq_index", None):
+        data_embedding.load_data_embeddings(base_path)
+        index = data_embedding.faq_index
+        assert isinstance(index.matrix, np.memmap)
+        np.testing.assert_allclose(index.matrix[0], [0.6, 0.8], rtol=1e-6)
+        assert index.records[1] == {"question": "와이파이", "answer": "A2"}
+        assert index.search([0.0, 1.0], top_n=1) == [(1, pytest.approx(1.0))]
@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import pytest
+
+import modules.data_snapshot as data_snapshot
+from modules.data_embedding import FaqIndex
+
+SHEET_ROWS = [
+    {"종류": "주차", "상세내용": "주차 등록", "SlackUserID": "U1"},
+    {"종류": "기타", "상세내용": "", "SlackUserID": "U3"},
+]
+
+
+def _faq_index(value):
+    return FaqIndex.from_items([{"question": "q", "answer": "a", "embedding": [value, 1.0]}])
+
+
+@pytest.fixture
+def sources():
+    """FAQ 파일 / 부서 시트 / 임베딩 API를 가짜로 바꾸고 호출 횟수를 기록"""
+    state = {"fingerprint": ("v1",), "faq": _faq_index(1.0), "rows": SHEET_ROWS,
+             "faq_loads": 0, "embeds": 0}
+
+    def load_faq_index(path):
+        state["faq_loads"] += 1
+        return state["faq"]
+
+    def embed_dept_rows(rows):
+        state["embeds"] += 1
+        return [dict(row, detail_embedding=[1.0, 0.0]) for row in rows]
+
+    with patch.object(data_snapshot.data_embedding, "faq_source_fingerprint",
+                      side_effect=lambda path: state["fingerprint"]), \
+            patch.object(data_snapshot.data_embedding, "load_faq_index", side_effect=load_faq_index), \
+            patch.object(data_snapshot, "fetch_dept_rows",
+                         side_effect=lambda: [dict(r) for r in state["rows"]] if state["rows"] else None), \
+            patch.object(data_snapshot, "embed_dept_rows", side_effect=embed_dept_rows):
+        yield state
+
+
+def test_build_snapshot_skips_unchanged_sources(sources):
+    """
+    FAQ 파일과 시트 내용이 그대로면 다시 로드/임베딩하지 않고 이전 스냅샷을 그대로 쓴다.
+    """
+    first, changed = data_snapshot.build_snapshot(None)
+    assert changed
+    assert first.cat_map == {"주차": "U1", "기타": "U3"}
+    assert first.dept_index.classify([1.0, 0.0]) == "주차"
+
+    again, changed = data_snapshot.build_snapshot(first)
+    assert not changed and again is first
+    assert sources["faq_loads"] == 1 and sources["embeds"] == 1
+
+    # 시트만 바뀌면 FAQ 인덱스는 재사용
+    sources["rows"] = SHEET_ROWS + [{"종류": "네트워크", "상세내용": "와이파이", "SlackUserID": "U2"}]
+    second, changed = data_snapshot.build_snapshot(first)
+    assert changed
+    assert second.faq_index is first.faq_index
+    assert second.cat_map["네트워크"] == "U2"
+    assert first.cat_map.get("네트워크") is None  # 이전 스냅샷은 그대로
+
+    # 시트 조회 실패 시 이전 부서 데이터 유지
+    sources["rows"] = None
+    sources["fingerprint"] = ("v2",)
+    sources["faq"] = _faq_index(2.0)
+    third, changed = data_snapshot.build_snapshot(second)
+    assert changed
+    assert third.faq_index is sources["faq"]
+    assert third.dept_data is second.dept_data
+
+
+def test_build_snapshot_keeps_previous_dept_data_when_embeddings_missing(sources):
+    """
+    OpenAI 장애로 부서 임베딩이 비어 오면(행은 그대로, detail_embedding=None) 이전 부서 데이터와 해시를 유지하고,
+    다음 갱신 때 다시 임베딩해야 한다.
+    """
+    first, _ = data_snapshot.build_snapshot(None)
+    sources["rows"] = SHEET_ROWS + [{"종류": "네트워크", "상세내용": "와이파이", "SlackUserID": "U2"}]
+
+    with patch.object(data_snapshot, "embed_dept_rows",
+                      side_effect=lambda rows: [dict(row, detail_embedding=None) for row in rows]):
+        second, changed = data_snapshot.build_snapshot(first)
+    assert not changed and second is first
+    assert second.dept_index.classify([1.0, 0.0]) == "주차"
+
+    # 장애가 끝나면 시트가 그대로여도 다음 갱신에서 반영
+    third, changed = data_snapshot.build_snapshot(second)
+    assert changed
+    assert third.cat_map["네트워크"] == "U2"
+    assert third.dept_hash != first.dept_hash
+
+
+def test_snapshot_is_immutable():
+    snapshot = data_snapshot.DataSnapshot(cat_map={"주차": "U1"})
+    with pytest.raises(AttributeError):
+        snapshot.cat_map = {}
+    with pytest.raises(TypeError):
+        snapshot.cat_map["주차"] = "U2"
@@ -0,0 +1,55 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from modules.dedup_store import EventDeduplicator, MemoryDedupStore, SqliteDedupStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryDedupStore(ttl=60, max_size=100)
+    return SqliteDedupStore(path=str(tmp_path / "dedup.sqlite3"), ttl=60, max_size=100)
+
+
+def _event_data(event_id="Ev1", client_msg_id="m-1"):
+    return {"event_id": event_id,
+            "event": {"channel": "C1", "ts": "100.1", "client_msg_id": client_msg_id}}
+
+
+def test_duplicates_are_suppressed_by_reason(store):
+    """
+    같은 event_id(재전송 포함)와 같은 client_msg_id는 한 번만 통과해야 한다.
+    """
+    dedup = EventDeduplicator(store)
+    assert dedup.is_duplicate(_event_data()) is False
+    assert dedup.is_duplicate(_event_data(), retry_num="1") is True
+    assert dedup.is_duplicate(_event_data(event_id="Ev2")) is True
+
+    stats = dedup.stats()
+    assert stats["checked"] == 3
+    assert stats["suppressed"] == {"retry": 1, "event_id": 0, "message": 1}
+
+
+def test_forget_allows_redelivery(store):
+    dedup = EventDeduplicator(store)
+    assert dedup.is_duplicate(_event_data()) is False
+    dedup.forget(_event_data())
+    assert dedup.is_duplicate(_event_data(), retry_num="1") is False
+
+
+def test_keys_expire(store):
+    assert store.add("k") is True
+    assert store.add("k") is False
+    with patch("time.monotonic", return_value=time.monotonic() + 120), \
+         patch("time.time", return_value=time.time() + 120):
+        assert store.add("k") is True
+
+
+def test_memory_store_is_bounded():
+    store = MemoryDedupStore(ttl=60, max_size=2)
+    for key in ("a", "b", "c"):
+        store.add(key)
+    assert len(store) == 2
+    assert not store.seen("a")
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from modules.dept_service import (
+    DeptIndex, classify_by_detail, get_dept_index, get_slack_user_id, match_dept_info,
+)
+
+DEPT_ROWS = [
+    {"종류": "주차", "담당부서": "운영", "SlackName": "kim", "SlackUserID": "U1",
+     "detail_embedding": [1.0, 0.0, 0.0]},
+    {"종류": "네트워크", "담당부서": "IT", "SlackName": "lee", "SlackUserID": "U2",
+     "detail_embedding": [0.0, 3.0, 0.0]},
+    {"종류": "기타", "담당부서": "총무", "SlackName": "park", "SlackUserID": "U3",
+     "detail_embedding": None},
+    {"종류": "주차", "담당부서": "중복", "SlackName": "dup", "SlackUserID": "U9",
+     "detail_embedding": [0.0, 0.0, 1.0]},
+]
+
+
+def test_dept_index_classify():
+    """
+    정규화된 행렬 한 번의 곱으로 가장 가까운 종류를 고르고, threshold 미만이면 "기타".
+    """
+    index = DeptIndex(DEPT_ROWS)
+    assert index.categories == ["주차", "네트워크", "주차"]
+
+    assert classify_by_detail("q", index, user_emb=[0.1, 5.0, 0.0]) == "네트워크"
+    assert classify_by_detail("q", index, user_emb=[0.0, 0.2, 2.0]) == "주차"
+    assert classify_by_detail("q", index, user_emb=[1.0, 1.0, 1.0]) == "기타"  # 0.577 < 0.7
+    assert classify_by_detail("q", DEPT_ROWS, user_emb=[0.1, 5.0, 0.0]) == "네트워크"
+
+
+def test_dept_lookups_use_first_row_per_category():
+    assert match_dept_info("주차", DEPT_ROWS) == "운영 부서 [kim]"
+    assert match_dept_info("없는종류", DEPT_ROWS) == "기타 부서 [기타 담당자]"
+    assert get_slack_user_id("주차", DEPT_ROWS) == "U1"
+    assert get_slack_user_id("기타", DEPT_ROWS) == "U3"
+    assert get_slack_user_id("없는종류", DEPT_ROWS) == ""
+
+
+def test_list_index_is_memoized():
+    assert get_dept_index(DEPT_ROWS) is get_dept_index(DEPT_ROWS)
+    index = DeptIndex(DEPT_ROWS)
+    assert get_dept_index(index) is index
+
+
+def test_embed_dept_rows_reuses_cached_details(tmp_path):
+    """
+    같은 상세내용을 두 번 임베딩하면 두 번째는 API 호출 없이 캐시에서 가져오고, 건수도 호출 단위로 맞아야 한다.
+    """
+    from modules import dept_service
+    from modules.embedding_cache import EmbeddingCache
+    from modules.openai_service import compute_embeddings
+
+    def fake_create(model, input):
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=data)
+
+    cache = EmbeddingCache(path=str(tmp_path / "dept.sqlite3"), table="dept_embeddings")
+    rows = [
+        {"종류": "주차", "상세내용": "주차 등록"},
+        {"종류": "네트워크", "상세내용": "와이파이 비밀번호"},
+        {"종류": "기타", "상세내용": "그 밖의 문의"},
+    ]
+    with patch.object(dept_service, "dept_embedding_cache", cache), \
+            patch("modules.openai_service.client.embeddings.create", side_effect=fake_create) as mock_create:
+        first = dept_service.embed_dept_rows([dict(r) for r in rows])
+        assert mock_create.call_count == 1
+        second = dept_service.embed_dept_rows([dict(r) for r in rows])
+        assert mock_create.call_count == 1  # 두 번째는 API 호출 없음
+
+        counts = {}
+        compute_embeddings(["주차 등록", "와이파이 비밀번호", "새 항목", ""], cache=cache, stats=counts)
+    assert counts == {"cached": 2, "embedded": 1, "failed": 0, "skipped": 1, "requests": 1}
+    assert [r["detail_embedding"] for r in second] == [r["detail_embedding"] for r in first]
+    assert second[2]["detail_embedding"] is None  # "기타"는 임베딩하지 않음
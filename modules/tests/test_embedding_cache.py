@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from modules.embedding_cache import EmbeddingCache
+from modules.openai_service import compute_embedding
+
+
+def _fake_embeddings_response(*vectors):
+    return SimpleNamespace(data=[SimpleNamespace(embedding=v) for v in vectors])
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    """
+    같은 질문은 메모리에서, 재시작(새 인스턴스) 후에는 디스크에서 찾아야 한다.
+    공백 차이는 같은 키로 취급한다.
+    """
+    path = str(tmp_path / "emb.sqlite3")
+    cache = EmbeddingCache(path=path, maxsize=10, ttl=60)
+    assert cache.get("m", "주차 등록 어떻게 하나요") is None
+
+    cache.set("m", "주차 등록 어떻게 하나요", [0.5, 0.25])
+    assert cache.get("m", "  주차 등록   어떻게 하나요 ") == [0.5, 0.25]
+    assert cache.get("other-model", "주차 등록 어떻게 하나요") is None
+
+    restarted = EmbeddingCache(path=path, maxsize=10, ttl=60)
+    assert restarted.get("m", "주차 등록 어떻게 하나요") == [0.5, 0.25]
+    assert restarted.stats()["disk_hits"] == 1
+    assert cache.stats() == pytest.approx({
+        "memory_hits": 1, "disk_hits": 0, "misses": 2, "hit_ratio": 1 / 3, "memory_size": 1,
+    })
+
+
+def test_memory_tier_is_bounded():
+    cache = EmbeddingCache(path="", maxsize=2)
+    for i in range(3):
+        cache.set("m", f"q{i}", [float(i)])
+    assert cache.get("m", "q0") is None
+    assert cache.get("m", "q2") == [2.0]
+
+
+@patch("modules.openai_service.client.embeddings.create")
+def test_compute_embedding_skips_api_on_hit(mock_create):
+    """
+    한 번 계산한 질문은 다시 API를 호출하지 않아야 한다.
+    """
+    mock_create.return_value = _fake_embeddings_response([0.1, 0.2])
+    cache = EmbeddingCache(path="", maxsize=10)
+
+    assert compute_embedding("와이파이가 안 돼요", cache=cache) == [0.1, 0.2]
+    assert compute_embedding("와이파이가 안 돼요", cache=cache) == [0.1, 0.2]
+    mock_create.assert_called_once()
@@ -0,0 +1,45 @@
+import json
+from unittest.mock import patch
+
+from flask import Flask
+
+from modules.forms.registry import FORMS, get_form_view, get_open_handler, get_submit_handler
+from modules.slack_actions import actions_bp
+
+
+def test_registry_entries_resolve():
+    """
+    등록된 모든 폼의 핸들러가 import 되고, 모달 view의 callback_id가 등록표와 일치해야 한다.
+    view는 한 번만 만들되, 호출마다 별도 사본을 반환해 수정이 다음 요청에 새지 않아야 한다.
+    """
+    assert len({spec.action_id for spec in FORMS}) == len(FORMS)
+    assert len({spec.callback_id for spec in FORMS}) == len(FORMS)
+    for spec in FORMS:
+        assert callable(get_open_handler(spec.action_id))
+        assert callable(get_submit_handler(spec.callback_id))
+        view = get_form_view(spec.action_id)
+        assert view["callback_id"] == spec.callback_id
+        view["private_metadata"] = "C123"
+        view["blocks"][0]["element"] = {"mutated": True}
+        fresh = get_form_view(spec.action_id)
+        assert fresh is not view
+        assert "private_metadata" not in fresh
+        assert fresh["blocks"][0].get("element") != {"mutated": True}
+
+    assert get_open_handler("unknown") is None
+    assert get_submit_handler("unknown") is None
+
+
+@patch("modules.slack_utils.slack_client.views_open")
+def test_block_action_opens_registered_modal(mock_views_open):
+    app = Flask(__name__)
+    app.register_blueprint(actions_bp, url_prefix="/")
+    payload = {"type": "block_actions", "trigger_id": "T1",
+               "actions": [{"action_id": "open_parking_modal"}]}
+
+    resp = app.test_client().post("/slack/actions", data={"payload": json.dumps(payload)})
+
+    assert resp.status_code == 200
+    kwargs = mock_views_open.call_args.kwargs
+    assert kwargs["trigger_id"] == "T1"
+    assert kwargs["view"]["callback_id"] == "parking_form_submit"
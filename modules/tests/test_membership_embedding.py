@@ -0,0 +1,124 @@
+import json
+from unittest.mock import patch
+
+import numpy as np
+
+import modules.scripts.membership_all_embedding as membership
+from modules.embedding_store import save_embedding_store, store_paths
+
+
+def _fake_embeddings(texts, model=None, cache=None):
+    """text 길이로 만든 2차원 벡터 (같은 text는 항상 같은 벡터)"""
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+def _save_previous(base_path, pairs, model=membership.EMBEDDING_MODEL):
+    """pairs를 임베딩해 이전 저장소로 저장"""
+    with patch.object(membership, "compute_embeddings", side_effect=_fake_embeddings):
+        matrix, records, _ = membership.build_incremental(pairs, {}, {}, model=model)
+    save_embedding_store(base_path, matrix, records, model=model)
+
+
+def test_build_incremental_reuses_unchanged_and_embeds_only_new(tmp_path):
+    """
+    유지/변경/추가/삭제를 구분하고, 유지된 쌍은 이전 벡터를 그대로 쓰며 API로 보내지 않아야 한다.
+    """
+    base_path = str(tmp_path / "faq")
+    _save_previous(base_path, [("주차", "B1층"), ("와이파이", "dcamp-guest"), ("회의실", "예약 필요")])
+
+    prev_vectors, prev_questions = membership.load_previous_vectors(base_path)
+    assert len(prev_vectors) == 3
+    assert set(prev_questions) == {"주차", "와이파이", "회의실"}
+    assert prev_questions["와이파이"]["answer"] == "dcamp-guest"
+
+    new_pairs = [
+        ("주차", "B1층"),              # 유지
+        ("와이파이", "dcamp-guest-5G"),  # 답변만 변경
+        ("택배", "1층 보관함"),          # 추가 ("회의실"은 삭제)
+    ]
+    with patch.object(membership, "compute_embeddings", side_effect=_fake_embeddings) as mock_emb:
+        matrix, records, summary = membership.build_incremental(new_pairs, prev_vectors, prev_questions)
+
+    assert summary == {"unchanged": 1, "added": 1, "changed": 1, "removed": 1, "failed": 0}
+    sent = mock_emb.call_args.args[0]
+    assert sent == [membership.pair_text("와이파이", "dcamp-guest-5G"), membership.pair_text("택배", "1층 보관함")]
+    assert [rec["question"] for rec in records] == ["주차", "와이파이", "택배"]
+    assert matrix.shape == (3, 2)
+    unchanged_hash = membership.text_hash(membership.pair_text("주차", "B1층"))
+    np.testing.assert_array_equal(matrix[0], prev_vectors[unchanged_hash])
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-6)
+
+
+def test_build_incremental_counts_failed_embeddings():
+    """
+    임베딩에 실패한 쌍은 저장소에서 빠지고 failed로 집계되어야 한다.
+    """
+    with patch.object(membership, "compute_embeddings", return_value=[[1.0, 0.0], None]):
+        matrix, records, summary = membership.build_incremental([("a", "1"), ("b", "2")], {}, {})
+    assert summary["added"] == 1 and summary["failed"] == 1
+    assert [rec["question"] for rec in records] == ["a"]
+    assert matrix.shape == (1, 2)
+
+
+def test_load_previous_vectors_forces_full_rebuild_on_model_or_version_mismatch(tmp_path):
+    """
+    저장소가 없거나, 임베딩 모델이 다르거나, 저장소 포맷 버전이 다르면 빈 값(전체 재임베딩)이어야 한다.
+    """
+    base_path = str(tmp_path / "faq")
+    assert membership.load_previous_vectors(base_path) == ({}, {})
+
+    _save_previous(base_path, [("주차", "B1층")], model="text-embedding-3-small")
+    assert membership.load_previous_vectors(base_path) == ({}, {})
+    vectors, questions = membership.load_previous_vectors(base_path, model="text-embedding-3-small")
+    assert len(vectors) == 1 and set(questions) == {"주차"}
+
+    _save_previous(base_path, [("주차", "B1층")])
+    meta_path = store_paths(base_path)[1]
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    meta["version"] = 999
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    assert membership.load_previous_vectors(base_path) == ({}, {})
+
+    # 전체 재임베딩: 이전 벡터가 없으므로 모든 쌍을 새로 보냄
+    with patch.object(membership, "compute_embeddings", side_effect=_fake_embeddings) as mock_emb:
+        _, _, summary = membership.build_incremental([("주차", "B1층")], {}, {})
+    assert summary == {"unchanged": 0, "added": 1, "changed": 0, "removed": 0, "failed": 0}
+    assert mock_emb.call_count == 1
+
+
+def test_failed_embeddings_keep_previous_vectors_and_store(tmp_path):
+    """
+    변경된 쌍의 임베딩이 실패하면 이전 벡터/record를 유지하고, main()은 저장소를 덮어쓰지 않아야 한다.
+    """
+    base_path = str(tmp_path / "faq")
+    _save_previous(base_path, [("주차", "B1층"), ("와이파이", "dcamp-guest")])
+    before = [open(path, "rb").read() for path in store_paths(base_path)]
+    prev_vectors, prev_questions = membership.load_previous_vectors(base_path)
+
+    new_pairs = [("주차", "B1층"), ("와이파이", "dcamp-guest-5G"), ("택배", "1층 보관함")]
+    with patch.object(membership, "compute_embeddings", side_effect=lambda texts, **kw: [None] * len(texts)):
+        matrix, records, summary = membership.build_incremental(new_pairs, prev_vectors, prev_questions)
+    assert summary == {"unchanged": 1, "added": 0, "changed": 0, "removed": 0, "failed": 2}
+    assert [(rec["question"], rec["answer"]) for rec in records] == [("주차", "B1층"), ("와이파이", "dcamp-guest")]
+    np.testing.assert_array_equal(matrix[1], prev_vectors[prev_questions["와이파이"]["text_hash"]])
+
+    # 장애 중 실행: 저장하지 않음 (이전 저장소 그대로)
+    sheet = {"dcamp": [{"문의 내용": q, "답변": a} for q, a in new_pairs]}
+    with patch.object(membership, "fetch_sheet_data", return_value=sheet), \
+            patch.object(membership, "OUTPUT_BASE", base_path), \
+            patch.object(membership, "compute_embeddings", side_effect=lambda texts, **kw: [None] * len(texts)), \
+            patch.object(membership, "save_embedding_store") as mock_save:
+        membership.main()
+    mock_save.assert_not_called()
+    assert [open(path, "rb").read() for path in store_paths(base_path)] == before
+
+    # 첫 실행(저장소 없음)에서 전부 실패해도 빈 저장소를 만들지 않음
+    empty_base = str(tmp_path / "new")
+    with patch.object(membership, "fetch_sheet_data", return_value=sheet), \
+            patch.object(membership, "OUTPUT_BASE", empty_base), \
+            patch.object(membership, "compute_embeddings", side_effect=lambda texts, **kw: [None] * len(texts)), \
+            patch.object(membership, "save_embedding_store") as mock_save:
+        membership.main()
+    mock_save.assert_not_called()
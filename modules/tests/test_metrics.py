@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from modules.metrics import Counter, Histogram, register_stats, render_metrics, unregister
+
+
+@pytest.fixture
+def registered():
+    """테스트에서 만든 지표/stats 출처를 끝나면 전역 레지스트리에서 제거"""
+    metrics, components = [], []
+    yield metrics, components
+    for metric in metrics:
+        unregister(metric=metric)
+    for component in components:
+        unregister(component=component)
+
+
+def test_histogram_buckets_and_quantile(registered):
+    hist = Histogram("test_latency_seconds", "test", labelnames=("stage",), buckets=(0.1, 1.0))
+    registered[0].append(hist)
+    for value in (0.05, 0.05, 0.5, 2.0):
+        hist.observe(value, stage="embedding")
+
+    assert hist.count(stage="embedding") == 4
+    assert hist.quantile(0.5, stage="embedding") == 0.1
+    assert hist.quantile(0.99, stage="embedding") == float("inf")
+
+    lines = hist.render()
+    assert 'test_latency_seconds_bucket{stage="embedding",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="embedding",le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="embedding",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{stage="embedding"} 4' in lines
+
+
+def test_render_metrics_includes_counters_and_component_stats(registered):
+    counter = Counter("test_calls_total", "test", labelnames=("method",))
+    registered[0].append(counter)
+    counter.inc(method="chat.postMessage")
+    counter.inc(2, method="chat.postMessage")
+    register_stats("test_component", lambda: {"hits": 3, "nested": {"depth": 1}, "name": "skip"})
+    registered[1].append("test_component")
+
+    text = render_metrics()
+    assert "# TYPE test_calls_total counter" in text
+    assert 'test_calls_total{method="chat.postMessage"} 3' in text
+    assert 'slack_bot_component_stat{component="test_component",key="hits"} 3' in text
+    assert 'slack_bot_component_stat{component="test_component",key="nested.depth"} 1' in text
+    assert "skip" not in text
+
+
+def test_unregister_removes_from_output():
+    counter = Counter("test_removed_total", "test")
+    register_stats("test_removed", lambda: {"hits": 1})
+    unregister(metric=counter, component="test_removed")
+
+    text = render_metrics()
+    assert "test_removed_total" not in text
+    assert 'component="test_removed"' not in text
+
+
+def test_metrics_route_requires_token():
+    from app import metrics_view
+    app = Flask(__name__)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+    client = app.test_client()
+
+    with patch("modules.profiling.SECRET_TOKEN", "s3cret"):
+        assert client.get("/metrics").status_code == 403
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+        resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+        assert resp.status_code == 200
+        assert "# TYPE slack_bot_stage_seconds histogram" in resp.get_data(as_text=True)
@@ -0,0 +1,97 @@
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from modules.forms.parking_form import submit_parking_form
+from modules.notification_queue import NotificationDispatcher, NotificationQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return NotificationQueue(path=str(tmp_path / "notifications.sqlite3"), max_attempts=2, retry_base=0)
+
+
+@patch("modules.notification_queue.get_slack_user_name", return_value="홍길동")
+@patch("modules.notification_queue.send_dm_to_admin")
+def test_dispatcher_retries_then_gives_up(mock_send, mock_name, queue):
+    """
+    전송 성공한 알림은 삭제, 실패하면 재시도 후 max_attempts를 넘으면 dead로 남긴다.
+    """
+    dispatcher = NotificationDispatcher(queue)
+    queue.enqueue("주차", "주차 등록 신청", "U1", "- 차량번호: 12가3456")
+
+    mock_send.side_effect = [False, True]
+    dispatcher.dispatch_due()
+    assert queue.counts() == {}
+    category, text = mock_send.call_args.args
+    assert category == "주차"
+    assert text == "*[주차 등록 신청]*\n작성자: 홍길동\n- 차량번호: 12가3456"
+
+    queue.enqueue("주차", "차량 해지/변경", "U1", "body")
+    mock_send.side_effect = RuntimeError("slack down")
+    dispatcher.dispatch_due()
+    assert queue.counts() == {"dead": 1}
+    assert dispatcher.stats()["sent"] == 1 and dispatcher.stats()["dead"] == 1
+
+
+def test_claimed_notification_is_not_claimed_twice(queue):
+    queue.enqueue("주차", "t", "U1", "b")
+    assert len(queue.claim_due()[1]) == 1
+    assert queue.claim_due()[1] == []
+
+
+def test_expired_claim_cannot_be_marked_by_old_owner(queue, monkeypatch):
+    """
+    lease가 만료되어 다른 워커가 다시 가져간 알림은 이전 워커가 renew / mark_sent / mark_failed 할 수 없다.
+    """
+    notification_id = queue.enqueue("주차", "t", "U1", "b")
+    old_token, _ = queue.claim_due()
+
+    now = time.time()
+    monkeypatch.setattr("modules.notification_queue.time.time", lambda: now + 121)
+    new_token, rows = queue.claim_due()
+    assert [row[0] for row in rows] == [notification_id]
+
+    assert queue.renew(notification_id, old_token) is False
+    assert queue.mark_sent(notification_id, old_token) is False
+    assert queue.mark_failed(notification_id, old_token, 5, "late") is False
+    assert queue.counts() == {"sending": 1}
+
+    assert queue.renew(notification_id, new_token) is True
+    assert queue.mark_sent(notification_id, new_token) is True
+    assert queue.counts() == {}
+
+
+def _parking_payload(email="owner@example.com"):
+    def text(value):
+        return {"type": "plain_text_input", "value": value}
+    values = {
+        "email_block": {"owner_email": text(email)},
+        "name_block": {"owner_name": text("홍길동")},
+        "phone_block": {"phone_number": text("010-0000-0000")},
+        "car_number_block": {"car_number": text("12가3456")},
+        "car_type_block": {"car_type": text("SUV")},
+        "ev_block": {"is_ev": {"selected_option": {"value": "yes"}}},
+    }
+    return {"user": {"id": "U1"}, "view": {"state": {"values": values}}}
+
+
+@patch("modules.forms.form_utils.enqueue_admin_notification")
+def test_form_submit_enqueues_and_closes_modal(mock_enqueue):
+    """
+    폼 제출은 Slack API 호출 없이 알림만 대기열에 넣고 바로 모달을 닫아야 한다.
+    """
+    from flask import Flask
+    with Flask(__name__).app_context():
+        resp = submit_parking_form(_parking_payload())
+        assert json.loads(resp.get_data()) == {"response_action": "clear"}
+        category, title, user_id, body = mock_enqueue.call_args.args
+        assert (category, title, user_id) == ("주차", "주차 등록 신청", "U1")
+        assert "- 전기차: 예" in body
+
+        resp = submit_parking_form(_parking_payload(email="not-an-email"))
+        assert json.loads(resp.get_data())["response_action"] == "errors"
+        assert "email_block" in json.loads(resp.get_data())["errors"]
+        assert mock_enqueue.call_count == 1
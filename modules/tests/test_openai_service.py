@@ -0,0 +1,159 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+from openai import BadRequestError
+
+import modules.openai_service as openai_service
+from modules.openai_service import compute_embeddings, generate_tiered_completion
+
+
+def _fake_create(model, input):
+    """입력 text 길이를 임베딩 값으로 돌려주는 가짜 embeddings.create ("bad"는 400 오류)"""
+    if any(text == "bad" for text in input):
+        request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+        raise BadRequestError("bad input", response=httpx.Response(400, request=request), body=None)
+    # 응답 순서가 섞여도 index 기준으로 맞춰야 한다.
+    data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+    return SimpleNamespace(data=list(reversed(data)))
+
+
+@patch("modules.openai_service.client.embeddings.create", side_effect=_fake_create)
+def test_compute_embeddings_batches_in_order(mock_create):
+    """
+    max_items 단위로 묶어 요청하고, 결과는 입력 순서를 유지해야 한다.
+    """
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    result = compute_embeddings(texts, cache=None, max_items=2)
+
+    assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert mock_create.call_count == 3
+
+
+@patch("modules.openai_service.client.embeddings.create", side_effect=_fake_create)
+def test_compute_embeddings_per_item_failure(mock_create):
+    """
+    빈 문자열과 거절된 입력만 None이고 나머지는 정상 반환되어야 한다.
+    """
+    result = compute_embeddings(["a", "", "bad", "dddd", "a"], cache=None)
+    assert result == [[1.0], None, None, [4.0], [1.0]]
+
+
+def test_pack_batches_sends_oversized_input_alone():
+    """
+    추정 토큰이 입력 1개 한도를 넘는 항목은 버리지 않고 단독 배치로 분리해야 한다.
+    """
+    long_text = "가" * 6000  # 18000바이트 -> 추정 9001토큰
+    items = [(0, "a"), (1, long_text), (2, "b")]
+    batches = openai_service._pack_batches(items, max_items=10, max_tokens=300000)
+    assert batches == [[(1, long_text)], [(0, "a"), (2, "b")]]
+
+
+def _fake_chat_client(fail_models):
+    """fail_models에 든 모델은 시간 초과, 나머지는 모델 이름을 답변으로 돌려주는 가짜 클라이언트"""
+    calls = []
+
+    def create(model, **kwargs):
+        calls.append(model)
+        if model in fail_models:
+            raise httpx.ReadTimeout("timed out")
+        message = SimpleNamespace(content=f"answer from {model}")
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=100)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return fake, calls
+
+
+def test_tiered_completion_routes_by_score_and_escalates():
+    """
+    매칭 점수가 높으면 빠른 모델, 낮으면 강한 모델.
+    빠른 모델이 시간 초과되면 강한 모델로 재시도하고 escalation으로 집계해야 한다.
+    """
+    stats = openai_service.ChatStats()
+    fake, calls = _fake_chat_client(fail_models=set())
+    with patch.object(openai_service, "chat_stats", stats), \
+            patch.object(openai_service, "_chat_client", return_value=fake):
+        assert generate_tiered_completion("s", "u", match_score=0.99) == "answer from gpt-4o-mini"
+        assert generate_tiered_completion("s", "u", match_score=0.80) == "answer from gpt-4"
+    assert calls == ["gpt-4o-mini", "gpt-4"]
+
+    fake, calls = _fake_chat_client(fail_models={"gpt-4o-mini"})
+    with patch.object(openai_service, "chat_stats", stats), \
+            patch.object(openai_service, "_chat_client", return_value=fake):
+        assert generate_tiered_completion("s", "u", match_score=0.99) == "answer from gpt-4"
+    assert calls == ["gpt-4o-mini", "gpt-4"]
+
+    snap = stats.snapshot()
+    assert snap["escalations"] == 1
+    assert snap["tiers"]["fast"]["calls"] == 2 and snap["tiers"]["fast"]["failures"] == 1
+    assert snap["tiers"]["strong"]["calls"] == 2
+    assert snap["tiers"]["strong"]["cost_usd"] > snap["tiers"]["fast"]["cost_usd"] > 0
+
+
+def test_tiered_completion_respects_shared_deadline():
+    """
+    deadline이 이미 지났으면 강한 모델을 호출하지 않고, 스트림도 deadline에서 끊어야 한다.
+    """
+    stats = openai_service.ChatStats()
+    fake, calls = _fake_chat_client(fail_models={"gpt-4o-mini"})
+    deadline = openai_service.chat_deadline(budget=0)
+    with patch.object(openai_service, "chat_stats", stats), \
+            patch.object(openai_service, "_chat_client", return_value=fake):
+        assert generate_tiered_completion("s", "u", match_score=0.80, deadline=deadline) is None
+    assert calls == []
+
+    closed = []
+
+    class FakeStream:
+        def __iter__(self):
+            for c in ("a", "b", "c"):
+                yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=c))])
+
+        def close(self):
+            closed.append(True)
+
+    fake_stream = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: FakeStream())))
+    clock = iter([0.5, 1.5, 2.5])
+    with patch.object(openai_service, "chat_stats", stats), \
+            patch.object(openai_service, "_chat_client", return_value=fake_stream), \
+            patch.object(openai_service.time, "monotonic", side_effect=lambda: next(clock)):
+        parts = list(openai_service.stream_chat_completion("s", "u", deadline=1.0))
+    # 읽기 timeout과 무관하게 deadline을 넘긴 조각 이후로는 받지 않고 스트림을 닫음
+    assert parts == ["a", "b"]
+    assert closed == [True]
+
+
+def test_stream_tiered_completion_reports_completion():
+    """
+    스트림이 끝까지 받으면 반환값 True, deadline에서 끊기면 False여야 한다 (답변 캐시 저장 여부).
+    """
+    stats = openai_service.ChatStats()
+
+    class FakeStream:
+        def __iter__(self):
+            for c in ("a", "b"):
+                yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=c))])
+
+        def close(self):
+            pass
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: FakeStream())))
+
+    def consume(deadline):
+        result = {}
+
+        def run():
+            result["complete"] = yield from openai_service.stream_tiered_completion(
+                "s", "u", match_score=0.99, deadline=deadline)
+        return list(run()), result["complete"]
+
+    with patch.object(openai_service, "chat_stats", stats), \
+            patch.object(openai_service, "_chat_client", return_value=fake):
+        assert consume(time.monotonic() + 60) == (["a", "b"], True)
+        clock = iter([0.0, 0.5, 1.5])
+        with patch.object(openai_service.time, "monotonic", side_effect=lambda: next(clock)):
+            assert consume(1.0) == (["a", "b"], False)
@@ -0,0 +1,67 @@
+import json
+import time
+from unittest.mock import patch
+
+from flask import Flask
+
+from modules.profiling import RequestProfiler, profiling_bp
+
+
+def _busy(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def test_slow_threshold_saves_only_slow_runs_with_timings(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), enabled=True, sample_rate=0, slow_ms=30)
+
+    fast = profiler.start("message")
+    assert profiler.finish(fast, name="message") is None
+
+    slow = profiler.start("message")
+    assert profiler.start("message") is None  # 같은 스레드에서 중첩 불가
+    _busy(40)
+    path = profiler.finish(slow, name="message", timings={"embedding": 12.34}).result()
+
+    assert path.endswith(".prof")
+    with open(path[:-len(".prof")] + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["kind"] == "message" and meta["reason"] == "slow"
+    assert meta["timings"] == {"embedding": 12.3}
+    assert "_busy" in meta["top"]
+    assert profiler.stats()["profiled"] == 2 and profiler.stats()["saved"] == 1
+
+
+def test_retention_keeps_newest_files(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), enabled=True, sample_rate=1.0, max_files=2)
+    for i in range(3):
+        profiler.finish(profiler.start("http_actions"), name=f"view_submission:form{i}").result()
+        time.sleep(0.01)
+
+    names = [p["name"] for p in profiler.list_profiles()]
+    assert names == ["view_submission:form2", "view_submission:form1"]
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+    assert profiler.stats()["pruned"] == 1
+
+
+def test_admin_route_requires_token_and_updates_settings(tmp_path):
+    app = Flask(__name__)
+    app.register_blueprint(profiling_bp)
+    client = app.test_client()
+    profiler = RequestProfiler(directory=str(tmp_path))
+
+    with patch("modules.profiling.SECRET_TOKEN", "s3cret"), \
+         patch("modules.profiling.request_profiler", profiler):
+        assert client.get("/admin/profiling").status_code == 403
+        assert client.get("/admin/profiling", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+        resp = client.post("/admin/profiling", json={"enabled": True, "slow_ms": 10000},
+                           headers={"Authorization": "Bearer s3cret"})
+        assert resp.status_code == 200
+        assert resp.get_json()["settings"]["enabled"] is True
+        assert profiler.slow_ms == 10000
+
+        resp = client.post("/admin/profiling", json={"sample_rate": 2},
+                           headers={"X-Admin-Token": "s3cret"})
+        assert resp.status_code == 400
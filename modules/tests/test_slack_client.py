@@ -0,0 +1,122 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from modules.slack_client import SlackClient, TokenBucket, sdk_transport_supported
+
+
+@pytest.fixture
+def fake_slack_api():
+    """
+    첫 요청은 429(Retry-After: 0), 두 번째는 503, 그 뒤로는 ok=True를 돌려주는 로컬 서버
+    """
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            hits.append(self.path)
+            if len(hits) == 1:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                data = b'{"ok": false, "error": "ratelimited"}'
+            elif len(hits) == 2:
+                self.send_response(503)
+                data = b"unavailable"
+            else:
+                self.send_response(200)
+                data = json.dumps({"ok": True, "echo": json.loads(body)}).encode()
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/api/", hits
+    server.shutdown()
+
+
+def test_slack_client_retries_429_and_5xx(fake_slack_api):
+    """
+    429/503 응답은 재시도되어 최종적으로 성공해야 하고, 재시도 통계가 남아야 한다.
+    """
+    base_url, hits = fake_slack_api
+    client = SlackClient(token="xoxb-test", base_url=base_url)
+
+    resp = client.chat_postMessage(channel="C1", text="안녕하세요")
+
+    assert resp["ok"] is True
+    assert resp["echo"] == {"channel": "C1", "text": "안녕하세요"}
+    assert hits == ["/api/chat.postMessage"] * 3
+    stats = client.stats()
+    assert stats["calls"] == {"chat.postMessage": 1}
+    assert stats["retries"] == {"rate_limited": 1, "server_error": 1}
+
+
+def test_requests_go_through_pooled_session(fake_slack_api, monkeypatch):
+    """
+    slack_sdk를 올려 비공개 전송 메서드가 바뀌면 조용히 urllib로 우회될 수 있으므로,
+    실제 요청이 커넥션 풀(requests.Session)을 거치는지 확인한다.
+    """
+    assert sdk_transport_supported()
+    base_url, hits = fake_slack_api
+    client = SlackClient(token="xoxb-test", base_url=base_url)
+    posts = []
+    original_post = client._session.post
+    monkeypatch.setattr(client._session, "post", lambda *a, **kw: posts.append(a[0]) or original_post(*a, **kw))
+
+    client.chat_postMessage(channel="C1", text="hi")
+    assert posts == [base_url + "chat.postMessage"] * 3  # 429, 503 재시도까지 모두 풀 사용
+
+
+def test_token_bucket_throttles_after_burst(monkeypatch):
+    """
+    burst만큼은 바로 통과하고, 그 다음부터는 분당 속도에 맞춰 대기해야 한다.
+    """
+    sleeps = []
+    monkeypatch.setattr("modules.slack_client.time.sleep", sleeps.append)
+    bucket = TokenBucket(rate_per_min=60, burst=2)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0, abs=0.05)
+    assert bucket.acquire(max_wait=0.5) == 0.0  # 너무 오래 기다려야 하면 그냥 통과
+    assert len(sleeps) == 1
+
+
+def test_buckets_per_method_and_channel(monkeypatch):
+    """
+    같은 tier라도 메서드마다, chat.postMessage는 채널마다 버킷이 따로여야 하고,
+    views.open은 요청 스레드를 1초 넘게 붙잡지 않아야 한다.
+    """
+    sleeps = []
+    monkeypatch.setattr("modules.slack_client.time.sleep", sleeps.append)
+    monkeypatch.setattr("slack_sdk.WebClient.api_call", lambda self, method, **kwargs: {"ok": True})
+    client = SlackClient(token="xoxb-test", throttle_max_wait=30.0)
+
+    for _ in range(10):
+        client.api_call("chat.postMessage", json={"channel": "C1", "text": "a"})
+    client.api_call("chat.postMessage", json={"channel": "C2", "text": "b"})
+    assert sleeps == []  # C1 버킷이 비어도 C2는 영향 없음
+    client.api_call("chat.postMessage", json={"channel": "C1", "text": "c"})
+    assert len(sleeps) == 1
+
+    # conversations.info와 conversations.open은 둘 다 tier3지만 버킷은 따로
+    for _ in range(8):
+        client.api_call("conversations.info", params={"channel": "C1"})
+    client.api_call("conversations.open", json={"users": "U1"})
+    assert len(sleeps) == 1
+
+    # views.open: 버킷이 비어 있어도 INTERACTIVE_MAX_WAIT보다 오래 기다리지 않음
+    for _ in range(20):
+        client.api_call("views.open", json={"trigger_id": "t", "view": {}})
+    assert len(sleeps) == 1
+    assert client.stats()["calls"]["views.open"] == 20
@@ -0,0 +1,233 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+import modules.slack_events as slack_events
+from modules.dedup_store import EventDeduplicator, MemoryDedupStore
+from modules.slack_events import register_slack_events
+
+
+class FakeEventAdapter:
+    """SlackEventAdapter 대신 등록된 핸들러만 모아두는 가짜 어댑터"""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event_type):
+        def decorator(fn):
+            self.handlers[event_type] = fn
+            return fn
+        return decorator
+
+
+@pytest.fixture
+def handle_message():
+    adapter = FakeEventAdapter()
+    register_slack_events(adapter)
+    app = Flask(__name__)
+    with app.app_context(), patch.object(slack_events, "event_dedup",
+                                         EventDeduplicator(MemoryDedupStore())):
+        yield adapter.handlers["message"]
+
+
+def _event(**overrides):
+    event = {"channel": "C1", "user": "U1", "text": "주차 등록 어떻게 하나요",
+             "ts": "100.1", "client_msg_id": "m-1"}
+    event.update(overrides)
+    return {"event": event}
+
+
+@patch("modules.slack_events.message_pool.submit", return_value=True)
+def test_handle_message_enqueues_once(mock_submit, handle_message):
+    """
+    이벤트 핸들러는 파이프라인을 직접 실행하지 않고 큐에 한 번만 등록해야 한다.
+    """
+    handle_message(_event())
+    handle_message(_event())  # Slack 재전송(중복)
+
+    mock_submit.assert_called_once()
+    runner, _, fn, event = mock_submit.call_args.args
+    assert runner is slack_events.run_in_app_context
+    assert fn is slack_events.process_message
+    assert event["client_msg_id"] == "m-1"
+
+
+@patch("modules.slack_events.message_pool.submit")
+def test_handle_message_ignores_bot_and_thread(mock_submit, handle_message):
+    handle_message(_event(bot_id="B1"))
+    handle_message(_event(thread_ts="99.0"))
+    mock_submit.assert_not_called()
+
+
+@patch("modules.slack_events.message_pool.submit", return_value=False)
+def test_handle_message_queue_full_allows_retry(mock_submit, handle_message):
+    """
+    큐가 가득 차서 거절되면, Slack 재전송 때 다시 등록을 시도해야 한다.
+    """
+    handle_message(_event())
+    handle_message(_event())
+    assert mock_submit.call_count == 2
+
+
+@patch("modules.slack_events.update_message")
+@patch("modules.slack_events.stream_tiered_completion")
+def test_stream_answer_throttles_updates(mock_stream, mock_update):
+    """
+    스트리밍 조각은 모두 이어 붙이되, chat.update는 갱신 간격마다 한 번만 호출해야 한다.
+    """
+    mock_stream.return_value = iter(["안녕", "하세요", ", 디캠프", " AI봇입니다."])
+    ctx = slack_events.QueryContext("질문", channel_id="C1")
+
+    answer = slack_events.stream_answer(ctx, "200.1", "sys", "user", interval=3600)
+
+    assert answer == "안녕하세요, 디캠프 AI봇입니다."
+    assert "first_token" in ctx.timings
+    mock_update.assert_not_called()
+
+    mock_stream.return_value = iter(["a", "b", "c"])
+    slack_events.stream_answer(ctx, "200.1", "sys", "user", interval=0)
+    assert 1 <= mock_update.call_count <= 3  # 전송 중에 쌓인 갱신은 최신 것만 남김
+    assert mock_update.call_args.args[:2] == ("C1", "200.1")
+
+
+@patch("modules.slack_events.stream_tiered_completion")
+def test_stream_answer_does_not_wait_for_slack_updates(mock_stream):
+    """
+    chat.update가 rate limit 등으로 오래 걸려도 GPT 스트림은 기다리지 않고 끝까지 읽어야 하고,
+    밀린 중간 갱신은 최신 것 하나로 합쳐야 한다.
+    """
+    order, updates = [], []
+    slack_released = threading.Event()
+
+    def slow_update(channel_id, ts, text, blocks=None):
+        slack_released.wait(5)
+        order.append("update")
+        updates.append(text)
+
+    def stream(*args, **kwargs):
+        for part in ("가", "나", "다", "라"):
+            yield part
+        order.append("stream_done")
+        slack_released.set()
+        return True
+
+    mock_stream.side_effect = stream
+    ctx = slack_events.QueryContext("질문", channel_id="C1")
+    with patch.object(slack_events, "update_message", side_effect=slow_update):
+        answer = slack_events.stream_answer(ctx, "200.1", "sys", "user", interval=0)
+
+    assert answer == "가나다라" and ctx.answer_complete
+    assert order[0] == "stream_done"
+    # 첫 갱신이 끝나기 전에 스트림이 끝났으므로 밀린 갱신은 close()에서 버려져 많아야 1번
+    assert len(updates) <= 1
+
+
+def test_process_message_runs_independent_steps_concurrently():
+    """
+    채널 조회와 질문 임베딩은 서로 기다리지 않고 동시에 실행되어야 한다.
+    (둘 다 Barrier에 도착해야 통과하므로, 순서대로 실행되면 Barrier가 깨져 기본값으로 떨어짐)
+    """
+    both_running = threading.Barrier(2, timeout=5)
+
+    def channel_lookup(channel_id):
+        both_running.wait()
+        return "dcamp-선릉"
+
+    def embedding(text):
+        both_running.wait()
+        return [1.0, 0.0]
+
+    from modules.data_snapshot import DataSnapshot
+    snapshot = DataSnapshot(dept_data=[{"종류": "주차", "detail_embedding": [1.0, 0.0]}])
+    with patch.object(slack_events, "current_snapshot", return_value=snapshot), \
+            patch.object(slack_events, "get_channel_name", side_effect=channel_lookup), \
+            patch("modules.query_context.compute_embedding", side_effect=embedding) as mock_embed, \
+            patch.object(slack_events, "search_similar_data", return_value=[]) as mock_search, \
+            patch.object(slack_events, "send_dm_to_admin") as mock_dm:
+        slack_events.process_message(_event()["event"])
+
+    assert not both_running.broken
+    mock_embed.assert_called_once()
+    assert mock_search.call_args.kwargs["query_embedding"] == [1.0, 0.0]
+    category, dm_text = mock_dm.call_args.args
+    assert category == "기타"
+    assert "[dcamp-선릉]" in dm_text
+
+
+def _run_answer_path(stream_fn, embedding=None):
+    """
+    FAQ 매칭 -> 답변 생성 경로까지 _process_message 실행 (Slack/OpenAI 호출은 모두 가짜)
+    반환: (answer_cache mock, QueryContext)
+    """
+    from modules.data_snapshot import DataSnapshot
+    snapshot = DataSnapshot(dept_data=[{"종류": "주차", "detail_embedding": [1.0, 0.0]}])
+    faq = [{"id": 0, "question": "주차 등록", "answer": "B1층 안내데스크", "score": 0.95}]
+    ctx = slack_events.QueryContext("주차 등록 어떻게 하나요", channel_id="C1", user_id="U1")
+    with patch.object(slack_events, "current_snapshot", return_value=snapshot), \
+            patch.object(slack_events, "get_channel_name", return_value="dcamp-문의"), \
+            patch("modules.query_context.compute_embedding", return_value=embedding or [1.0, 0.0]), \
+            patch.object(slack_events, "search_similar_data", return_value=faq), \
+            patch.object(slack_events, "classify_by_detail", return_value="대관"), \
+            patch.object(slack_events, "ANSWER_STREAMING", True), \
+            patch.object(slack_events, "send_message", return_value="300.1"), \
+            patch.object(slack_events, "update_message"), \
+            patch.object(slack_events, "send_dm_to_admin"), \
+            patch.object(slack_events, "generate_tiered_completion", return_value=None), \
+            patch.object(slack_events, "stream_tiered_completion", side_effect=stream_fn), \
+            patch.object(slack_events, "answer_cache") as mock_cache:
+        mock_cache.get.return_value = None
+        slack_events._process_message(_event()["event"], ctx)
+    return mock_cache, ctx
+
+
+def test_truncated_answer_is_not_cached():
+    """
+    deadline/오류로 중간에 끊긴 스트림 답변은 답변 캐시에 넣지 않고, 끝까지 받은 답변만 넣어야 한다.
+    """
+    def truncated(*args, **kwargs):
+        yield "B1층 "
+        return False
+
+    def complete(*args, **kwargs):
+        yield "B1층 "
+        yield "안내데스크입니다."
+        return True
+
+    mock_cache, ctx = _run_answer_path(truncated)
+    assert ctx.answer_complete is False
+    mock_cache.set.assert_not_called()
+
+    mock_cache, ctx = _run_answer_path(complete)
+    assert ctx.answer_complete is True
+    faq_id, lang, _, answer, _ = mock_cache.set.call_args.args
+    assert (faq_id, lang, answer) == (0, "ko", "B1층 안내데스크입니다.")
+
+
+def test_process_message_embeds_query_once_for_search_and_classify():
+    """
+    메시지 1건은 질문 임베딩을 한 번만 계산하고, 같은 벡터를 FAQ 검색과 부서 분류에 넘겨야 한다.
+    """
+    from modules.data_snapshot import DataSnapshot
+    snapshot = DataSnapshot(dept_data=[{"종류": "주차", "detail_embedding": [1.0, 0.0]}])
+    faq = [{"id": 0, "question": "주차 등록", "answer": "B1층 안내데스크", "score": 0.95}]
+    query_emb = [0.6, 0.8]
+    with patch.object(slack_events, "current_snapshot", return_value=snapshot), \
+            patch.object(slack_events, "get_channel_name", return_value="dcamp-문의"), \
+            patch("modules.query_context.compute_embedding", return_value=query_emb) as mock_embed, \
+            patch.object(slack_events, "search_similar_data", return_value=faq) as mock_search, \
+            patch.object(slack_events, "classify_by_detail", return_value="대관") as mock_classify, \
+            patch.object(slack_events, "ANSWER_STREAMING", False), \
+            patch.object(slack_events, "answer_cache", None), \
+            patch.object(slack_events, "generate_tiered_completion", return_value="답변"), \
+            patch.object(slack_events, "send_blocks"), \
+            patch.object(slack_events, "send_message"), \
+            patch.object(slack_events, "send_dm_to_admin"):
+        ctx = slack_events.QueryContext("주차 등록 어떻게 하나요", channel_id="C1", user_id="U1")
+        outcome = slack_events._process_message(_event()["event"], ctx)
+
+    assert outcome == "answered"
+    mock_embed.assert_called_once_with("주차 등록 어떻게 하나요")
+    assert mock_search.call_args.kwargs["query_embedding"] is query_emb
+    assert mock_classify.call_args.kwargs["user_emb"] is query_emb
@@ -70,10 +70,165 @@ def test_get_slack_user_name_error(mock_users_info):
     """
     SlackApiError가 발생하거나 ok=False인 경우, "Unknown User"를 반환해야 한다.
     """
+    from modules.slack_utils import user_name_cache
+
     # 1) ok=False 케이스
+    user_name_cache.clear()
     mock_users_info.return_value = {"ok": False}
     assert get_slack_user_name("U999") == "Unknown User"
+    assert mock_users_info.call_count == 1
 
-    # 2) SlackApiError 발생
+    # 2) SlackApiError 발생 (1)에서 U999가 부정 캐시되므로 다른 ID로 실제 API 경로를 탐
     mock_users_info.side_effect = SlackApiError("Error", response={"ok": False, "error": "something_wrong"})
-    assert get_slack_user_name("U999") == "Unknown User"
+    assert get_slack_user_name("U998") == "Unknown User"
+    assert mock_users_info.call_count == 2
+
+@patch("modules.slack_utils.slack_client.users_info")
+def test_get_slack_user_name_negative_cache(mock_users_info):
+    """
+    user_not_found는 부정 캐시되어 다시 조회하지 않고, 일시적 오류는 캐시하지 않아 다음에 다시 조회해야 한다.
+    """
+    from modules.slack_utils import user_name_cache
+    user_name_cache.clear()
+
+    mock_users_info.side_effect = SlackApiError("Error", response={"ok": False, "error": "user_not_found"})
+    assert get_slack_user_name("U404") == "Unknown User"
+    assert get_slack_user_name("U404") == "Unknown User"
+    assert mock_users_info.call_count == 1
+
+    mock_users_info.side_effect = SlackApiError("Error", response={"ok": False, "error": "ratelimited"})
+    assert get_slack_user_name("U500") == "Unknown User"
+    assert get_slack_user_name("U500") == "Unknown User"
+    assert mock_users_info.call_count == 3
+
+
+@patch("modules.slack_utils.slack_client.users_list")
+def test_warm_user_cache_survives_network_error(mock_list):
+    """
+    users.list 도중 SlackApiError가 아닌 오류가 나도 예외 없이 그때까지 채운 수를 반환해야 한다.
+    """
+    from urllib.error import URLError
+    from modules.slack_utils import user_name_cache, warm_user_cache
+    user_name_cache.clear()
+    mock_list.side_effect = [
+        {"members": [{"id": "U1", "profile": {"display_name": "하나"}}], "response_metadata": {"next_cursor": "n"}},
+        URLError("connection refused"),
+    ]
+    assert warm_user_cache() == 1
+    assert user_name_cache.get("U1") == "하나"
+
+
+@patch("modules.slack_utils.slack_client.conversations_info")
+def test_get_channel_name_cached(mock_info):
+    """
+    같은 채널은 conversations.info를 한 번만 호출하고, rename 이벤트로 갱신되어야 한다.
+    """
+    from modules.slack_utils import channel_cache, get_channel_name, handle_channel_rename
+    channel_cache.clear()
+    mock_info.return_value = {"ok": True, "channel": {"name": "선릉-02-문의"}}
+
+    assert get_channel_name("C777") == "선릉-02-문의"
+    assert get_channel_name("C777") == "선릉-02-문의"
+    mock_info.assert_called_once_with(channel="C777")
+
+    handle_channel_rename({"type": "channel_rename", "channel": {"id": "C777", "name": "마포-문의"}})
+    assert get_channel_name("C777") == "마포-문의"
+    assert mock_info.call_count == 1
+
+
+@patch("modules.slack_utils.slack_client.conversations_list")
+def test_warm_channel_cache_pages(mock_list):
+    from modules.slack_utils import channel_cache, warm_channel_cache
+    channel_cache.clear()
+    mock_list.side_effect = [
+        {"channels": [{"id": "C1", "name": "one"}], "response_metadata": {"next_cursor": "abc"}},
+        {"channels": [{"id": "C2", "name": "two"}], "response_metadata": {"next_cursor": ""}},
+    ]
+    assert warm_channel_cache() == 2
+    assert mock_list.call_args_list[1].kwargs["cursor"] == "abc"
+    assert channel_cache.get("C2") == "two"
+
+
+@patch("modules.slack_utils.slack_client.chat_postMessage")
+@patch("modules.slack_utils.slack_client.conversations_open")
+def test_send_dm_to_admin_reuses_dm_channel(mock_open, mock_post):
+    """
+    담당자 DM 채널은 한 번만 열고, channel_not_found면 다시 열어 재전송해야 한다.
+    """
+    from modules.data_snapshot import DataSnapshot
+    from modules.dm_channels import dm_channels
+    from modules.slack_utils import send_dm_to_admin
+
+    dm_channels.clear()
+    snapshot = DataSnapshot(cat_map={"주차": "U_ADMIN"})
+    mock_open.side_effect = [{"channel": {"id": "D1"}}, {"channel": {"id": "D2"}}]
+
+    with patch("modules.slack_utils.current_snapshot", return_value=snapshot):
+        send_dm_to_admin("주차", "첫 번째")
+        send_dm_to_admin("주차", "두 번째")
+        assert mock_open.call_count == 1
+        assert mock_post.call_args.kwargs == {"channel": "D1", "text": "두 번째"}
+
+        mock_post.side_effect = [
+            SlackApiError("Error", response={"ok": False, "error": "channel_not_found"}),
+            None,
+        ]
+        send_dm_to_admin("주차", "세 번째")
+        assert mock_open.call_count == 2
+        assert mock_post.call_args.kwargs == {"channel": "D2", "text": "세 번째"}
+
+
+@patch("modules.slack_utils.slack_client.users_info")
+def test_get_slack_user_name_cached(mock_users_info):
+    """
+    같은 사용자는 users.info를 한 번만 호출하고, user_change 이벤트로 갱신되어야 한다.
+    없는 사용자도 (짧게) 캐시한다.
+    """
+    from modules.slack_utils import handle_user_change
+    mock_users_info.return_value = {"ok": True, "user": {"profile": {"display_name": "홍길동"}}}
+
+    assert get_slack_user_name("U1") == "홍길동"
+    assert get_slack_user_name("U1") == "홍길동"
+    mock_users_info.assert_called_once()
+
+    handle_user_change({"type": "user_change", "user": {"id": "U1", "profile": {"display_name": "길동"}}})
+    assert get_slack_user_name("U1") == "길동"
+
+    mock_users_info.side_effect = SlackApiError("Error", response={"ok": False, "error": "user_not_found"})
+    assert get_slack_user_name("U404") == "Unknown User"
+    assert get_slack_user_name("U404") == "Unknown User"
+    assert mock_users_info.call_count == 2
+
+
+@patch("modules.slack_utils.slack_client.conversations_list")
+def test_warm_channel_cache_survives_network_error(mock_list):
+    """
+    SlackApiError가 아닌 오류(URLError 등)도 워밍을 멈출 뿐 예외를 밖으로 던지지 않아야 한다.
+    """
+    from urllib.error import URLError
+    from modules.slack_utils import channel_cache, warm_channel_cache
+    channel_cache.clear()
+    mock_list.side_effect = [
+        {"channels": [{"id": "C1", "name": "one"}], "response_metadata": {"next_cursor": "abc"}},
+        URLError("connection reset"),
+    ]
+    assert warm_channel_cache() == 1
+    assert channel_cache.get("C1") == "one"
+
+
+@patch("modules.slack_utils.slack_client.conversations_open")
+def test_warm_dm_channels_continues_after_error(mock_open):
+    """
+    사용자 1명의 conversations.open이 어떤 예외로 실패해도 나머지 사용자는 계속 열어야 한다.
+    """
+    from urllib.error import URLError
+    from modules.dm_channels import dm_channels
+    from modules.slack_utils import warm_dm_channels
+    dm_channels.discard("UA1")
+    dm_channels.discard("UB2")
+    mock_open.side_effect = [URLError("timed out"), {"channel": {"id": "D2"}}]
+
+    warm_dm_channels(["UA1", "UB2"])
+    assert mock_open.call_count == 2
+    assert dm_channels.get("UA1") is None
+    assert dm_channels.get("UB2") == "D2"